@@ -1,8 +1,9 @@
-from backend_single_analysis_method import collect_spring_backend_files, filter_backend_files_by_keywords, summarize_file_with_llm, split_into_batches,summarize_batch_semantic, analyze_project_from_batches, analyze_commit_style, call_with_retry
+from backend_single_analysis_method import iter_spring_backend_files, iter_filter_backend_files, summarize_file_with_llm, pack_summaries_into_batches, summarize_batch_semantic, analyze_project_from_batches, reduce_batch_summaries, analyze_commit_style, call_with_retry, SummaryCache, gms_rate_limiter
 import os
 import json
 from dotenv import load_dotenv
-import time
+from common.instrumentation import configure_instrumentation, stage_summary
+from common.pipeline_dag import PipelineDAG
 
 load_dotenv()
 
@@ -10,8 +11,9 @@ gms_api_key=os.getenv("GMS_API_KEY")
 gms_base_url=os.getenv("GMS_BASE_URL")
 
 
-OWNER = 'HTTP501'
-REPO = 'idk'
+# 경로/설정값은 환경변수로 덮어쓸 수 있음 (benchmark/run_benchmark.py 등에서 사용)
+OWNER = os.getenv("ANALYSIS_OWNER", 'HTTP501')
+REPO = os.getenv("ANALYSIS_REPO", 'idk')
 
 position = 'backend' # backend / frontend
 
@@ -36,144 +38,190 @@ if position == 'backend':
 
 user_input = "백엔드에서 돈포켓, 목표저축, 자동이체 기능을 구현했습니다"
 
-repo_root = r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\idk"
+repo_root = os.getenv("ANALYSIS_REPO_PATH", r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\idk")
+BASE_OUTPUT_DIR = os.getenv("ANALYSIS_OUTPUT_DIR", r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\backend_single_analysis")
+
+# 단계별 계측 결과 (wall time / 토큰 / 재시도) → 리포트 옆에 JSON lines로 저장
+os.makedirs(BASE_OUTPUT_DIR, exist_ok=True)
+configure_instrumentation(os.path.join(BASE_OUTPUT_DIR, f"{OWNER}_{REPO}_stage_metrics.jsonl"), repo=f"{OWNER}/{REPO}")
 
 
 #################################################
 ### 필요한 파일 선별
-selected_files = collect_spring_backend_files(repo_root, TARGET_DIRS=TARGET_DIRS)
-print("1차 선별:", len(selected_files)) # 핵심 디렉토리로 선별
-
-filtered_files = filter_backend_files_by_keywords(selected_files, SERVICE_KEYWORDS=SERVICE_KEYWORDS, REPOSITORY_KEYWORDS=REPOSITORY_KEYWORDS)
-print("2차 선별:", len(filtered_files)) # 코드 내 핵심 keyword로 선별
+# 파일을 찾는 대로 1차(핵심 디렉토리) → 2차(코드 내 핵심 keyword) 선별을 거쳐 바로 요약 단계로 넘김
+selection_stats = {}
+selected_files = iter_spring_backend_files(repo_root, TARGET_DIRS=TARGET_DIRS)
+filtered_files = iter_filter_backend_files(selected_files, SERVICE_KEYWORDS=SERVICE_KEYWORDS, REPOSITORY_KEYWORDS=REPOSITORY_KEYWORDS, stats=selection_stats)
 
 
 #####################################################
 ### 개별 파일 분석 및 요약
-BASE_SLEEP = 1.5          # 기본 대기
-LONG_SLEEP_EVERY = 15     # 15개마다
-LONG_SLEEP_TIME = 180     # 3분
-
-filtered_file_summaries = []
-
-for i, file in enumerate(filtered_files):
-    result = call_with_retry(
-        lambda: summarize_file_with_llm(
-            path=file["path"],
-            content=file["content"],
-            gms_api_key=gms_api_key,
-            gms_base_url=gms_base_url,
-            user_input = user_input
+# 고정 sleep(매 파일 1.5초 + 15개마다 3분) 대신 공통 rate limiter(common/gms.py)가
+# GMS_REQUESTS_PER_MIN / GMS_TOKENS_PER_MIN 한도 안에서 필요한 만큼만 대기하고, 429 / Retry-After에 맞춰 속도를 조절
+# 파일 요약 → 배치 요약 → 최종 리포트는 순서대로, 커밋 스타일 분석은 파일 요약과 동시에 실행 (PipelineDAG)
+
+# 파일 단위 요약 캐시 (변경되지 않은 파일은 Gemini 호출 없이 재사용)
+SUMMARY_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR", os.path.join(BASE_OUTPUT_DIR, "summary_cache"))
+
+def run_file_summaries() -> list:
+    summary_cache = SummaryCache(cache_dir=SUMMARY_CACHE_DIR, max_bytes=200 * 1024 * 1024)
+
+    filtered_file_summaries = []
+
+    for i, file in enumerate(filtered_files):
+        result = call_with_retry(
+            lambda: summarize_file_with_llm(
+                path=file["path"],
+                content=file["content"],
+                gms_api_key=gms_api_key,
+                gms_base_url=gms_base_url,
+                user_input = user_input,
+                cache=summary_cache
+            )
         )
-    )
-
-    filtered_file_summaries.append(result)
 
-    INDIVIDUAL_DIR = r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\backend_single_analysis\individual_summaries"
-    os.makedirs(INDIVIDUAL_DIR, exist_ok=True)
-    
-    output_path = os.path.join(INDIVIDUAL_DIR, f"{REPO}_files_{i}.json")
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
-        print(f"선별된 파일 저장 완료: {output_path}")
+        filtered_file_summaries.append(result)
 
-    time.sleep(BASE_SLEEP)
+        INDIVIDUAL_DIR = os.path.join(BASE_OUTPUT_DIR, "individual_summaries")
+        os.makedirs(INDIVIDUAL_DIR, exist_ok=True)
+        
+        output_path = os.path.join(INDIVIDUAL_DIR, f"{REPO}_files_{i}.json")
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+            print(f"선별된 파일 저장 완료: {output_path}")
 
-    # 🛑 누적 쿼터 회피용 강제 휴식
-    if (i + 1) % LONG_SLEEP_EVERY == 0:
-        print(f"⏸️ {LONG_SLEEP_EVERY}개 처리 → {LONG_SLEEP_TIME//60}분 휴식")
-        time.sleep(LONG_SLEEP_TIME)
+    print("1차 선별:", selection_stats.get("selected", 0)) # 핵심 디렉토리로 선별
+    print("2차 선별:", selection_stats.get("filtered", 0)) # 코드 내 핵심 keyword로 선별
+    print(f"요약 캐시 현황: {summary_cache.stats()}")
+    print(f"rate limiter 현황: {gms_rate_limiter.stats()}")
 
+    return filtered_file_summaries
         
 ###############################
-### 배치로 나누기
-batches = split_into_batches(
-    items=filtered_file_summaries,
-    batch_size=10
-)
-print("배치(10)으로 나누기 완료")
+### 배치로 나누기 + 5. 배치 단위로 의미 요약(LLM 1회 x batch 수)
+BATCH_MAX_TOKENS = 24000  # 배치 프롬프트에 들어가는 파일 요약 토큰 합 상한
+FINAL_INPUT_MAX_TOKENS = int(os.getenv("ANALYSIS_FINAL_MAX_TOKENS", "60000"))  # 최종 프롬프트에 넣을 배치 요약 토큰 합 상한 (넘으면 계층적으로 병합)
+BATCH_SUMMARY_DIR = os.path.join(BASE_OUTPUT_DIR, "batch_summaries")
+
+def run_batch_summaries(file_summaries: list) -> list:
+    batches = pack_summaries_into_batches(
+        summaries=file_summaries,
+        max_tokens=BATCH_MAX_TOKENS,
+        group_by_directory=True
+    )
+    print(f"배치(최대 {BATCH_MAX_TOKENS} 토큰)로 나누기 완료 (배치 {len(batches)}개)")
 
+    batch_semantic_summaries = []
+    os.makedirs(BATCH_SUMMARY_DIR, exist_ok=True)
 
-##########################################################
+    total = len(batches)
 
-# 5. 배치 단위로 의미 요약(LLM 1회 x batch 수)
-batch_semantic_summaries = []
-BATCH_SUMMARY_DIR = r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\backend_single_analysis\batch_summaries"
-os.makedirs(BATCH_SUMMARY_DIR, exist_ok=True)
+    for idx, batch in enumerate(batches, 1):
+        print(f"[BATCH {idx}/{total}] START")
 
-total = len(batches)
+        batch_json = {
+            "batch_id": idx,
+            "files_count": len(batch),
+            "summaries": batch
+        }
 
-for idx, batch in enumerate(batches, 1):
-    print(f"[BATCH {idx}/{total}] START")
+        try:
+            semantic = call_with_retry(
+                lambda: summarize_batch_semantic(
+                    batch_data=batch_json,
+                    gms_api_key=gms_api_key,
+                    gms_base_url=gms_base_url,
+                    user_input=user_input
+                )
+            )
 
-    batch_json = {
-        "batch_id": idx,
-        "files_count": len(batch),
-        "summaries": batch
-    }
+            batch_semantic_summaries.append(semantic)
 
-    try:
-        semantic = summarize_batch_semantic(
-            batch_data=batch_json,
-            gms_api_key=gms_api_key,
-            gms_base_url=gms_base_url
-        )
+            output_path = os.path.join(
+                BATCH_SUMMARY_DIR,
+                f"batch_{idx}_semantic.json"
+            )
 
-        batch_semantic_summaries.append(semantic)
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(semantic, f, ensure_ascii=False, indent=2)
 
-        output_path = os.path.join(
-            BATCH_SUMMARY_DIR,
-            f"batch_{idx}_semantic.json"
-        )
+            print(f"[BATCH {idx}/{total}] DONE")
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(semantic, f, ensure_ascii=False, indent=2)
-
-        print(f"[BATCH {idx}/{total}] DONE")
+        except Exception as e:
+            print(f"[BATCH {idx}/{total}] ERROR :: {e}")
 
-    except Exception as e:
-        print(f"[BATCH {idx}/{total}] ERROR :: {e}")
-
-print("배치 별 요약 완료")
+    print("배치 별 요약 완료")
+    return batch_semantic_summaries
 
 
 # ==============================
 # 6. 요약된 파일들 바탕으로 최종 리포트 생성
 # ==============================
-final_result = analyze_project_from_batches(
-    batch_semantic_summaries=batch_semantic_summaries,
-    gms_api_key=gms_api_key,
-    gms_base_url=gms_base_url, 
-    repo_analysis_id=f"{OWNER}_{REPO}"
-)
+# 배치 요약이 최종 프롬프트 예산을 넘으면 super-batch로 병렬 병합을 반복해서 줄인 뒤 최종 분석
+def run_final_report(batch_summaries: list) -> dict:
+    reduced_summaries = reduce_batch_summaries(
+        batch_summaries,
+        gms_api_key=gms_api_key,
+        gms_base_url=gms_base_url,
+        max_tokens=FINAL_INPUT_MAX_TOKENS
+    )
+
+    final_result = call_with_retry(
+        lambda: analyze_project_from_batches(
+            batch_semantic_summaries=reduced_summaries,
+            gms_api_key=gms_api_key,
+            gms_base_url=gms_base_url, 
+            repo_analysis_id=f"{OWNER}_{REPO}"
+        )
+    )
 
-final_result['language'] = language # 언어 우선 Java 기반으로 분석
+    final_result['language'] = language # 언어 우선 Java 기반으로 분석
+    return final_result
 
 
 
 # ==============================
-# 7. 커밋 스타일 분석해서 협업 지표 리포트에 추가
+# 7. 커밋 스타일 분석 (파일 요약과 동시에 실행)
 # =============================
 
-with open(
-    rf"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\{REPO}\{OWNER}_{REPO}_commit_metadata.json",
-    encoding="utf-8"
-) as f:
-    commit_metadata = json.load(f)
-
-commit_style = analyze_commit_style(
-    commit_metadata=commit_metadata,
-    gms_api_key=gms_api_key,
-    gms_base_url=gms_base_url
+COMMIT_METADATA_PATH = os.getenv(
+    "COMMIT_METADATA_PATH",
+    rf"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\{REPO}\{OWNER}_{REPO}_commit_metadata.json"
 )
-final_result["collaboration_style"] = commit_style
+
+def run_commit_style() -> dict:
+    with open(COMMIT_METADATA_PATH, encoding="utf-8") as f:
+        commit_metadata = json.load(f)
+
+    return call_with_retry(
+        lambda: analyze_commit_style(
+            commit_metadata=commit_metadata,
+            gms_api_key=gms_api_key,
+            gms_base_url=gms_base_url
+        )
+    )
+
+
+# 최종 리포트에 협업 지표 추가
+def assemble_report(final_report: dict, commit_style: dict) -> dict:
+    final_report["collaboration_style"] = commit_style
+    return final_report
+
+
+dag = PipelineDAG()
+dag.add("file_summaries", run_file_summaries)
+dag.add("batch_summaries", run_batch_summaries, deps=["file_summaries"])
+dag.add("final_report", run_final_report, deps=["batch_summaries"])
+dag.add("commit_style", run_commit_style)
+dag.add("report", assemble_report, deps=["final_report", "commit_style"])
+
+final_result = dag.run()["report"]
+print(f"DAG 단계별 소요 시간: { {name: round(t, 1) for name, t in dag.timings.items()} }")
 
 
 # ==============================
 # 9. 분석 리포트 저장
 # ==============================
-BASE_OUTPUT_DIR = r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\backend_single_analysis"
-
 final_output_path = os.path.join(
     BASE_OUTPUT_DIR, f"{OWNER}_{REPO}_single_analysis.json"
 )
@@ -181,4 +229,5 @@ final_output_path = os.path.join(
 with open(final_output_path, "w", encoding="utf-8") as f:
     json.dump(final_result, f, ensure_ascii=False, indent=2)
 
-print("프로젝트 최종 분석 완료")
\ No newline at end of file
+print("프로젝트 최종 분석 완료")
+print(f"단계별 소요 시간: {json.dumps(stage_summary(), ensure_ascii=False)}")
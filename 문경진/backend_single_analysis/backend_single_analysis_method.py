@@ -1,4 +1,5 @@
 import os
+import sys
 import json
 import re
 from pathlib import Path
@@ -7,6 +8,18 @@ from openai import OpenAI
 from dotenv import load_dotenv
 import time
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # 문경진/common 공통 모듈 경로
+from common.summary_cache import SummaryCache
+from common.rate_limiter import RateLimiter
+from common.gms import generate_content, gms_rate_limiter
+from common.batching import pack_into_batches
+from common.snippet import read_text_snippet, SNIPPET_THRESHOLD_BYTES
+from common.instrumentation import instrument, annotate, set_retry_attempt, reset_retry_attempt
+from common.hierarchical_reduce import reduce_summaries_hierarchically
+from common.path_filter import PathFilter, keyword_matcher
+from common.json_parser import parse_llm_json
+import requests
+
 # load_dotenv()
 
 # client = OpenAI(
@@ -15,22 +28,30 @@ import time
 # )
 
 ## 막혔을 때 retry
-def call_with_retry(fn, max_retries=3):
+# 429가 나면 generate_content가 공통 limiter에 Retry-After를 반영해 두므로,
+# 여기서는 limiter의 일시정지 시간만큼(없으면 지수 backoff) 기다렸다가 다시 호출
+def call_with_retry(fn, max_retries=3, limiter: RateLimiter = gms_rate_limiter):
     for attempt in range(max_retries):
+        token = set_retry_attempt(attempt + 1)  # 단계 계측 레코드에 몇 번째 시도인지 기록
         try:
             return fn()
         except requests.exceptions.HTTPError as e:
             if e.response is not None and e.response.status_code == 429:
-                wait = min(10, 2 ** attempt)  # 2, 4, 8, 10...
-                print(f"⚠️ 429 발생 → {wait}s 대기 후 재시도 ({attempt+1}/{max_retries})")
+                wait = limiter.pause_remaining() or min(10, 2 ** attempt)  # 2, 4, 8, 10...
+                print(f"⚠️ 429 발생 → {wait:.1f}s 대기 후 재시도 ({attempt+1}/{max_retries}) / limiter {limiter.stats()}")
                 time.sleep(wait)
             else:
                 raise
+        finally:
+            reset_retry_attempt(token)
     raise RuntimeError("429 재시도 한도 초과")
 
 
 ### 개별 파일 내 코드가 너무 길 때, 처음 800자와 끝 800자만 input으로 넣어서 분석 및 요약
-def make_snippet_for_llm(text: str, head_len=800, tail_len=800) -> str:
+SNIPPET_HEAD_LEN = 800
+SNIPPET_TAIL_LEN = 800
+
+def make_snippet_for_llm(text: str, head_len=SNIPPET_HEAD_LEN, tail_len=SNIPPET_TAIL_LEN) -> str:
     if len(text) <= head_len + tail_len:
         return text
     return (
@@ -41,14 +62,34 @@ def make_snippet_for_llm(text: str, head_len=800, tail_len=800) -> str:
 ########################################################################################
 
 
-### json 로드 시 불필요한 노이즈 제거
-def safe_json_loads(text: str) -> dict:
-    cleaned = re.sub(r"```(?:json)?", "", text).strip()
-    start = cleaned.find("{")
-    end = cleaned.rfind("}")
-    if start == -1 or end == -1:
-        raise ValueError("JSON 파싱 실패")
-    return json.loads(cleaned[start:end+1])
+### 단계별 LLM 응답 JSON 스키마 (common/json_parser.parse_llm_json으로 추출 / 검증)
+# {key: 기본값} - 빠지거나 null인 key는 기본값으로 채우고, 타입이 다르면 파싱 실패로 처리
+FILE_SUMMARY_SCHEMA = {
+    "project_subject_signals": [],
+    "frameworks": [],
+    "libraries": [],
+    "core_features": [],
+    "improvement_suggestions": []
+}
+BATCH_SUMMARY_SCHEMA = {
+    "project_subject_candidates": [],
+    "frameworks": [],
+    "libraries": [],
+    "core_features": [],
+    "improvement_suggestions": []
+}
+FINAL_REPORT_SCHEMA = {
+    "project_subject": "",
+    "frameworks": [],
+    "libraries": [],
+    "core_features": [],
+    "improvement_suggestions": [],
+    "collaboration_style": ""
+}
+COMMIT_STYLE_SCHEMA = {
+    "collaboration_type": "",
+    "commit_message_quality": {}
+}
 ########################################################################################
 
 
@@ -57,58 +98,101 @@ def safe_json_loads(text: str) -> dict:
 from pathlib import Path
 from typing import List, Dict
 
-def collect_spring_backend_files(repo_root: str, TARGET_DIRS) -> List[Dict[str, str]]:
+# 탐색하지 않을 디렉토리 (빌드 산출물 / 의존성 / IDE 설정)
+EXCLUDE_DIRS = {
+    ".git", ".gradle", ".idea", ".vscode", ".settings",
+    "node_modules", "build", "out", "target", "bin", "generated"
+}
+MAX_FILE_BYTES = 1_000_000  # 1MB 초과 파일은 생성 코드로 보고 읽지 않음
+
+# 경로에 포함된 레이어 디렉토리 (/controller/, /service/, /repository/)를 한 번의 검색으로 찾음
+# 뒤쪽 "/"는 lookahead로 확인만 함 → 소비하면 repository/service/처럼 이어진 디렉토리의 두 번째를 놓침
+LAYER_DIR_RE = re.compile(r"/(controller|service|repository)(?=/)")
+
+def path_layers(path: str) -> set:
+    return set(LAYER_DIR_RE.findall(path.replace("\\", "/")))
+
+# 키워드 / 라인 수 필터(is_backend_file_kept)가 전체 내용을 봐야 하는 파일
+def needs_full_content(path: str) -> bool:
+    return not path_layers(path).isdisjoint({"service", "repository"})
+
+def iter_spring_backend_files(
+    repo_root: str,
+    TARGET_DIRS,
+    max_file_bytes: int = MAX_FILE_BYTES,
+    snippet_threshold_bytes: int = SNIPPET_THRESHOLD_BYTES,
+    use_gitignore: bool = True
+):
     """
     Spring / Spring Boot 백엔드 레포에서
     - controller / service / repository 하위의 .java 파일
     - application.yml
     - README.md
-    을 선별하여
-    [{'path': 상대경로, 'content': 파일내용}, ...] 형태로 반환
+    를 찾는 대로 {'path': 상대경로, 'content': 파일내용} 형태로 하나씩 yield
+    - 읽기 전에 크기를 확인해서 max_file_bytes 초과 / 바이너리 파일은 제외
+    - 키워드 필터가 필요 없는 큰 파일(controller, README 등)은 앞/뒤 snippet 분량만 읽음
+    - use_gitignore=True면 레포의 .gitignore에 걸리는 파일/디렉토리도 제외
     """
 
     repo_root = Path(repo_root)
+    TARGET_DIRS = frozenset(TARGET_DIRS)
+    path_filter = PathFilter(exclude_dirs=EXCLUDE_DIRS, use_gitignore=use_gitignore)
 
-    selected_files: List[Dict[str, str]] = []
     application_yml_added = False
     readme_added = False
 
-    for path in repo_root.rglob("*"):
-        if not path.is_file():
-            continue
-        
-        filename_lower = path.name.lower()
-        
-        # README.md (1개만, 위치 무관)
-        if filename_lower == "readme.md" and not readme_added:
-            selected_files.append({
-                "path": str(path.relative_to(repo_root)),
-                "content": path.read_text(encoding="utf-8", errors="ignore")
-            })
-            readme_added = True
-            continue
-        
-        # application.yml
-        if path.name == "application.yml" and not application_yml_added:
-            selected_files.append({
-                "path": str(path.relative_to(repo_root)),
-                "content": path.read_text(encoding="utf-8", errors="ignore")
-            })
-            application_yml_added = True
-            continue
-
-        # .java 파일만 대상
-        if path.suffix != ".java":
-            continue
-
-        # 핵심 디렉토리 하위인지 확인
-        if any(part in TARGET_DIRS for part in path.parts):
-            selected_files.append({
-                "path": str(path.relative_to(repo_root)),
-                "content": path.read_text(encoding="utf-8", errors="ignore")
-            })
-
-    return selected_files
+    for root, rel_dir, names in path_filter.iter_dirs(str(repo_root)):
+        root = Path(root)
+        in_target_dir = not TARGET_DIRS.isdisjoint(rel_dir.split("/"))
+
+        for name in names:
+            path = root / name
+            filename_lower = name.lower()
+
+            # README.md / application.yml은 1개만 (위치 무관)
+            # - 플래그는 실제로 yield한 뒤에 세움 → 읽기 실패 / 용량 초과로 건너뛰면 다음 파일을 사용
+            is_readme = filename_lower == "readme.md" and not readme_added
+            is_application_yml = name == "application.yml" and not application_yml_added
+            # 핵심 디렉토리 하위의 .java 파일만 대상
+            if not (is_readme or is_application_yml or (in_target_dir and name.endswith(".java"))):
+                continue
+
+            rel_path = str(path.relative_to(repo_root))
+
+            try:
+                if path.stat().st_size > max_file_bytes:
+                    print(f"SKIP (용량 초과) {rel_path}")
+                    continue
+
+                content, truncated = read_text_snippet(
+                    str(path),
+                    head_len=SNIPPET_HEAD_LEN,
+                    tail_len=SNIPPET_TAIL_LEN,
+                    threshold_bytes=max_file_bytes if needs_full_content(rel_path) else snippet_threshold_bytes
+                )
+            except OSError:
+                continue
+
+            if content is None:  # 바이너리
+                continue
+
+            yield {
+                "path": rel_path,
+                "content": content,
+                "truncated": truncated
+            }
+
+            if is_readme:
+                readme_added = True
+            elif is_application_yml:
+                application_yml_added = True
+
+def collect_spring_backend_files(repo_root: str, TARGET_DIRS) -> List[Dict[str, str]]:
+    """
+    iter_spring_backend_files 결과를 리스트로 한 번에 반환
+    [{'path': 상대경로, 'content': 파일내용}, ...]
+    """
+    return list(iter_spring_backend_files(repo_root, TARGET_DIRS=TARGET_DIRS))
 ##################################################################################
 
 
@@ -118,11 +202,68 @@ def collect_spring_backend_files(repo_root: str, TARGET_DIRS) -> List[Dict[str,
 def has_minimum_volume(content: str, min_lines: int = 40) -> bool:
     return content.count("\n") >= min_lines
 
+# 키워드 목록은 정규식 하나로 컴파일해서(목록별로 1번) 내용을 한 번만 훑음
 def is_meaningful_service(content: str, SERVICE_KEYWORDS) -> bool:
-    return any(keyword in content for keyword in SERVICE_KEYWORDS)
+    return keyword_matcher(SERVICE_KEYWORDS).search(content) is not None
 
 def is_meaningful_repository(content: str, REPOSITORY_KEYWORDS) -> bool:
-    return any(keyword in content for keyword in REPOSITORY_KEYWORDS)
+    return keyword_matcher(REPOSITORY_KEYWORDS).search(content) is not None
+
+
+def is_backend_file_kept(file: dict, SERVICE_KEYWORDS, REPOSITORY_KEYWORDS, min_service_lines: int = 40) -> bool:
+    """
+    Controller: 전부 유지
+    Service: 키워드 + 라인 수 기준 필터
+    Repository: 커스텀 쿼리 있는 것만 유지
+    """
+    path = file["path"]
+    content = file["content"]
+
+    # 0️⃣ README / yml 파일은 무조건 유지
+    if path.endswith((".md", ".yml", ".yaml")):
+        return True
+
+    layers = path_layers(path)
+
+    # 1️⃣ Controller는 무조건 유지
+    if "controller" in layers:
+        return True
+
+    # 2️⃣ Service 필터
+    if "service" in layers:
+        return (
+            is_meaningful_service(content, SERVICE_KEYWORDS=SERVICE_KEYWORDS)
+            and has_minimum_volume(content, min_service_lines)
+        )
+
+    # 3️⃣ Repository 필터
+    if "repository" in layers:
+        return is_meaningful_repository(content, REPOSITORY_KEYWORDS=REPOSITORY_KEYWORDS)
+
+    return False
+
+
+def iter_filter_backend_files(
+    selected_files,
+    SERVICE_KEYWORDS, REPOSITORY_KEYWORDS, min_service_lines: int = 40,
+    stats: dict | None = None
+):
+    """
+    filter_backend_files_by_keywords의 제너레이터 버전 (iter_spring_backend_files와 이어서 사용)
+    stats가 주어지면 {"selected": 1차 선별 수, "filtered": 2차 선별 수}를 누적
+    """
+    if stats is not None:
+        stats.setdefault("selected", 0)
+        stats.setdefault("filtered", 0)
+
+    for file in selected_files:
+        if stats is not None:
+            stats["selected"] += 1
+
+        if is_backend_file_kept(file, SERVICE_KEYWORDS, REPOSITORY_KEYWORDS, min_service_lines):
+            if stats is not None:
+                stats["filtered"] += 1
+            yield file
 
 
 def filter_backend_files_by_keywords(
@@ -134,40 +275,12 @@ def filter_backend_files_by_keywords(
     Service: 키워드 + 라인 수 기준 필터
     Repository: 커스텀 쿼리 있는 것만 유지
     """
-
-    filtered_files = []
-
-    for file in selected_files:
-        path = file["path"].replace("\\", "/")
-        content = file["content"]
-
-        # 0️⃣ README / yml 파일은 무조건 유지
-        if path.endswith(".md") or path.endswith(".yml") or path.endswith(".yaml"):
-            filtered_files.append(file)
-            continue
-        
-        # 1️⃣ Controller는 무조건 유지
-        if "/controller/" in path:
-            filtered_files.append(file)
-            continue
-
-        # 2️⃣ Service 필터
-        if "/service/" in path:
-            if (
-                is_meaningful_service(content, SERVICE_KEYWORDS=SERVICE_KEYWORDS)
-                and has_minimum_volume(content, min_service_lines)
-            ):
-                filtered_files.append(file)
-            continue
-
-        # 3️⃣ Repository 필터
-        if "/repository/" in path:
-            if is_meaningful_repository(content, REPOSITORY_KEYWORDS=REPOSITORY_KEYWORDS):
-                filtered_files.append(file)
-            continue
-
-
-    return filtered_files
+    return list(iter_filter_backend_files(
+        selected_files,
+        SERVICE_KEYWORDS=SERVICE_KEYWORDS,
+        REPOSITORY_KEYWORDS=REPOSITORY_KEYWORDS,
+        min_service_lines=min_service_lines
+    ))
 #################################################################
 
 
@@ -176,15 +289,29 @@ import requests
 import os
 
 
+FILE_PROMPT_VERSION = "backend-file-summary-v1"  # 아래 프롬프트를 수정하면 버전도 올려서 기존 캐시를 무효화
+
+@instrument("file_summary")
 def summarize_file_with_llm(
     path: str,
     content: str,
     *,
     gms_api_key: str,
     gms_base_url: str,
-    user_input
+    user_input,
+    cache: SummaryCache | None = None
 ) -> dict:
     snippet = make_snippet_for_llm(content)
+    annotate(path=path)
+
+    # 같은 snippet / 프롬프트 / 모델(GMS 엔드포인트) / user_input이면 캐시된 요약 재사용 (Gemini 호출 생략)
+    if cache is not None:
+        cache_key = SummaryCache.make_key(snippet, FILE_PROMPT_VERSION, gms_base_url, user_input)
+        cached = cache.get(cache_key)
+        annotate(cache_hit=cached is not None)
+        if cached is not None:
+            cached["path"] = path
+            return cached
 
     prompt = f"""
 너는 여러 소스 파일을 분석하여
@@ -272,39 +399,19 @@ def summarize_file_with_llm(
 }}
     """
 
-    headers = {
-        "Content-Type": "application/json",
-        "x-goog-api-key": gms_api_key,
-    }
-
-    payload = {
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": prompt
-                    }
-                ]
-            }
-        ]
-    }
-
-    response = requests.post(
-        gms_base_url,
-        headers=headers,
-        json=payload,
+    raw_text = generate_content(
+        prompt,
+        gms_api_key=gms_api_key,
+        gms_base_url=gms_base_url,
         timeout=60
     )
 
-    response.raise_for_status()
-    data = response.json()
-
-    # Gemini 응답에서 텍스트 추출
-    raw_text = data["candidates"][0]["content"]["parts"][0]["text"]
-
     # JSON 안전 파싱
-    result = safe_json_loads(raw_text)
+    result = parse_llm_json(raw_text, schema=FILE_SUMMARY_SCHEMA)
     result["path"] = path
+
+    if cache is not None:
+        cache.put(cache_key, result)
     return result
 
 ########################################################################################
@@ -319,9 +426,31 @@ def split_into_batches(items: list, batch_size: int):
 ########################################################################################
 
 
+### 토큰 예산 기반 배치 나누기 (summarize_batch_semantic 프롬프트가 context 한도를 넘지 않도록)
+BATCH_MAX_TOKENS = 24000  # 배치 1개에 들어가는 파일 요약들의 추정 토큰 합 상한 (프롬프트 본문 제외)
+
+def pack_summaries_into_batches(
+    summaries: list,
+    max_tokens: int = BATCH_MAX_TOKENS,
+    group_by_directory: bool = True
+) -> list:
+    """
+    파일 요약의 직렬화 크기를 추정해서 max_tokens까지 채운 배치들로 나눈다.
+    group_by_directory=True면 같은 디렉토리(controller/service/repository 등)의 파일을 같은 배치에 모음
+    """
+    return pack_into_batches(
+        items=summaries,
+        max_tokens=max_tokens,
+        group_fn=(lambda i: os.path.dirname(i.get("path", "").replace("\\", "/"))) if group_by_directory else None
+    )
+########################################################################################
+
+
 ### 배치 단위 의미 요약
+@instrument("batch_summary")
 def summarize_batch_semantic(batch_data: dict, *, gms_api_key: str, gms_base_url: str, user_input) -> dict:
     summaries = batch_data.get("summaries", [])
+    annotate(batch_id=batch_data.get("batch_id"), files=len(summaries))
 
     compact = [
         {
@@ -402,38 +531,15 @@ def summarize_batch_semantic(batch_data: dict, *, gms_api_key: str, gms_base_url
 {json.dumps(compact, ensure_ascii=False)}
 """
 
-    headers = {
-        "Content-Type": "application/json",
-        "x-goog-api-key": gms_api_key,
-    }
-
-    payload = {
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": prompt
-                    }
-                ]
-            }
-        ]
-    }
-
-    response = requests.post(
-        gms_base_url,
-        headers=headers,
-        json=payload,
+    raw_text = generate_content(
+        prompt,
+        gms_api_key=gms_api_key,
+        gms_base_url=gms_base_url,
         timeout=90
     )
 
-    response.raise_for_status()
-    data = response.json()
-
-    # Gemini 응답 텍스트 추출
-    raw_text = data["candidates"][0]["content"]["parts"][0]["text"]
-
     # JSON 안전 파싱
-    result = safe_json_loads(raw_text)
+    result = parse_llm_json(raw_text, schema=BATCH_SUMMARY_SCHEMA)
 
     # batch_id는 LLM 판단 대상이 아니므로 코드에서 주입
     result["batch_id"] = batch_data.get("batch_id")
@@ -443,6 +549,114 @@ def summarize_batch_semantic(batch_data: dict, *, gms_api_key: str, gms_base_url
 
 
 
+### 배치 요약이 많을 때 계층적으로 병합 (super-batch, Gemini)
+# 배치 요약 전체가 최종 프롬프트 예산(FINAL_INPUT_MAX_TOKENS)을 넘으면
+# 여러 배치 요약 → super-batch 요약 1개로 병렬 병합을 반복해서 예산 안으로 줄인다.
+FINAL_INPUT_MAX_TOKENS = 60000  # 최종 프롬프트에 들어가는 배치 요약들의 추정 토큰 합 상한
+
+@instrument("super_batch_summary")
+def merge_batch_summaries(batch_summaries: list, *, gms_api_key: str, gms_base_url: str, level: int, group_id: int) -> dict:
+    merged_batch_ids = [s.get("batch_id") for s in batch_summaries]
+    annotate(level=level, group_id=group_id, batches=len(batch_summaries))
+
+    prompt = f"""
+너는 여러 개의 "배치 단위 중간 요약(JSON)"을 입력으로 받아,
+하나의 배치 단위 중간 요약과 **같은 형식**으로 병합하는 AI다.
+병합 결과는 나중에 다른 배치 요약들과 함께 최종 프로젝트 분석 리포트로 합성된다.
+
+---
+
+## 병합 단계에서 해야 할 일
+
+### 1. 프로젝트 주제 후보 정리
+- 입력 배치들의 project_subject_candidates를 종합하여 1~3개 수준으로 정리하라.
+
+### 2. 기술 스택 집계
+- frameworks, libraries를 각각 유니크하게 합쳐라.
+
+### 3. 핵심 기능 후보 병합
+- 서로 다른 배치에 있더라도 같은 도메인 / 유사한 책임을 가진 기능은 하나로 병합하라.
+- 기능 수는 2~8개 이내로 제한하고, 근거가 약한 기능부터 생략하라.
+- 각 기능에 대해 feature_name, feature_description, implementation_method, job_value를 유지하라.
+
+### 4. 개선 방향 신호 통합
+- improvement_suggestions의 중복을 합쳐 1~5개로 정리하라.
+
+---
+
+## 출력 규칙 (중요)
+
+- 반드시 JSON 형식으로만 출력하라.
+- 설명 문장, 마크다운, 코드 블록을 절대 포함하지 마라.
+- 입력에 없는 기능이나 기술을 새로 만들어내지 마라.
+- 기술명은 영어로, 설명은 한국어로 작성하라.
+
+---
+
+## 출력 JSON 스키마
+
+{{
+  "batch_id": "",
+  "project_subject_candidates": [],
+  "frameworks": [],
+  "libraries": [],
+  "core_features": [
+    {{
+      "feature_name": "",
+      "feature_description": "",
+      "implementation_method": "",
+      "job_value": ""
+    }}
+  ],
+  "improvement_suggestions": []
+}}
+
+---
+
+[입력: 배치 단위 중간 요약]
+{json.dumps(batch_summaries, ensure_ascii=False)}
+"""
+
+    raw_text = generate_content(
+        prompt,
+        gms_api_key=gms_api_key,
+        gms_base_url=gms_base_url,
+        timeout=120
+    )
+
+    result = parse_llm_json(raw_text, schema=BATCH_SUMMARY_SCHEMA)
+    result["batch_id"] = f"L{level}-{group_id}"
+    result["merged_batch_ids"] = merged_batch_ids
+    return result
+
+
+def reduce_batch_summaries(
+    batch_semantic_summaries: list,
+    *,
+    gms_api_key: str,
+    gms_base_url: str,
+    max_tokens: int = FINAL_INPUT_MAX_TOKENS,
+    max_workers: int = 4
+) -> list:
+    # 병합 1건마다 429 재시도 (최종 분석 호출이 재시도되어도 병합 단계는 다시 돌지 않도록 분리)
+    return reduce_summaries_hierarchically(
+        batch_semantic_summaries,
+        merge_fn=lambda group, level, group_id: call_with_retry(
+            lambda: merge_batch_summaries(
+                group,
+                gms_api_key=gms_api_key,
+                gms_base_url=gms_base_url,
+                level=level,
+                group_id=group_id
+            )
+        ),
+        max_tokens=max_tokens,
+        max_workers=max_workers
+    )
+#######################################################################################
+
+
+
 ### 배치 단위로 요약된 내용들을 바탕으로 최종 레포 분석에 사용할 프롬프트 구성
 def build_final_project_prompt(
     batch_semantic_summaries: list,
@@ -545,6 +759,7 @@ def build_final_project_prompt(
 import requests
 
 ### 배치 의미 요약들을 바탕으로 프로젝트 최종 분석 수행 (Gemini)
+@instrument("final_report")
 def analyze_project_from_batches(
     batch_semantic_summaries: list,
     *,
@@ -563,41 +778,16 @@ def analyze_project_from_batches(
         repo_analysis_id=repo_analysis_id
     )
 
-    # 2️⃣ Gemini GMS 헤더
-    headers = {
-        "Content-Type": "application/json",
-        "x-goog-api-key": gms_api_key,
-    }
-
-    # 3️⃣ Gemini GMS payload
-    payload = {
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": prompt
-                    }
-                ]
-            }
-        ]
-    }
-
-    # 4️⃣ Gemini GMS 호출
-    response = requests.post(
-        gms_base_url,
-        headers=headers,
-        json=payload,
+    # 2️⃣ Gemini GMS 호출 (공통 rate limiter 경유)
+    raw_text = generate_content(
+        prompt,
+        gms_api_key=gms_api_key,
+        gms_base_url=gms_base_url,
         timeout=180
     )
 
-    response.raise_for_status()
-    data = response.json()
-
-    # 5️⃣ 응답 텍스트 추출
-    raw_text = data["candidates"][0]["content"]["parts"][0]["text"]
-
-    # 6️⃣ JSON 안전 파싱
-    return safe_json_loads(raw_text)
+    # 3️⃣ JSON 안전 파싱
+    return parse_llm_json(raw_text, schema=FINAL_REPORT_SCHEMA)
 
 #################################################################
 
@@ -775,36 +965,17 @@ def summarize_commit_style_with_llm(
 }}
 """
 
-    headers = {
-        "Content-Type": "application/json",
-        "x-goog-api-key": gms_api_key,
-    }
-
-    payload = {
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": prompt
-                    }
-                ]
-            }
-        ]
-    }
-
-    response = requests.post(
-        gms_base_url,
-        headers=headers,
-        json=payload,
+    raw_text = generate_content(
+        prompt,
+        gms_api_key=gms_api_key,
+        gms_base_url=gms_base_url,
         timeout=90
     )
 
-    response.raise_for_status()
-    data = response.json()
-
-    return data["candidates"][0]["content"]["parts"][0]["text"].strip()
+    return raw_text.strip()
 ########################################################
 
+@instrument("commit_style")
 def analyze_commit_style(
     commit_metadata: dict,
     *,
@@ -827,5 +998,5 @@ def analyze_commit_style(
         gms_base_url=gms_base_url
     )
 
-    return safe_json_loads(raw)
+    return parse_llm_json(raw, schema=COMMIT_STYLE_SCHEMA)
 
@@ -0,0 +1,116 @@
+import os
+import sys
+import json
+import time
+import runpy
+import argparse
+import functools
+import threading
+from pathlib import Path
+
+try:
+    import resource  # 윈도우에는 없음 → peak RSS는 None
+except ImportError:
+    resource = None
+
+
+### run_benchmark.py가 subprocess로 실행하는 드라이버 래퍼
+# 분석 드라이버 스크립트를 그대로 실행(runpy)하되, 실행 전에 *_method 모듈의 단계 함수들을
+# 호출 시간을 기록하는 함수로 바꿔치기해서 단계별 latency를 수집한다.
+# (드라이버는 from ... import 로 함수를 가져오므로 import 전에 모듈 속성을 바꾸면 됨)
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # 문경진
+
+PIPELINES = {
+    "single": {
+        "driver": BASE_DIR / "github_crawl" / "single_repo_analysis.py",
+        "method_module": "single_analysis_method",
+        "stages": [
+            "summarize_file_with_llm",
+            "summarize_files_concurrently",
+            "summarize_batch_semantic",
+            "reduce_batch_summaries",
+            "analyze_project_from_batches",
+            "analyze_commit_style",
+            "get_repo_main_languages"
+        ]
+    },
+    "backend": {
+        "driver": BASE_DIR / "backend_single_analysis" / "backend_java_single_analysis.py",
+        "method_module": "backend_single_analysis_method",
+        "stages": [
+            "summarize_file_with_llm",
+            "summarize_batch_semantic",
+            "reduce_batch_summaries",
+            "analyze_project_from_batches",
+            "analyze_commit_style"
+        ]
+    }
+}
+
+timings = {}  # {stage: [초, ...]}
+errors = {}   # {stage: 실패 횟수}
+_lock = threading.Lock()
+
+
+def timed(stage: str, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            with _lock:
+                errors[stage] = errors.get(stage, 0) + 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with _lock:
+                timings.setdefault(stage, []).append(elapsed)
+    return wrapper
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux는 KB, macOS는 bytes 단위
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run(pipeline: str, output_path: str):
+    config = PIPELINES[pipeline]
+    driver = config["driver"]
+
+    sys.path[:0] = [str(driver.parent), str(BASE_DIR)]
+    module = __import__(config["method_module"])
+    for stage in config["stages"]:
+        setattr(module, stage, timed(stage, getattr(module, stage)))
+
+    start = time.perf_counter()
+    failed = None
+    try:
+        runpy.run_path(str(driver), run_name="__main__")
+    except BaseException as e:
+        failed = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "pipeline": pipeline,
+                "wall_seconds": time.perf_counter() - start,
+                "peak_rss_mb": peak_rss_mb(),
+                "timings": timings,
+                "errors": errors,
+                "failed": failed
+            }, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pipeline", choices=list(PIPELINES), required=True)
+    parser.add_argument("--output", required=True, help="단계별 측정 결과 json 경로")
+    args = parser.parse_args()
+
+    os.chdir(PIPELINES[args.pipeline]["driver"].parent)
+    run(args.pipeline, args.output)
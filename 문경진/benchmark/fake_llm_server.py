@@ -0,0 +1,227 @@
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # 문경진/common 공통 모듈 경로
+from common.token_utils import estimate_tokens
+
+
+### 벤치마크용 로컬 LLM 대역 서버 (실제 쿼터를 쓰지 않고 파이프라인 처리량 측정)
+# - POST .../responses           : OpenAI Responses API (client.responses.create)
+# - POST .../chat/completions    : OpenAI Chat Completions API
+# - POST ...:generateContent     : Gemini REST (common/gms.py의 requests.post)
+# - GET  /repos/{owner}/{repo}/languages : GitHub 언어 API
+# - GET  /stats, POST /stats/reset       : 요청 수 / 토큰 수 / 429 횟수
+# 응답 지연(latency + jitter)과 429 비율(Retry-After 포함)을 설정할 수 있음
+
+# 파이프라인 어느 단계에서 받아도 파싱/키 접근이 깨지지 않는 범용 JSON 응답
+FAKE_RESULT = {
+    "file": {"path": "", "role": "synthetic"},
+    "tech_stack": {"languages": [], "frameworks": []},
+    "collaboration_type": "team",
+    "summary": ""
+}
+
+
+class FakeLLMStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.throttled = 0
+            self.prompt_tokens = 0
+            self.output_tokens = 0
+
+    def record(self, kind: str, prompt_tokens: int = 0, output_tokens: int = 0, throttled: bool = False):
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+            if throttled:
+                self.throttled += 1
+            else:
+                self.prompt_tokens += prompt_tokens
+                self.output_tokens += output_tokens
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "throttled": self.throttled,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens
+            }
+
+
+def make_handler(stats: FakeLLMStats, latency_ms: float, jitter_ms: float, throttle_rate: float,
+                 retry_after: float, output_tokens: int, rng: random.Random):
+
+    # 출력 토큰 수만큼 채운 응답 텍스트 (estimate_tokens 기준 ascii 4자 ≈ 1토큰)
+    result = dict(FAKE_RESULT, summary="x" * (output_tokens * 4))
+    output_text = json.dumps(result, ensure_ascii=False)
+
+    class FakeLLMHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status: int, body: dict, headers: dict | None = None):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.startswith("/stats"):
+                self.send_json(200, stats.snapshot())
+            elif self.path.endswith("/languages"):
+                stats.record("languages")
+                self.send_json(200, {"Java": 502130, "Python": 27171, "JavaScript": 12000})
+            else:
+                self.send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+
+            if self.path.startswith("/stats/reset"):
+                stats.reset()
+                self.send_json(200, {"ok": True})
+                return
+
+            if self.path.endswith("/responses"):
+                kind, prompt = "responses", body.get("input", "")
+            elif self.path.endswith("/chat/completions"):
+                kind, prompt = "chat", body.get("messages", [])
+            elif "generateContent" in self.path:
+                kind, prompt = "gemini", body.get("contents", [])
+            else:
+                self.send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+                return
+
+            time.sleep((latency_ms + rng.uniform(0, jitter_ms)) / 1000)
+
+            if throttle_rate and rng.random() < throttle_rate:
+                stats.record(kind, throttled=True)
+                self.send_json(429, {
+                    "error": {
+                        "code": 429,
+                        "message": "Resource has been exhausted (fake)",
+                        "status": "RESOURCE_EXHAUSTED",
+                        "details": [{"retryDelay": f"{retry_after:g}s"}]
+                    }
+                }, headers={"Retry-After": f"{retry_after:g}"})
+                return
+
+            prompt_tokens = estimate_tokens(prompt)
+            stats.record(kind, prompt_tokens=prompt_tokens, output_tokens=output_tokens)
+            usage = {"input_tokens": prompt_tokens, "output_tokens": output_tokens, "total_tokens": prompt_tokens + output_tokens}
+
+            if kind == "responses":
+                self.send_json(200, {
+                    "id": "resp_fake",
+                    "object": "response",
+                    "created_at": int(time.time()),
+                    "status": "completed",
+                    "model": body.get("model", "fake"),
+                    "output": [{
+                        "id": "msg_fake",
+                        "type": "message",
+                        "role": "assistant",
+                        "status": "completed",
+                        "content": [{"type": "output_text", "text": output_text, "annotations": []}]
+                    }],
+                    "parallel_tool_calls": False,
+                    "tool_choice": "auto",
+                    "tools": [],
+                    "usage": usage
+                })
+            elif kind == "chat":
+                self.send_json(200, {
+                    "id": "chatcmpl_fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": output_text},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": output_tokens,
+                        "total_tokens": prompt_tokens + output_tokens
+                    }
+                })
+            else:
+                self.send_json(200, {
+                    "candidates": [{"content": {"parts": [{"text": output_text}], "role": "model"}}],
+                    "usageMetadata": {
+                        "promptTokenCount": prompt_tokens,
+                        "candidatesTokenCount": output_tokens,
+                        "totalTokenCount": prompt_tokens + output_tokens
+                    }
+                })
+
+    return FakeLLMHandler
+
+
+### 백그라운드 스레드로 서버 실행 → (server, stats) 반환, base url은 f"http://{host}:{server.server_port}"
+def start_fake_llm_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency_ms: float = 200,
+    jitter_ms: float = 100,
+    throttle_rate: float = 0.0,
+    retry_after: float = 1.0,
+    output_tokens: int = 300,
+    seed: int = 0
+):
+    stats = FakeLLMStats()
+    handler = make_handler(stats, latency_ms, jitter_ms, throttle_rate, retry_after, output_tokens, random.Random(seed))
+
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크용 로컬 LLM 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429를 돌려줄 요청 비율 (0~1)")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--output-tokens", type=int, default=300)
+    args = parser.parse_args()
+
+    server, _ = start_fake_llm_server(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        output_tokens=args.output_tokens
+    )
+    print(f"fake LLM server: http://{args.host}:{server.server_port}")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,158 @@
+import os
+import json
+import random
+import argparse
+import subprocess
+from datetime import datetime
+
+
+### 벤치마크용 가짜 레포 생성 (파일 수 / 구성 / 큰 파일 비율을 조절)
+# - kind="spring": src/main/java/.../{controller,service,repository,dto,entity} 구조 (backend 파이프라인 선별 통과용)
+# - kind="mixed" : spring 구조 + python / js / ts / md / yml 파일 섞음 (single 파이프라인용)
+# - git 커밋 여러 개로 나눠 올리고, clone_commit.py와 같은 형식의 commit metadata json도 같이 생성
+
+DOMAINS = ["user", "order", "payment", "goal", "pocket", "transfer", "notice", "auth", "report", "search"]
+SPRING_LAYERS = ["controller", "service", "repository", "dto", "entity"]
+MIXED_EXTENSIONS = [".py", ".js", ".ts", ".md", ".yml"]
+COMMIT_PREFIXES = ["feat", "fix", "refactor", "docs", "test", "chore"]
+AUTHORS = ["kim", "lee", "park", "choi"]
+
+
+def java_source(package: str, layer: str, name: str, rng: random.Random, lines: int) -> str:
+    cls = f"{name.capitalize()}{layer.capitalize()}"
+    body = []
+
+    for i in range(lines):
+        if layer == "service":
+            body.append(f"    @Transactional\n    public void process{i}(Long id) {{\n        if (id == null) throw new IllegalArgumentException(\"id\");\n        for (int j = 0; j < {i}; j++) {{ validate(j); }}\n    }}")
+        elif layer == "repository":
+            body.append(f"    @Query(\"select e from {cls} e join fetch e.owner where e.id = :id{i}\")\n    Optional<Object> findBy{name.capitalize()}{i}(Long id);")
+        else:
+            body.append(f"    private String field{i} = \"{rng.random():.6f}\";")
+
+    kind = "interface" if layer == "repository" else "class"
+    return f"package {package}.{layer};\n\nimport java.util.Optional;\n\npublic {kind} {cls} {{\n" + "\n".join(body) + "\n}\n"
+
+
+def text_source(ext: str, name: str, rng: random.Random, lines: int) -> str:
+    if ext == ".py":
+        return "\n".join(f"def {name}_{i}(x):\n    return x * {rng.randint(1, 99)}\n" for i in range(lines))
+    if ext in (".js", ".ts"):
+        return "\n".join(f"export function {name}{i}(x) {{\n  return x * {rng.randint(1, 99)};\n}}\n" for i in range(lines))
+    if ext == ".yml":
+        return "\n".join(f"{name}_{i}: {rng.randint(1, 9999)}" for i in range(lines)) + "\n"
+    return f"# {name}\n\n" + "\n".join(f"- {name} 항목 {i}" for i in range(lines)) + "\n"
+
+
+def iter_synthetic_files(n_files: int, kind: str, rng: random.Random, large_file_ratio: float):
+    for idx in range(n_files):
+        domain = DOMAINS[idx % len(DOMAINS)]
+        name = f"{domain}{idx}"
+        large = rng.random() < large_file_ratio
+        lines = rng.randint(2000, 4000) if large else rng.randint(10, 60)
+
+        if kind == "spring" or idx % 2 == 0:
+            layer = SPRING_LAYERS[(idx // len(DOMAINS)) % len(SPRING_LAYERS)]
+            package = f"com.example.{domain}"
+            path = os.path.join("src", "main", "java", *package.split("."), layer, f"{name.capitalize()}{layer.capitalize()}.java")
+            yield path, java_source(package, layer, name, rng, lines)
+        else:
+            ext = MIXED_EXTENSIONS[idx % len(MIXED_EXTENSIONS)]
+            yield os.path.join("app", domain, f"{name}{ext}"), text_source(ext, name, rng, lines)
+
+
+def run_git(repo_path: str, *args: str, **env):
+    subprocess.run(
+        ["git", "-C", repo_path, *args],
+        check=True,
+        capture_output=True,
+        env={**os.environ, **env}
+    )
+
+
+def make_synthetic_repo(
+    root: str,
+    n_files: int,
+    kind: str = "mixed",
+    n_commits: int = 20,
+    large_file_ratio: float = 0.02,
+    seed: int = 0,
+    owner: str = "bench",
+    repo: str | None = None
+) -> dict:
+    """
+    root/{repo} 에 레포를 만들고 {"repo_path", "commit_metadata_path", "owner", "repo"} 반환.
+    같은 설정으로 이미 만들어져 있으면 재사용한다.
+    """
+    repo = repo or f"synthetic_{kind}_{n_files}"
+    repo_path = os.path.join(root, repo)
+    commit_metadata_path = os.path.join(root, f"{owner}_{repo}_commit_metadata.json")
+    info = {"repo_path": repo_path, "commit_metadata_path": commit_metadata_path, "owner": owner, "repo": repo}
+
+    if os.path.exists(os.path.join(repo_path, ".git")) and os.path.exists(commit_metadata_path):
+        return info
+
+    rng = random.Random(seed)
+    os.makedirs(repo_path, exist_ok=True)
+    run_git(repo_path, "init", "--quiet")
+
+    files = list(iter_synthetic_files(n_files, kind, rng, large_file_ratio))
+    chunk = max(1, -(-len(files) // n_commits))
+    commits = []
+
+    for c, start in enumerate(range(0, len(files), chunk)):
+        for rel_path, content in files[start:start + chunk]:
+            full_path = os.path.join(repo_path, rel_path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+        author = AUTHORS[c % len(AUTHORS)]
+        message = f"{COMMIT_PREFIXES[c % len(COMMIT_PREFIXES)]}: synthetic change {c}"
+        date = datetime(2025, 1, 1 + c % 28, 12, 0, 0).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        run_git(repo_path, "add", "--all")
+        run_git(
+            repo_path,
+            "-c", f"user.name={author}", "-c", f"user.email={author}@example.com",
+            "commit", "--quiet", "-m", message,
+            GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date
+        )
+        commits.append({"message": message, "author_name": author, "author_date": date})
+
+    # clone_commit.py save_to_json과 같은 형식 (최신 커밋이 앞)
+    with open(commit_metadata_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "repository": f"{owner}/{repo}",
+                "generated_at": datetime.utcnow().isoformat(),
+                "total_commits": len(commits),
+                "commits": commits[::-1]
+            },
+            f,
+            ensure_ascii=False,
+            indent=2
+        )
+
+    return info
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크용 가짜 레포 생성")
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--kind", choices=["mixed", "spring"], default="mixed")
+    parser.add_argument("--commits", type=int, default=20)
+    parser.add_argument("--large-file-ratio", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    info = make_synthetic_repo(
+        root=args.root,
+        n_files=args.files,
+        kind=args.kind,
+        n_commits=args.commits,
+        large_file_ratio=args.large_file_ratio,
+        seed=args.seed
+    )
+    print(json.dumps(info, ensure_ascii=False, indent=2))
@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import argparse
+import subprocess
+import urllib.request
+from pathlib import Path
+
+from fake_llm_server import start_fake_llm_server
+from make_synthetic_repo import make_synthetic_repo
+
+
+### 파이프라인 end-to-end 벤치마크
+# 가짜 레포(파일 수별) × 파이프라인(single / backend)마다 드라이버를 subprocess로 실행하고,
+# LLM / Gemini / GitHub 호출은 로컬 fake 서버(fake_llm_server.py)로 보낸다.
+# 보고 항목: files/sec, 단계별 p50/p95 latency, peak RSS, 보낸 토큰 수, 429 횟수
+#
+# 사용 예:
+#   python run_benchmark.py --sizes 100 1000 --latency-ms 200 --throttle-rate 0.05
+#   python run_benchmark.py --sizes 10000 --pipelines single --latency-ms 50
+
+BENCH_DIR = Path(__file__).resolve().parent
+PIPELINE_REPO_KIND = {"single": "mixed", "backend": "spring"}
+# 파일별 요약 checkpoint가 저장되는 폴더 (ANALYSIS_OUTPUT_DIR 기준)
+# files/sec는 이 파일 수로 계산 → 429 재시도 / 실패 호출은 빼고, 정적 분석으로 LLM 호출 없이 요약한 파일은 포함
+PIPELINE_FILE_SUMMARY_DIR = {"single": "repo_divided_summary", "backend": "individual_summaries"}
+
+
+def percentile(values: list, p: float) -> float | None:
+    # nearest-rank
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def fetch_stats(base_url: str, reset: bool = False) -> dict:
+    request = urllib.request.Request(
+        f"{base_url}/stats/reset" if reset else f"{base_url}/stats",
+        data=b"{}" if reset else None,
+        method="POST" if reset else "GET"
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def count_file_summaries(summary_dir: str) -> int:
+    if not os.path.isdir(summary_dir):
+        return 0
+    return sum(1 for name in os.listdir(summary_dir) if name.endswith(".json"))
+
+
+def run_one(pipeline: str, n_files: int, base_url: str, work_dir: str, args) -> dict:
+    repo_info = make_synthetic_repo(
+        root=os.path.join(work_dir, "repos"),
+        n_files=n_files,
+        kind=PIPELINE_REPO_KIND[pipeline],
+        seed=args.seed
+    )
+
+    run_dir = os.path.join(work_dir, "runs", f"{pipeline}_{n_files}")
+    shutil.rmtree(run_dir, ignore_errors=True)
+    os.makedirs(run_dir)
+
+    env = {
+        **os.environ,
+        "PYTHONIOENCODING": "utf-8",
+        "ANALYSIS_OWNER": repo_info["owner"],
+        "ANALYSIS_REPO": repo_info["repo"],
+        "ANALYSIS_REPO_PATH": repo_info["repo_path"],
+        "ANALYSIS_OUTPUT_DIR": os.path.join(run_dir, "output"),
+        "ANALYSIS_MAX_WORKERS": str(args.workers),
+        "ANALYSIS_INCREMENTAL": "0",
+        "SUMMARY_CACHE_DIR": os.path.join(run_dir, "summary_cache"),
+        "COMMIT_METADATA_PATH": repo_info["commit_metadata_path"],
+        "GITHUB_API_URL": base_url,
+        "GMS_API_KEY": "bench",
+        "GMS_REQUESTS_PER_MIN": str(args.gms_rpm),
+        "GMS_TOKENS_PER_MIN": str(args.gms_tpm),
+    }
+    # single은 OpenAI SDK base_url, backend는 Gemini generateContent 전체 url
+    if pipeline == "single":
+        env["GMS_BASE_URL"] = f"{base_url}/v1"
+    else:
+        env["GMS_BASE_URL"] = f"{base_url}/v1beta/models/gemini-2.5-flash:generateContent"
+
+    fetch_stats(base_url, reset=True)
+
+    timings_path = os.path.join(run_dir, "timings.json")
+    log_path = os.path.join(run_dir, "driver.log")
+    print(f"▶ {pipeline} / {n_files} files (log: {log_path})")
+
+    with open(log_path, "w", encoding="utf-8") as log:
+        completed = subprocess.run(
+            [sys.executable, str(BENCH_DIR / "bench_driver.py"), "--pipeline", pipeline, "--output", timings_path],
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            timeout=args.timeout
+        )
+
+    server_stats = fetch_stats(base_url)
+
+    # 드라이버 import 단계에서 죽으면 측정 파일이 없음
+    if os.path.exists(timings_path):
+        with open(timings_path, encoding="utf-8") as f:
+            measured = json.load(f)
+    else:
+        measured = {"wall_seconds": 0, "peak_rss_mb": None, "timings": {}, "errors": {}, "failed": f"see {log_path}"}
+
+    files = count_file_summaries(os.path.join(env["ANALYSIS_OUTPUT_DIR"], PIPELINE_FILE_SUMMARY_DIR[pipeline]))
+    wall = measured["wall_seconds"]
+
+    return {
+        "pipeline": pipeline,
+        "repo_files": n_files,
+        "summarized_files": files,
+        "returncode": completed.returncode,
+        "failed": measured["failed"],
+        "wall_seconds": round(wall, 2),
+        "files_per_sec": round(files / wall, 2) if wall else None,
+        "peak_rss_mb": measured["peak_rss_mb"],
+        "prompt_tokens_sent": server_stats["prompt_tokens"],
+        "llm_requests": server_stats["requests"],
+        "throttled": server_stats["throttled"],
+        "stage_errors": measured["errors"],
+        "stages": {
+            stage: {
+                "count": len(values),
+                "p50": round(percentile(values, 50), 3),
+                "p95": round(percentile(values, 95), 3),
+                "total": round(sum(values), 2)
+            }
+            for stage, values in measured["timings"].items()
+        }
+    }
+
+
+def print_report(results: list):
+    for r in results:
+        status = "OK" if r["returncode"] == 0 else f"FAILED ({r['failed']})"
+        print(f"\n=== {r['pipeline']} / {r['repo_files']} files : {status}")
+        print(f"  files/sec        : {r['files_per_sec']} ({r['summarized_files']} files in {r['wall_seconds']}s)")
+        print(f"  peak RSS (MB)    : {r['peak_rss_mb']}")
+        print(f"  prompt tokens    : {r['prompt_tokens_sent']}")
+        print(f"  requests / 429   : {r['llm_requests']} / {r['throttled']}")
+        for stage, s in r["stages"].items():
+            print(f"  {stage:<30} n={s['count']:<6} p50={s['p50']:<8} p95={s['p95']:<8} total={s['total']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="분석 파이프라인 end-to-end 벤치마크 (로컬 fake LLM 서버 사용)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--pipelines", nargs="+", choices=list(PIPELINE_REPO_KIND), default=list(PIPELINE_REPO_KIND))
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429를 돌려줄 요청 비율 (0~1)")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--output-tokens", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=8, help="single 파이프라인 ANALYSIS_MAX_WORKERS")
+    parser.add_argument("--gms-rpm", type=float, default=6000, help="backend 파이프라인 GMS_REQUESTS_PER_MIN")
+    parser.add_argument("--gms-tpm", type=float, default=100_000_000, help="backend 파이프라인 GMS_TOKENS_PER_MIN")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=3600, help="실행 1건당 제한 시간(초)")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "repo_analysis_bench"), help="가짜 레포 / 실행 결과 저장 경로")
+    parser.add_argument("--output", default=None, help="결과 json 경로 (기본: work-dir/results.json)")
+    args = parser.parse_args()
+
+    server, _ = start_fake_llm_server(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        output_tokens=args.output_tokens,
+        seed=args.seed
+    )
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    print(f"fake LLM server: {base_url}")
+
+    results = []
+    try:
+        for pipeline in args.pipelines:
+            for n_files in args.sizes:
+                results.append(run_one(pipeline, n_files, base_url, args.work_dir, args))
+    finally:
+        server.shutdown()
+
+    print_report(results)
+
+    output_path = args.output or os.path.join(args.work_dir, "results.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output_path}")
@@ -0,0 +1 @@
+### 레포 분석 파이프라인(github_crawl, backend_single_analysis 등)에서 공통으로 사용하는 모듈
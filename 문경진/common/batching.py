@@ -0,0 +1,65 @@
+import json
+
+from common.token_utils import estimate_tokens
+
+
+### 토큰 예산 기반 배치 패킹 (고정 개수 split_into_batches 대체)
+def pack_into_batches(
+    items: list,
+    max_tokens: int,
+    size_fn=None,
+    group_fn=None,
+    max_items: int | None = None
+) -> list:
+    """
+    items를 순서대로 채워 넣되, 배치의 추정 토큰 합이 max_tokens를 넘지 않게 나눈다.
+    - size_fn: 아이템 1개의 토큰 수 (기본: JSON 직렬화 기준 estimate_tokens)
+    - group_fn: 같은 키(디렉토리, cluster key 등)의 아이템을 인접하게 모으고,
+      그룹이 통째로 새 배치에 들어갈 수 있으면 그룹을 쪼개지 않음
+    - max_items: 배치당 최대 아이템 수 (선택)
+    - 한 아이템만으로 max_tokens를 넘으면 단독 배치로 둠
+    """
+    if size_fn is None:
+        size_fn = lambda item: estimate_tokens(json.dumps(item, ensure_ascii=False))
+
+    # 그룹 단위로 모으기 (그룹 순서는 처음 등장한 순서 유지)
+    if group_fn is not None:
+        groups = {}
+        for item in items:
+            groups.setdefault(group_fn(item), []).append(item)
+        grouped = list(groups.values())
+    else:
+        grouped = [items]
+
+    batches = []
+    current, current_tokens = [], 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            batches.append(current)
+        current, current_tokens = [], 0
+
+    for group in grouped:
+        sizes = [size_fn(item) for item in group]
+        group_tokens = sum(sizes)
+
+        # 현재 배치에는 안 들어가지만 빈 배치에는 통째로 들어가는 그룹 → 새 배치에서 시작
+        fits_current = current_tokens + group_tokens <= max_tokens and (
+            max_items is None or len(current) + len(group) <= max_items
+        )
+        fits_alone = group_tokens <= max_tokens and (max_items is None or len(group) <= max_items)
+        if group_fn is not None and not fits_current and fits_alone:
+            flush()
+
+        for item, size in zip(group, sizes):
+            too_big = current and current_tokens + size > max_tokens
+            too_many = max_items is not None and len(current) >= max_items
+            if too_big or too_many:
+                flush()
+
+            current.append(item)
+            current_tokens += size
+
+    flush()
+    return batches
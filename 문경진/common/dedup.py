@@ -0,0 +1,97 @@
+import re
+import hashlib
+
+
+### 중복 / 유사 중복 파일 탐지
+# 복붙한 모듈, vendored 라이브러리, 반복되는 boilerplate는 파일마다 LLM 요약을 따로 받을 필요가 없음
+# - 완전 중복: 공백 정규화 후 내용 해시가 같음
+# - 유사 중복: 토큰 3-gram SimHash(64bit)의 해밍 거리가 max_distance 이하
+#   (64bit를 max_distance + 1개 band로 나누면, 거리가 max_distance 이하인 두 값은
+#    적어도 한 band가 완전히 같음 → band 값으로 후보만 찾아서 비교)
+#
+# 사용 예:
+#   index = DuplicateIndex()
+#   for f in files:
+#       representative = index.find_or_add(f["path"], f["content"])
+#       if representative is None: ...  # 처음 보는 내용 → 요약
+#       else: ...                       # representative의 요약을 재사용
+
+SIMHASH_BITS = 64
+TOKEN_RE = re.compile(r"\w+")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def content_hash(text: str) -> str:
+    normalized = WHITESPACE_RE.sub(" ", text).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(tokens: list, shingle_size: int = 3) -> int:
+    features = {" ".join(tokens[i:i + shingle_size]) for i in range(max(1, len(tokens) - shingle_size + 1))}
+
+    counts = [0] * SIMHASH_BITS
+    for feature in features:
+        h = _feature_hash(feature)
+        for bit in range(SIMHASH_BITS):
+            counts[bit] += 1 if (h >> bit) & 1 else -1
+
+    return sum(1 << bit for bit, count in enumerate(counts) if count > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class DuplicateIndex:
+    def __init__(self, near_duplicates: bool = True, max_distance: int = 3, min_tokens: int = 50):
+        """
+        near_duplicates: False면 완전 중복만 탐지
+        max_distance: 유사 중복으로 볼 SimHash 해밍 거리 상한
+        min_tokens: 이보다 토큰이 적은 파일은 유사 중복 비교 안 함 (짧은 파일은 SimHash가 불안정)
+        """
+        self.near_duplicates = near_duplicates
+        self.max_distance = max_distance
+        self.min_tokens = min_tokens
+
+        self.bands = max_distance + 1
+        self.band_bits = SIMHASH_BITS // self.bands
+        self.band_mask = (1 << self.band_bits) - 1
+
+        self.by_hash = {}  # 내용 해시 → 대표 경로
+        self.band_tables = [{} for _ in range(self.bands)]  # band 값 → [(simhash, 대표 경로), ...]
+        self.stats = {"exact": 0, "near": 0, "unique": 0}
+
+    def _band_keys(self, fingerprint: int):
+        return [(fingerprint >> (i * self.band_bits)) & self.band_mask for i in range(self.bands)]
+
+    def find_or_add(self, path: str, content: str) -> str | None:
+        """중복이면 대표 파일 경로, 처음 보는 내용이면 대표로 등록하고 None"""
+        digest = content_hash(content)
+        representative = self.by_hash.get(digest)
+        if representative is not None:
+            self.stats["exact"] += 1
+            return representative
+
+        fingerprint = None
+        if self.near_duplicates:
+            tokens = TOKEN_RE.findall(content.lower())
+            if len(tokens) >= self.min_tokens:
+                fingerprint = simhash(tokens)
+                band_keys = self._band_keys(fingerprint)
+
+                for table, key in zip(self.band_tables, band_keys):
+                    for candidate, candidate_path in table.get(key, ()):
+                        if hamming_distance(fingerprint, candidate) <= self.max_distance:
+                            self.stats["near"] += 1
+                            return candidate_path
+
+        self.by_hash[digest] = path
+        if fingerprint is not None:
+            for table, key in zip(self.band_tables, band_keys):
+                table.setdefault(key, []).append((fingerprint, path))
+        self.stats["unique"] += 1
+        return None
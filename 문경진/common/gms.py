@@ -0,0 +1,140 @@
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+
+from common.rate_limiter import RateLimiter, parse_retry_after
+from common.token_utils import estimate_tokens
+from common.instrumentation import record_llm_usage
+
+
+load_dotenv()
+
+### GMS(Gemini) 호출 공통 rate limiter
+# 모든 Gemini REST 호출이 이 limiter를 공유해서, 고정 sleep 대신 쿼터가 허용하는 최대 속도로 호출
+gms_rate_limiter = RateLimiter(
+    requests_per_min=float(os.getenv("GMS_REQUESTS_PER_MIN", "30")),
+    tokens_per_min=float(os.getenv("GMS_TOKENS_PER_MIN", "250000"))
+)
+
+
+### GMS(Gemini) REST 클라이언트
+# 호출마다 requests.post로 새 연결(TCP + TLS handshake)을 맺지 않도록
+# keep-alive 연결 풀을 가진 requests.Session 하나를 공유한다.
+# - pool_size: 유지할 연결 수 (동시 호출 수보다 작으면 넘치는 연결은 쓰고 버림)
+# - connect_timeout / read_timeout: 연결 / 응답 대기 제한 시간(초)
+# - connect_retries: 연결 실패만 재시도 (요청이 전송된 뒤의 실패는 중복 과금 위험이 있어 재시도 안 함)
+class GMSClient:
+    def __init__(
+        self,
+        gms_api_key: str | None = None,
+        gms_base_url: str | None = None,
+        pool_size: int = 16,
+        connect_timeout: float = 5,
+        read_timeout: float = 60,
+        connect_retries: int = 2,
+        limiter: RateLimiter | None = None
+    ):
+        self.gms_api_key = gms_api_key
+        self.gms_base_url = gms_base_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.limiter = limiter or gms_rate_limiter
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=None, connect=connect_retries, read=0, status=0, other=0, backoff_factor=0.5)
+        )
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def generate_content(
+        self,
+        prompt: str,
+        *,
+        gms_api_key: str | None = None,
+        gms_base_url: str | None = None,
+        timeout: float | None = None,
+        limiter: RateLimiter | None = None
+    ) -> str:
+        """
+        Gemini generateContent 호출 후 응답 텍스트 반환.
+        gms_api_key / gms_base_url / timeout / limiter를 넘기지 않으면 클라이언트 기본값 사용
+        """
+        limiter = limiter or self.limiter
+
+        estimated_tokens = estimate_tokens(prompt)
+        limiter.acquire(estimated_tokens)
+
+        payload = {
+            "contents": [
+                {
+                    "parts": [
+                        {
+                            "text": prompt
+                        }
+                    ]
+                }
+            ]
+        }
+
+        response = self.session.post(
+            gms_base_url or self.gms_base_url,
+            headers={"x-goog-api-key": gms_api_key or self.gms_api_key},
+            json=payload,
+            timeout=(self.connect_timeout, timeout or self.read_timeout)
+        )
+
+        # 429 → limiter 전체 일시정지 + 속도 감소 후 예외 (재시도는 call_with_retry 담당)
+        if response.status_code == 429:
+            limiter.on_throttle(parse_retry_after(response))
+        response.raise_for_status()
+
+        data = response.json()
+        limiter.on_success()
+
+        # 응답 usage로 토큰 예산 보정 (프롬프트 추정치 → 실제 입력+출력 토큰)
+        usage = data.get("usageMetadata", {})
+        if usage.get("totalTokenCount"):
+            limiter.adjust_tokens(usage["totalTokenCount"] - estimated_tokens)
+
+        text = data["candidates"][0]["content"]["parts"][0]["text"]
+        record_llm_usage(prompt=prompt, response_text=text, usage=usage)
+        return text
+
+    def close(self):
+        self.session.close()
+#################################################################
+
+
+# 모든 Gemini 호출 지점이 공유하는 기본 클라이언트 (연결 풀 크기 / timeout은 환경변수로 조절)
+gms_client = GMSClient(
+    gms_api_key=os.getenv("GMS_API_KEY"),
+    gms_base_url=os.getenv("GMS_BASE_URL"),
+    pool_size=int(os.getenv("GMS_POOL_SIZE", "16")),
+    connect_timeout=float(os.getenv("GMS_CONNECT_TIMEOUT", "5")),
+    read_timeout=float(os.getenv("GMS_READ_TIMEOUT", "60"))
+)
+
+
+### Gemini generateContent 호출 후 응답 텍스트 반환 (공유 gms_client의 연결 풀 사용)
+def generate_content(
+    prompt: str,
+    *,
+    gms_api_key: str,
+    gms_base_url: str,
+    timeout: float = 60,
+    limiter: RateLimiter | None = None
+) -> str:
+    return gms_client.generate_content(
+        prompt,
+        gms_api_key=gms_api_key,
+        gms_base_url=gms_base_url,
+        timeout=timeout,
+        limiter=limiter
+    )
@@ -0,0 +1,74 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from common.batching import pack_into_batches
+from common.token_utils import estimate_tokens
+
+
+### 계층적 map-reduce 합성
+# 배치 요약이 많아서 최종 프롬프트 하나에 다 들어가지 않을 때,
+# 요약들을 토큰 예산에 맞춰 묶고(super-batch) 묶음마다 merge_fn(LLM)으로 병합하는 단계를
+# 전체 입력이 max_tokens 이하가 될 때까지 반복한다.
+# - 같은 단계의 묶음들은 병렬로 병합 → 단계 수(= 지연 시간)는 배치 수에 대해 log로 증가
+# - merge_fn의 결과는 입력 요약과 같은 스키마여야 다음 단계에서 다시 병합 가능
+#
+# 사용 예:
+#   reduced = reduce_summaries_hierarchically(
+#       batch_summaries,
+#       merge_fn=lambda group, level, group_id: merge_with_llm(group),
+#       max_tokens=60000
+#   )
+#   final = analyze_project_from_batches(reduced, ...)
+
+def summaries_tokens(summaries: list, size_fn=None) -> int:
+    size_fn = size_fn or _json_tokens
+    return sum(size_fn(s) for s in summaries)
+
+
+def _json_tokens(item) -> int:
+    return estimate_tokens(json.dumps(item, ensure_ascii=False))
+
+
+def reduce_summaries_hierarchically(
+    summaries: list,
+    merge_fn,
+    max_tokens: int,
+    group_max_tokens: int | None = None,
+    max_workers: int = 4,
+    size_fn=None
+) -> list:
+    """
+    merge_fn(group, level, group_id) -> dict : 요약 여러 개를 요약 1개로 병합
+    max_tokens: 최종 프롬프트에 넣을 요약들의 추정 토큰 합 상한
+    group_max_tokens: 병합 1회에 넣을 요약들의 토큰 합 상한 (기본: max_tokens)
+    반환: 토큰 합이 max_tokens 이하가 된 요약 리스트 (요약이 1개 남으면 예산을 넘어도 그대로 반환)
+    """
+    size_fn = size_fn or _json_tokens
+    group_max_tokens = group_max_tokens or max_tokens
+
+    level = 0
+    while len(summaries) > 1 and summaries_tokens(summaries, size_fn) > max_tokens:
+        level += 1
+        groups = pack_into_batches(summaries, max_tokens=group_max_tokens, size_fn=size_fn)
+
+        # 요약 하나하나가 예산을 혼자 다 차지하면 묶이지 않음 → 최소 2개씩 묶어서 단계마다 개수가 줄도록 보장
+        if len(groups) == len(summaries):
+            groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+
+        print(
+            f"[REDUCE L{level}] 요약 {len(summaries)}개 "
+            f"(~{summaries_tokens(summaries, size_fn)} 토큰) → {len(groups)}개로 병합"
+        )
+
+        # 1개짜리 묶음은 LLM 호출 없이 그대로 다음 단계로
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(merge_fn, group, level, group_id) if len(group) > 1 else None
+                for group_id, group in enumerate(groups, 1)
+            ]
+            summaries = [
+                future.result() if future is not None else group[0]
+                for future, group in zip(futures, groups)
+            ]
+
+    return summaries
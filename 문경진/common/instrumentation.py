@@ -0,0 +1,189 @@
+import json
+import time
+import atexit
+import inspect
+import functools
+import threading
+import contextvars
+
+
+### 파이프라인 단계별 계측 (wall time / 프롬프트·응답 크기 / 토큰 사용량 / 재시도 횟수)
+# - 단계 함수에 @instrument("stage 이름")을 붙이면 호출 1번당 레코드 1개 생성
+# - 단계 안에서 LLM을 부르는 곳은 record_llm_usage()로 현재 레코드에 사용량을 기록
+# - configure_instrumentation(path)로 출력 경로를 정하면 레코드를 JSON lines로 바로 씀
+#   (설정하지 않으면 stage_summary() 집계만 남김)
+
+_current_record = contextvars.ContextVar("current_stage_record", default=None)
+_retry_attempt = contextvars.ContextVar("retry_attempt", default=1)
+
+_lock = threading.Lock()
+_sink = None
+_static_fields = {}
+_summary = {}
+
+
+def configure_instrumentation(path: str | None, reset: bool = True, **static_fields):
+    """
+    path: JSONL 출력 경로 (None이면 파일 출력 없음)
+    reset: True면 기존 파일을 비우고 새로 씀
+    static_fields: 모든 레코드에 같이 찍을 값 (예: repo="owner/repo")
+    """
+    global _sink, _static_fields
+
+    with _lock:
+        if _sink is not None:
+            _sink.close()
+        _sink = open(path, "w" if reset else "a", encoding="utf-8") if path else None
+        _static_fields = dict(static_fields)
+        _summary.clear()
+
+
+@atexit.register
+def _close_sink():
+    with _lock:
+        if _sink is not None:
+            _sink.close()
+
+
+def _emit(record: dict):
+    with _lock:
+        stage = _summary.setdefault(record["stage"], {
+            "calls": 0, "errors": 0, "wall_ms": 0.0,
+            "prompt_tokens": 0, "output_tokens": 0, "retries": 0
+        })
+        stage["calls"] += 1
+        stage["errors"] += 0 if record["ok"] else 1
+        stage["wall_ms"] += record["wall_ms"]
+        stage["prompt_tokens"] += record.get("prompt_tokens") or 0
+        stage["output_tokens"] += record.get("output_tokens") or 0
+        stage["retries"] += record["retries"]
+
+        if _sink is not None:
+            _sink.write(json.dumps({**_static_fields, **record}, ensure_ascii=False, default=str) + "\n")
+            _sink.flush()
+
+
+### 단계 호출 1건의 레코드 (with 블록 동안 현재 context의 레코드로 설정)
+class _StageRecord:
+    def __init__(self, stage: str):
+        self.record = {
+            "stage": stage,
+            "started_at": time.time(),
+            "attempt": _retry_attempt.get()
+        }
+
+    def __enter__(self):
+        self.token = _current_record.set(self.record)
+        self.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, exc_type, exc, tb):
+        record = self.record
+        _current_record.reset(self.token)
+
+        record["ok"] = exc is None
+        if exc is not None:
+            record["error"] = f"{exc_type.__name__}: {exc}"[:500]
+        record["wall_ms"] = round((time.perf_counter() - self.start) * 1000, 2)
+        # call_with_retry 재시도 + SDK 내부 재시도(HTTP 요청 횟수) 중 큰 값
+        record["retries"] = max(record["attempt"], record.get("http_requests", 1)) - 1
+        _emit(record)
+        return False
+
+
+### 단계 함수 데코레이터 (async 함수도 지원, 레코드는 task별 context에 분리됨)
+def instrument(stage: str):
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with _StageRecord(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _StageRecord(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+### 현재 단계 레코드에 값 추가 (예: path, cache_hit)
+def annotate(**fields):
+    record = _current_record.get()
+    if record is not None:
+        record.update(fields)
+
+
+def _usage_value(usage, *names):
+    for name in names:
+        value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+        if value is not None:
+            return value
+    return None
+
+
+### LLM 호출 1건의 프롬프트/응답 크기와 provider가 알려준 토큰 사용량 기록
+# usage: OpenAI usage 객체 / dict (input_tokens, prompt_tokens ...) 또는 Gemini usageMetadata dict
+def record_llm_usage(prompt=None, response_text: str | None = None, usage=None):
+    record = _current_record.get()
+    if record is None:
+        return
+
+    record["llm_calls"] = record.get("llm_calls", 0) + 1
+    if prompt is not None:
+        prompt_text = prompt if isinstance(prompt, str) else json.dumps(prompt, ensure_ascii=False)
+        record["prompt_chars"] = record.get("prompt_chars", 0) + len(prompt_text)
+    if response_text is not None:
+        record["response_chars"] = record.get("response_chars", 0) + len(response_text)
+
+    if usage is not None:
+        fields = {
+            "prompt_tokens": _usage_value(usage, "input_tokens", "prompt_tokens", "promptTokenCount"),
+            "output_tokens": _usage_value(usage, "output_tokens", "completion_tokens", "candidatesTokenCount"),
+            "total_tokens": _usage_value(usage, "total_tokens", "totalTokenCount")
+        }
+        for key, value in fields.items():
+            if value is not None:
+                record[key] = record.get(key, 0) + value
+
+
+### 현재 단계에서 보낸 HTTP 요청 수 (1보다 크면 재시도가 있었던 것)
+def record_request():
+    record = _current_record.get()
+    if record is not None:
+        record["http_requests"] = record.get("http_requests", 0) + 1
+
+
+### call_with_retry 등 재시도 루프에서 몇 번째 시도인지 표시
+def set_retry_attempt(attempt: int):
+    return _retry_attempt.set(attempt)
+
+
+def reset_retry_attempt(token):
+    _retry_attempt.reset(token)
+
+
+### OpenAI SDK 내부 재시도까지 세기 위한 httpx client (OpenAI(http_client=...)에 넘김)
+def instrumented_http_client(**kwargs):
+    import httpx
+
+    def count_request(request):
+        record_request()
+
+    # 기본값은 OpenAI SDK 기본 http client와 맞춤 (httpx 기본 timeout 5초는 LLM 호출에 너무 짧음)
+    kwargs.setdefault("timeout", httpx.Timeout(600.0, connect=5.0))
+    kwargs.setdefault("limits", httpx.Limits(max_connections=1000, max_keepalive_connections=100))
+    kwargs.setdefault("follow_redirects", True)
+
+    return httpx.Client(event_hooks={"request": [count_request]}, **kwargs)
+
+
+### 단계별 합계 (호출 수, 실패 수, 총 wall time, 토큰, 재시도) → wall time 큰 순
+def stage_summary() -> dict:
+    with _lock:
+        return {
+            stage: {**values, "wall_ms": round(values["wall_ms"], 2)}
+            for stage, values in sorted(_summary.items(), key=lambda x: -x[1]["wall_ms"])
+        }
@@ -0,0 +1,146 @@
+import re
+import copy
+import json
+
+from common.instrumentation import annotate
+
+
+### LLM 응답에서 JSON 객체 추출 (safe_json_loads / safe_json_load / parse_json_response 공통 버전)
+# 기존 방식(```json 제거 → find("{") ~ rfind("}") 슬라이스 → json.loads)은
+# 뒤에 설명/두 번째 객체가 붙거나, trailing comma가 있거나, 응답이 max token에서 잘리면 통째로 실패했다.
+# - 문자열 / 괄호 토큰 단위로 한 번만 훑으면서 첫 번째 "균형 잡힌" {...} 객체만 잘라냄 (코드블록 / 앞뒤 잡음 무시)
+# - 같은 패스에서 trailing comma 제거, 잘린 응답이면 열린 문자열 / 배열 / 객체를 닫아서 복구
+# - schema가 주어지면 빠진 key는 기본값으로 채우고, 타입이 다른 key는 오류
+#
+# 사용 예:
+#   result = parse_llm_json(response_text, schema={"file": {}, "evidence": []}, required=("file",))
+
+class JSONExtractionError(ValueError):
+    pass
+
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+# 문자열 리터럴(닫히지 않은 것 포함) 또는 괄호 하나씩 → 문자열 안의 괄호는 건너뜀
+_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*("?)|[{}\[\]]', re.S)
+
+
+def _close_truncated(text: str, stack: list) -> str:
+    """잘린 응답: 마지막 미완성 값 정리 후 열린 괄호를 순서대로 닫음"""
+    while True:
+        stripped = text.rstrip()
+        if stripped.endswith(","):
+            text = stripped[:-1]
+            continue
+        if stripped.endswith(":"):
+            # 값 없이 끝난 "key": 제거
+            text = stripped[:-1].rstrip()
+            key_start = text.rfind('"', 0, len(text) - 1)
+            text = text[:key_start] if text.endswith('"') and key_start != -1 else text
+            continue
+        if stack and stack[-1] == "{" and stripped.endswith('"'):
+            # 객체 안에서 값 없이 끝난 key 문자열이면 제거 ({"a": 1, "b")
+            key_start = stripped.rfind('"', 0, len(stripped) - 1)
+            before = stripped[:key_start].rstrip() if key_start != -1 else ""
+            if before.endswith((",", "{")):
+                text = before
+                continue
+        break
+
+    return text + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def extract_json_object(text: str, repair: bool = True) -> tuple[str, bool]:
+    """
+    text에서 첫 번째 JSON 객체 문자열을 찾아 (JSON 문자열, 복구 여부) 반환
+    repair=False면 trailing comma / 잘린 응답을 고치지 않음
+    """
+    if not text:
+        raise JSONExtractionError("빈 응답")
+
+    start = text.find("{")
+    if start == -1:
+        raise JSONExtractionError("JSON 객체 없음")
+
+    pieces = []  # 출력 조각 (trailing comma 제거 시 마지막 조각만 수정)
+    stack = []
+    position = start
+    repaired = False
+
+    for match in _TOKEN_RE.finditer(text, start):
+        token = match.group(0)
+        pieces.append(text[position:match.start()])
+        position = match.end()
+
+        if token.startswith('"'):
+            if not match.group(1):  # 닫히지 않은 문자열 → 응답이 잘림
+                if not repair:
+                    raise JSONExtractionError("JSON 객체가 닫히지 않음 (응답 잘림)")
+                pieces.append(token + '"')
+                return _close_truncated("".join(pieces), stack), True
+            pieces.append(token)
+        elif token in "{[":
+            stack.append(token)
+            pieces.append(token)
+        else:
+            if not stack or _CLOSERS[stack[-1]] != token:
+                raise JSONExtractionError("괄호 짝이 맞지 않음")
+
+            # trailing comma ( ..., } / ..., ] )
+            gap = pieces[-1].rstrip()
+            if repair and gap.endswith(","):
+                pieces[-1] = gap[:-1]
+                repaired = True
+
+            stack.pop()
+            pieces.append(token)
+            if not stack:
+                return "".join(pieces), repaired
+
+    # 끝까지 닫히지 않음 → 응답이 잘림
+    if not repair:
+        raise JSONExtractionError("JSON 객체가 닫히지 않음 (응답 잘림)")
+    pieces.append(text[position:])
+    return _close_truncated("".join(pieces), stack), True
+
+
+def _validate(result: dict, schema: dict | None, required) -> dict:
+    missing = [key for key in (required or ()) if key not in result]
+    if missing:
+        raise JSONExtractionError(f"필수 key 없음: {missing}")
+
+    for key, default in (schema or {}).items():
+        if key not in result or result[key] is None:
+            result[key] = copy.deepcopy(default)
+        elif default is not None and not isinstance(result[key], type(default)):
+            # 정수 / 실수 혼용은 허용
+            if not (isinstance(default, float) and isinstance(result[key], int)):
+                raise JSONExtractionError(
+                    f"{key}: {type(default).__name__} 필요, {type(result[key]).__name__} 받음"
+                )
+    return result
+
+
+def parse_llm_json(text: str, schema: dict | None = None, required=None, repair: bool = True) -> dict:
+    """
+    LLM 응답 → dict
+    schema: {key: 기본값} (빠지거나 null인 key는 기본값으로 채움, 타입이 다르면 오류)
+    required: 반드시 있어야 하는 key들 (없으면 오류)
+    실패하면 JSONExtractionError (ValueError 하위 클래스)
+    """
+    candidate, repaired = extract_json_object(text, repair=repair)
+
+    try:
+        # strict=False: 문자열 안의 줄바꿈 / 탭 등 제어 문자 허용
+        result = json.loads(candidate, strict=False)
+    except json.JSONDecodeError as e:
+        raise JSONExtractionError(f"JSON 파싱 실패: {e}") from e
+
+    if not isinstance(result, dict):
+        raise JSONExtractionError("JSON 객체가 아님")
+
+    if repaired:
+        annotate(json_repaired=True)
+
+    return _validate(result, schema, required)
@@ -0,0 +1,223 @@
+import os
+import random
+import asyncio
+from abc import ABC, abstractmethod
+
+from common.rate_limiter import RateLimiter, parse_retry_after
+from common.token_utils import estimate_tokens
+from common.instrumentation import record_llm_usage, record_request
+from common.json_parser import parse_llm_json
+
+
+### LLM 호출 방식 통합 (async)
+# - OpenAIResponsesProvider : client.responses.create (single_analysis_method.py 방식)
+# - OpenAIChatProvider      : client.chat.completions.create (company_analysis, pdf_ocr 방식)
+# - GeminiProvider          : Gemini REST generateContent (backend_single_analysis 방식)
+# 공통: limiter 대기(acquire_async) → 호출 → 429/5xx/연결 오류면 Retry-After 또는 지수 backoff 후 재시도
+#
+# 사용 예:
+#   provider = OpenAIChatProvider(model="gpt-4.1-mini", api_key=..., base_url=...)
+#   results = await run_bounded(lambda c: provider.complete_json(build_prompt(c)), companies, concurrency=8)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# OpenAI 호환 API(GMS GPT 프록시) 호출 공통 limiter (Gemini의 gms_rate_limiter와 쿼터가 따로)
+openai_rate_limiter = RateLimiter(
+    requests_per_min=float(os.getenv("GMS_GPT_REQUESTS_PER_MIN", "500")),
+    tokens_per_min=float(os.getenv("GMS_GPT_TOKENS_PER_MIN", "200000"))
+)
+
+
+class LLMProvider(ABC):
+    def __init__(
+        self,
+        model: str,
+        limiter: RateLimiter | None = None,
+        max_retries: int = 3,
+        temperature: float = 0.2
+    ):
+        self.model = model
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.temperature = temperature
+
+    @abstractmethod
+    async def _complete(self, prompt: str, system: str | None, temperature: float) -> tuple[str, object]:
+        """provider별 실제 호출 → (응답 텍스트, usage)"""
+
+    def _error_response(self, error: Exception):
+        """재시도 가능한 에러면 HTTP 응답 객체(없으면 True), 아니면 None"""
+        return None
+
+    async def complete(self, prompt: str, *, system: str | None = None, temperature: float | None = None) -> str:
+        temperature = self.temperature if temperature is None else temperature
+        estimated_tokens = estimate_tokens(prompt)
+
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                await self.limiter.acquire_async(estimated_tokens)
+
+            record_request()
+            try:
+                text, usage = await self._complete(prompt, system, temperature)
+            except Exception as e:
+                response = self._error_response(e)
+                if response is None or attempt == self.max_retries:
+                    raise
+
+                status = getattr(response, "status_code", None)
+                retry_after = parse_retry_after(response) if status == 429 else None
+                if status == 429 and self.limiter is not None:
+                    self.limiter.on_throttle(retry_after)
+
+                wait = retry_after or min(10, 2 ** attempt) + random.random()
+                print(f"⚠️ {type(e).__name__}({status}) → {wait:.1f}s 대기 후 재시도 ({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(wait)
+                continue
+
+            if self.limiter is not None:
+                self.limiter.on_success()
+            record_llm_usage(prompt=prompt, response_text=text, usage=usage)
+            return text
+
+    async def complete_json(self, prompt: str, schema: dict | None = None, required=None, **kwargs) -> dict:
+        return parse_llm_json(await self.complete(prompt, **kwargs), schema=schema, required=required)
+
+    async def aclose(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+#################################################################
+
+
+### OpenAI 호환 API (GMS 프록시 포함)
+class _OpenAIProvider(LLMProvider):
+    def __init__(
+        self,
+        model: str,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        timeout: float = 120,
+        limiter: RateLimiter | None = None,
+        **kwargs
+    ):
+        # limiter를 주지 않으면 OpenAI 호환 호출끼리 같은 limiter 공유 (limiter 없이 동시에 호출하면 429가 몰림)
+        super().__init__(model, limiter=limiter or openai_rate_limiter, **kwargs)
+        from openai import AsyncOpenAI
+
+        # 재시도는 LLMProvider.complete가 limiter와 함께 처리
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+
+    def _error_response(self, error: Exception):
+        import openai
+
+        if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+        if isinstance(error, openai.APIStatusError) and error.status_code in RETRYABLE_STATUS:
+            return error.response
+        return None
+
+    async def aclose(self):
+        await self.client.close()
+
+
+class OpenAIResponsesProvider(_OpenAIProvider):
+    async def _complete(self, prompt, system, temperature):
+        response = await self.client.responses.create(
+            model=self.model,
+            input=prompt,
+            instructions=system,
+            temperature=temperature
+        )
+        return response.output_text, response.usage
+
+
+class OpenAIChatProvider(_OpenAIProvider):
+    async def _complete(self, prompt, system, temperature):
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature
+        )
+        return response.choices[0].message.content, response.usage
+#################################################################
+
+
+### Gemini REST generateContent (httpx 비동기 클라이언트, keep-alive 연결 풀)
+class GeminiProvider(LLMProvider):
+    def __init__(
+        self,
+        gms_api_key: str,
+        gms_base_url: str,
+        model: str = "gemini",
+        pool_size: int = 16,
+        connect_timeout: float = 5,
+        read_timeout: float = 60,
+        limiter: RateLimiter | None = None,
+        **kwargs
+    ):
+        import httpx
+        from common.gms import gms_rate_limiter
+
+        # Gemini 호출은 동기 코드(common/gms.py)와 같은 쿼터를 쓰므로 기본으로 같은 limiter 공유
+        super().__init__(model, limiter=limiter or gms_rate_limiter, **kwargs)
+        self.gms_base_url = gms_base_url
+        self.client = httpx.AsyncClient(
+            headers={"Content-Type": "application/json", "x-goog-api-key": gms_api_key},
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+        )
+
+    async def _complete(self, prompt, system, temperature):
+        payload = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {"temperature": temperature}
+        }
+        if system:
+            payload["systemInstruction"] = {"parts": [{"text": system}]}
+
+        response = await self.client.post(self.gms_base_url, json=payload)
+        response.raise_for_status()
+
+        data = response.json()
+        usage = data.get("usageMetadata", {})
+        if usage.get("totalTokenCount"):
+            self.limiter.adjust_tokens(usage["totalTokenCount"] - estimate_tokens(prompt))
+
+        return data["candidates"][0]["content"]["parts"][0]["text"], usage
+
+    def _error_response(self, error: Exception):
+        import httpx
+
+        if isinstance(error, httpx.TransportError):
+            return True
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code in RETRYABLE_STATUS:
+            return error.response
+        return None
+
+    async def aclose(self):
+        await self.client.aclose()
+#################################################################
+
+
+### 동시 실행 수를 제한한 gather (입력 순서대로 결과 반환)
+async def run_bounded(fn, items, concurrency: int = 8, return_exceptions: bool = False) -> list:
+    """
+    fn: item 하나를 받아 coroutine을 반환하는 함수
+    return_exceptions=True면 실패한 item 자리에 예외 객체를 넣고 나머지는 계속 진행
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(item):
+        async with semaphore:
+            return await fn(item)
+
+    return await asyncio.gather(*(run_one(item) for item in items), return_exceptions=return_exceptions)
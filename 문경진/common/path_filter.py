@@ -0,0 +1,212 @@
+import os
+import re
+from functools import lru_cache
+
+
+### 파일 선별용 미리 컴파일된 필터
+# - keyword_matcher: 키워드 목록을 정규식 하나(alternation)로 컴파일 → 내용을 한 번만 훑어서 매칭
+# - GitIgnoreMatcher: .gitignore / .git/info/exclude 규칙을 정규식으로 컴파일 (하위 디렉토리 .gitignore 포함)
+# - PathFilter: 확장자 / 제외 접미사 / 제외 디렉토리 / .gitignore를 한 번에 적용하는 os.walk 래퍼
+#
+# 사용 예:
+#   path_filter = PathFilter(extensions=(".py", ".java"), exclude_dirs={"node_modules"})
+#   for path, rel_path in path_filter.walk(repo_root):
+#       ...
+#   if keyword_matcher(("@Query", "join")).search(content): ...
+
+
+### 키워드 목록 → 정규식 1개 (같은 목록이면 컴파일 결과 재사용)
+@lru_cache(maxsize=64)
+def _compile_keywords(keywords: tuple) -> re.Pattern:
+    # 긴 키워드부터 두어야 "for (" / "for" 같은 접두 관계에서도 결과가 같음
+    ordered = sorted(set(keywords), key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in ordered) if ordered else r"(?!)")
+
+
+def keyword_matcher(keywords) -> re.Pattern:
+    return _compile_keywords(tuple(keywords))
+
+
+def _suffix_regex(suffixes) -> re.Pattern:
+    return re.compile("(?:" + "|".join(re.escape(s) for s in sorted(set(suffixes), key=len, reverse=True)) + r")\Z")
+#################################################################
+
+
+### .gitignore 패턴 → 정규식
+def _translate_gitignore_glob(pattern: str) -> str:
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and pattern.find("]", i + 1) != -1:
+            end = pattern.find("]", i + 1)
+            chars = pattern[i + 1:end].replace("\\", "\\\\")
+            out.append("[" + ("^" + chars[1:] if chars.startswith("!") else chars) + "]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < n:
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+def parse_gitignore_line(line: str):
+    """한 줄 → (정규식 문자열, negate, dir_only) / 주석·빈 줄이면 None"""
+    line = line.rstrip("\n").rstrip("\r")
+    if not line.endswith("\\ "):
+        line = line.rstrip(" ")
+    if not line or line.startswith("#"):
+        return None
+
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith(("\\#", "\\!")):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # 중간에 "/"가 있으면 .gitignore 위치 기준 경로, 없으면 어느 깊이의 이름이든 매칭
+    anchored = "/" in line
+    body = _translate_gitignore_glob(line.lstrip("/"))
+    return ("" if anchored else "(?:.*/)?") + body, negate, dir_only
+
+
+class GitIgnoreMatcher:
+    def __init__(self):
+        self.rules = []  # (기준 디렉토리, 컴파일된 정규식, negate, dir_only) - 뒤에 있는 규칙이 우선
+
+    def add_patterns(self, lines, base: str = ""):
+        parsed = [rule for rule in (parse_gitignore_line(line) for line in lines) if rule is not None]
+        if not parsed:
+            return
+
+        # "!" 규칙이 없으면 순서가 상관없으므로 dir_only 여부별로 정규식 하나씩으로 합침
+        if not any(negate for _, negate, _ in parsed):
+            for dir_only in (False, True):
+                bodies = [body for body, _, d in parsed if d == dir_only]
+                if bodies:
+                    self.rules.append((base, re.compile("(?:" + "|".join(bodies) + r")\Z"), False, dir_only))
+            return
+
+        for body, negate, dir_only in parsed:
+            self.rules.append((base, re.compile(body + r"\Z"), negate, dir_only))
+
+    def add_file(self, path: str, base: str = ""):
+        try:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                self.add_patterns(f, base=base)
+        except OSError:
+            pass
+
+    @classmethod
+    def from_repo(cls, repo_root: str) -> "GitIgnoreMatcher":
+        """레포 루트의 .git/info/exclude + .gitignore (하위 .gitignore는 PathFilter.walk가 내려가면서 추가)"""
+        matcher = cls()
+        matcher.add_file(os.path.join(repo_root, ".git", "info", "exclude"))
+        matcher.add_file(os.path.join(repo_root, ".gitignore"))
+        return matcher
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        rel_path: 레포 루트 기준 "/" 구분 상대경로
+        상위 디렉토리가 무시되는지는 보지 않음 (walk에서 디렉토리 단위로 가지치기)
+        """
+        for base, regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(base + "/"):
+                    continue
+                sub_path = rel_path[len(base) + 1:]
+            else:
+                sub_path = rel_path
+            if regex.match(sub_path):
+                return not negate
+        return False
+#################################################################
+
+
+### 확장자 / 제외 규칙 / .gitignore를 한 번에 적용하는 레포 탐색기
+class PathFilter:
+    def __init__(
+        self,
+        extensions=None,
+        exclude_dirs=(),
+        exclude_suffixes=(),
+        skip_hidden_files: bool = False,
+        use_gitignore: bool = True
+    ):
+        """
+        extensions: 허용할 파일 접미사 (None이면 전부 허용)
+        exclude_dirs: 이름이 같으면 내려가지 않을 디렉토리
+        exclude_suffixes: 제외할 파일 접미사 (생성 파일 등)
+        skip_hidden_files: "."으로 시작하는 파일 제외
+        use_gitignore: 레포의 .gitignore 규칙을 따름
+        """
+        self.exclude_dirs = frozenset(exclude_dirs)
+        self.include_re = _suffix_regex(extensions) if extensions else None
+        self.exclude_re = _suffix_regex(exclude_suffixes) if exclude_suffixes else None
+        self.skip_hidden_files = skip_hidden_files
+        self.use_gitignore = use_gitignore
+
+    def accepts_name(self, name: str) -> bool:
+        if self.skip_hidden_files and name.startswith("."):
+            return False
+        if self.include_re is not None and not self.include_re.search(name):
+            return False
+        if self.exclude_re is not None and self.exclude_re.search(name):
+            return False
+        return True
+
+    def iter_dirs(self, repo_root: str):
+        """디렉토리마다 (절대 경로, "/" 구분 상대경로, 통과한 파일 이름들)을 yield"""
+        gitignore = GitIgnoreMatcher.from_repo(repo_root) if self.use_gitignore else None
+
+        for root, dirs, files in os.walk(repo_root):
+            rel_dir = os.path.relpath(root, repo_root).replace("\\", "/")
+            rel_dir = "" if rel_dir == "." else rel_dir
+            prefix = rel_dir + "/" if rel_dir else ""
+
+            if gitignore is not None and rel_dir and ".gitignore" in files:
+                gitignore.add_file(os.path.join(root, ".gitignore"), base=rel_dir)
+
+            dirs[:] = [
+                d for d in dirs
+                if d not in self.exclude_dirs
+                and not (gitignore is not None and gitignore.is_ignored(prefix + d, is_dir=True))
+            ]
+
+            names = [
+                name for name in files
+                if self.accepts_name(name)
+                and not (gitignore is not None and gitignore.is_ignored(prefix + name))
+            ]
+            if names:
+                yield root, rel_dir, names
+
+    def walk(self, repo_root: str):
+        """통과한 파일마다 (절대 경로, 레포 기준 상대경로(OS 구분자))를 yield"""
+        for root, _, names in self.iter_dirs(repo_root):
+            for name in names:
+                path = os.path.join(root, name)
+                yield path, os.path.relpath(path, repo_root)
@@ -0,0 +1,88 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+### 단계 의존성 그래프(DAG) 실행기
+# 서로 의존하지 않는 단계(예: 커밋 스타일 분석 / 언어 조회 / 파일 요약)를 동시에 실행하고,
+# 의존 단계가 모두 끝난 단계부터 바로 시작한다.
+#
+# 사용 예:
+#   dag = PipelineDAG()
+#   dag.add("file_summaries", run_file_summaries)
+#   dag.add("commit_style", run_commit_style, optional=True)
+#   dag.add("report", build_report, deps=["file_summaries", "commit_style"])
+#   results = dag.run()   # build_report(file_summaries=..., commit_style=...)
+class PipelineDAG:
+    def __init__(self):
+        self.nodes = {}  # {이름: (함수, 의존 단계들, optional)}
+        self.timings = {}  # {이름: 소요 시간(초)}
+
+    def add(self, name: str, fn, deps=(), optional: bool = False):
+        """
+        fn은 의존 단계 결과를 이름 그대로 keyword 인자로 받는다.
+        optional=True면 실패해도 결과를 None으로 두고 다음 단계를 계속 진행
+        """
+        if name in self.nodes:
+            raise ValueError(f"이미 등록된 단계: {name}")
+        self.nodes[name] = (fn, tuple(deps), optional)
+        return self
+
+    def _check(self):
+        for name, (_, deps, _) in self.nodes.items():
+            for dep in deps:
+                if dep not in self.nodes:
+                    raise ValueError(f"{name}: 없는 단계에 의존 ({dep})")
+
+        # 위상 정렬이 안 되면 순환 의존
+        remaining = {name: set(deps) for name, (_, deps, _) in self.nodes.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"순환 의존: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def run(self, max_workers: int | None = None) -> dict:
+        self._check()
+
+        results = {}
+        pending = dict(self.nodes)
+        running = {}
+
+        def run_node(name, fn, kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(**kwargs)
+            finally:
+                self.timings[name] = time.perf_counter() - start
+
+        executor = ThreadPoolExecutor(max_workers=max_workers or len(self.nodes) or 1)
+        try:
+            while pending or running:
+                for name in [n for n, (_, deps, _) in pending.items() if all(d in results for d in deps)]:
+                    fn, deps, _ = pending.pop(name)
+                    print(f"[DAG] START  {name}")
+                    running[executor.submit(run_node, name, fn, {d: results[d] for d in deps})] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name = running.pop(future)
+                    optional = self.nodes[name][2]
+
+                    try:
+                        results[name] = future.result()
+                        print(f"[DAG] DONE   {name} ({self.timings[name]:.1f}s)")
+                    except Exception as e:
+                        if not optional:
+                            print(f"[DAG] ERROR  {name} :: {e}")
+                            raise
+                        print(f"[DAG] SKIP   {name} (optional 단계 실패 → None) :: {e}")
+                        results[name] = None
+        finally:
+            # 실패 시 아직 시작하지 않은 단계는 취소 (실행 중인 단계는 끝날 때까지 기다리지 않음)
+            executor.shutdown(wait=not running, cancel_futures=True)
+
+        return results
@@ -0,0 +1,157 @@
+import time
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+
+
+### 분당 요청 수(RPM) / 분당 토큰 수(TPM) 기반 token bucket rate limiter
+# - 요청 전에 acquire(예상 토큰 수)로 필요한 만큼만 대기 (고정 sleep 대체)
+# - 429를 받으면 on_throttle()로 Retry-After 만큼 전체 일시정지 + 허용 속도 절반으로 감소
+# - 성공할 때마다 on_success()로 허용 속도를 조금씩 원래 한도까지 회복
+class RateLimiter:
+    def __init__(
+        self,
+        requests_per_min: float,
+        tokens_per_min: float | None = None,
+        min_rate_ratio: float = 0.1,
+        recovery_ratio: float = 0.05
+    ):
+        self.max_requests_per_min = requests_per_min
+        self.max_tokens_per_min = tokens_per_min
+        self.min_rate_ratio = min_rate_ratio
+        self.recovery_ratio = recovery_ratio
+
+        self.rate_ratio = 1.0  # 현재 허용 속도 / 최대 한도
+        self.throttled = 0     # 429 누적 횟수
+
+        self._lock = threading.Lock()
+        self._request_balance = float(requests_per_min)
+        self._token_balance = float(tokens_per_min or 0)
+        self._last_refill = time.monotonic()
+        self._pause_until = 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+
+        rpm = self.max_requests_per_min * self.rate_ratio
+        self._request_balance = min(
+            self.max_requests_per_min,
+            self._request_balance + elapsed * rpm / 60
+        )
+
+        if self.max_tokens_per_min:
+            tpm = self.max_tokens_per_min * self.rate_ratio
+            self._token_balance = min(
+                self.max_tokens_per_min,
+                self._token_balance + elapsed * tpm / 60
+            )
+
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        요청 1건(+tokens)을 예약하고, 실제 전송 전에 기다려야 할 시간(초)을 반환한다.
+        잔량이 모자라도 먼저 차감(음수 허용)하므로 동시 호출자는 순서대로 줄을 선다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            self._request_balance -= 1
+            wait = 0.0
+            if self._request_balance < 0:
+                rpm = self.max_requests_per_min * self.rate_ratio
+                wait = -self._request_balance * 60 / rpm
+
+            if self.max_tokens_per_min and tokens:
+                # 한 번에 TPM 한도를 넘는 요청도 언젠가는 보낼 수 있도록 한도로 자름
+                self._token_balance -= min(tokens, self.max_tokens_per_min)
+                if self._token_balance < 0:
+                    tpm = self.max_tokens_per_min * self.rate_ratio
+                    wait = max(wait, -self._token_balance * 60 / tpm)
+
+            return max(wait, self._pause_until - now)
+
+    def acquire(self, tokens: int = 0):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 0):
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    # 실제 사용 토큰(응답 usage 등)과 예상치의 차이 보정
+    def adjust_tokens(self, delta: int):
+        if not self.max_tokens_per_min or not delta:
+            return
+        with self._lock:
+            self._token_balance -= delta
+
+    def on_success(self):
+        with self._lock:
+            self.rate_ratio = min(1.0, self.rate_ratio + self.recovery_ratio)
+
+    def on_throttle(self, retry_after: float | None = None):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.throttled += 1
+            self.rate_ratio = max(self.min_rate_ratio, self.rate_ratio / 2)
+
+            # Retry-After가 없으면 현재 속도 기준 요청 1건 간격만큼 쉼
+            if retry_after is None:
+                retry_after = 60 / (self.max_requests_per_min * self.rate_ratio)
+
+            self._pause_until = max(self._pause_until, now + retry_after)
+            self._request_balance = min(self._request_balance, 0.0)
+            if self.max_tokens_per_min:
+                self._token_balance = min(self._token_balance, 0.0)
+
+    def pause_remaining(self) -> float:
+        with self._lock:
+            return max(0.0, self._pause_until - time.monotonic())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests_per_min": round(self.max_requests_per_min * self.rate_ratio, 2),
+                "tokens_per_min": round(self.max_tokens_per_min * self.rate_ratio) if self.max_tokens_per_min else None,
+                "throttled": self.throttled
+            }
+#################################################################
+
+
+### 429 응답에서 대기 시간(초) 추출
+# - Retry-After 헤더 (초 또는 HTTP-date)
+# - Gemini 에러 body의 RetryInfo.retryDelay (예: "30s")
+def parse_retry_after(response) -> float | None:
+    if response is None:
+        return None
+
+    header = response.headers.get("Retry-After")
+    if header:
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+
+    error = body.get("error") if isinstance(body, dict) else None
+    details = error.get("details", []) if isinstance(error, dict) else []
+
+    for detail in details:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        if isinstance(delay, str) and delay.endswith("s"):
+            try:
+                return float(delay[:-1])
+            except ValueError:
+                continue
+    return None
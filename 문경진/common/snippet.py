@@ -0,0 +1,48 @@
+import os
+
+
+TRUNCATION_MARKER = "\n\n# --- truncated ---\n\n"  # make_snippet_for_llm과 같은 구분자
+SNIPPET_THRESHOLD_BYTES = 64 * 1024  # 이보다 큰 파일은 앞/뒤만 읽음
+BINARY_SNIFF_BYTES = 8192
+UTF8_MAX_BYTES_PER_CHAR = 4
+
+
+def _decode(raw: bytes) -> str:
+    # Path.read_text(text 모드)와 같게 줄바꿈 통일 (\r\n / \r → \n) → CRLF 파일도 snippet / 캐시 key가 같음
+    return raw.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+
+
+### 큰 파일은 전체를 읽지 않고 seek로 앞 head_len자 + 뒤 tail_len자만 읽어서 snippet 생성
+def read_text_snippet(
+    path: str,
+    head_len: int,
+    tail_len: int,
+    threshold_bytes: int = SNIPPET_THRESHOLD_BYTES
+) -> tuple[str | None, bool]:
+    """
+    (텍스트, 잘렸는지 여부)를 반환한다. 바이너리(앞부분에 NUL 바이트)면 (None, False).
+    - 파일 크기 <= threshold_bytes: 전체 내용
+    - 그보다 크면: 앞 head_len자 + TRUNCATION_MARKER + 뒤 tail_len자
+      (make_snippet_for_llm(전체 내용)과 같은 결과라서 이후 단계에 그대로 넘겨도 됨)
+    """
+    size = os.path.getsize(path)
+
+    with open(path, "rb") as f:
+        if size <= max(threshold_bytes, (head_len + tail_len) * UTF8_MAX_BYTES_PER_CHAR):
+            raw = f.read()
+            if b"\0" in raw[:BINARY_SNIFF_BYTES]:
+                return None, False
+            return _decode(raw), False
+
+        head_raw = f.read(max(head_len * UTF8_MAX_BYTES_PER_CHAR, BINARY_SNIFF_BYTES))
+        if b"\0" in head_raw[:BINARY_SNIFF_BYTES]:
+            return None, False
+
+        f.seek(size - tail_len * UTF8_MAX_BYTES_PER_CHAR)
+        tail_raw = f.read()
+
+    # 잘린 멀티바이트 문자는 errors="ignore"로 버려짐, 줄바꿈 통일 후에 글자 수로 자름
+    # (경계에서 \r|\n이 갈려도 앞쪽 \r, 뒤쪽 \n 각각 \n 하나가 되어 read_text 결과와 같음)
+    head = _decode(head_raw)[:head_len]
+    tail = _decode(tail_raw)[-tail_len:]
+    return head + TRUNCATION_MARKER + tail, True
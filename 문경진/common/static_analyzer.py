@@ -0,0 +1,478 @@
+import re
+import ast
+import sys
+
+
+### 정적 사전 분석 (LLM 호출 없이 파일 요약 생성)
+# DTO / enum / 설정 stub / __init__.py / 생성 코드처럼 로직이 거의 없는 파일은
+# LLM에 보내도 뻔한 JSON만 돌아오므로, import / annotation / endpoint / 클래스 이름 / 레이어를
+# 코드에서 직접 뽑아 summarize_file_with_llm과 같은 스키마로 만든다.
+# - Python: ast 파싱
+# - Java / JS / TS: 주석 제거 후 정규식 (tree-sitter 같은 추가 의존성 없이)
+# - score(분기 / 엔드포인트 / 쿼리 / 로직 메서드 수 가중합)가 TRIVIAL_SCORE_THRESHOLD 미만이면 trivial
+#   → trivial 파일만 정적 요약을 그대로 쓰고, 나머지는 지금처럼 LLM으로 요약
+#
+# 사용 예:
+#   summary = analyze_file_statically(path, content)
+#   if summary is not None and summary["static_analysis"]["trivial"]:
+#       ...  # LLM 호출 생략
+
+TRIVIAL_SCORE_THRESHOLD = 3.0
+NON_TRIVIAL_LAYERS = {"controller", "service"}  # 점수와 상관없이 항상 LLM으로 요약하는 레이어
+MAX_EVIDENCE = 7
+
+LANGUAGE_BY_EXTENSION = {
+    ".py": "Python",
+    ".java": "Java",
+    ".js": "JavaScript",
+    ".jsx": "JavaScript",
+    ".ts": "TypeScript",
+    ".tsx": "TypeScript"
+}
+
+GENERATED_MARKERS = ("@generated", "Generated by", "DO NOT EDIT", "auto-generated")
+
+# import 접두사 → (이름, 프레임워크 여부)
+KNOWN_IMPORTS = {
+    "org.springframework.boot": ("Spring Boot", True),
+    "org.springframework.security": ("Spring Security", True),
+    "org.springframework.data.jpa": ("Spring Data JPA", True),
+    "org.springframework": ("Spring", True),
+    "jakarta.persistence": ("JPA", False),
+    "javax.persistence": ("JPA", False),
+    "jakarta.validation": ("Bean Validation", False),
+    "javax.validation": ("Bean Validation", False),
+    "lombok": ("Lombok", False),
+    "com.querydsl": ("QueryDSL", False),
+    "io.jsonwebtoken": ("JJWT", False),
+    "com.fasterxml.jackson": ("Jackson", False),
+    "org.mapstruct": ("MapStruct", False),
+    "fastapi": ("FastAPI", True),
+    "django": ("Django", True),
+    "rest_framework": ("Django REST framework", True),
+    "flask": ("Flask", True),
+    "sqlalchemy": ("SQLAlchemy", False),
+    "pydantic": ("Pydantic", False),
+    "react": ("React", True),
+    "next": ("Next.js", True),
+    "vue": ("Vue", True),
+    "express": ("Express", True),
+    "@nestjs": ("NestJS", True),
+    "@angular": ("Angular", True),
+    "axios": ("axios", False),
+    "mongoose": ("Mongoose", False),
+    "redux": ("Redux", False),
+    "@reduxjs/toolkit": ("Redux Toolkit", False)
+}
+
+DATA_ACCESS_SIGNALS = {
+    "JPA": "JPA", "Spring Data JPA": "JPA", "QueryDSL": "QueryDSL",
+    "SQLAlchemy": "SQLAlchemy", "Mongoose": "MongoDB", "Django": "Django ORM"
+}
+
+# annotation / decorator → 횡단 관심사
+CROSS_CUTTING_ANNOTATIONS = {
+    "Transactional": "transaction",
+    "Valid": "validation", "Validated": "validation", "NotNull": "validation",
+    "NotBlank": "validation", "Size": "validation", "Email": "validation",
+    "PreAuthorize": "security", "Secured": "security", "EnableWebSecurity": "security",
+    "Cacheable": "cache", "CacheEvict": "cache",
+    "Async": "async", "Scheduled": "scheduling",
+    "ExceptionHandler": "exception-handling", "RestControllerAdvice": "exception-handling",
+    "ControllerAdvice": "exception-handling"
+}
+
+LAYER_ANNOTATIONS = {
+    "RestController": "controller", "Controller": "controller",
+    "Service": "service",
+    "Repository": "repository",
+    "Entity": "entity", "Table": "entity", "Document": "entity", "Embeddable": "entity",
+    "Configuration": "config", "ConfigurationProperties": "config", "SpringBootApplication": "config"
+}
+
+LAYER_BY_DIRECTORY = {
+    "controller": "controller", "controllers": "controller", "api": "controller",
+    "router": "controller", "routers": "controller", "routes": "controller", "views": "controller",
+    "service": "service", "services": "service", "usecase": "service",
+    "repository": "repository", "repositories": "repository", "crud": "repository", "dao": "repository",
+    "entity": "entity", "entities": "entity", "domain": "entity", "models": "entity", "model": "entity",
+    "dto": "dto", "dtos": "dto", "schemas": "dto", "schema": "dto", "request": "dto", "response": "dto",
+    "config": "config", "configuration": "config", "settings": "config",
+    "util": "util", "utils": "util", "common": "util", "helpers": "util",
+    "exception": "exception", "exceptions": "exception",
+    "components": "component", "pages": "page", "hooks": "hook", "store": "store",
+    "test": "test", "tests": "test", "__tests__": "test"
+}
+
+LAYER_BY_NAME_SUFFIX = (
+    ("Controller", "controller"), ("Service", "service"), ("ServiceImpl", "service"),
+    ("Repository", "repository"), ("Dto", "dto"), ("DTO", "dto"),
+    ("Request", "dto"), ("Response", "dto"), ("Config", "config"),
+    ("Exception", "exception"), ("Test", "test")
+)
+
+HTTP_METHODS = {"get", "post", "put", "delete", "patch"}
+
+
+def _uniq(items) -> list:
+    return list(dict.fromkeys(i for i in items if i))
+
+
+def _camel_words(name: str) -> list:
+    return [w.lower() for w in re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])", name)]
+
+
+def _domain_keyword(class_name: str) -> str:
+    for suffix, _ in LAYER_BY_NAME_SUFFIX:
+        if class_name.endswith(suffix) and class_name != suffix:
+            class_name = class_name[:-len(suffix)]
+            break
+    return "".join(_camel_words(class_name)[:2]) if class_name else ""
+
+
+def _known_import(module: str):
+    for prefix, known in KNOWN_IMPORTS.items():
+        if module == prefix or module.startswith(prefix + ".") or module.startswith(prefix + "/"):
+            return known
+    return None
+#################################################################
+
+
+### Python (ast)
+_PYTHON_STDLIB = set(getattr(sys, "stdlib_module_names", ()))
+_PYTHON_CONTROL_FLOW = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.Try, ast.With, ast.AsyncWith, ast.IfExp)
+_PYTHON_MODEL_BASES = {"BaseModel", "Enum", "IntEnum", "StrEnum", "TypedDict", "NamedTuple", "Schema", "Model"}
+_PYTHON_QUERY_CALLS = {"execute", "query", "filter", "filter_by", "select_related", "prefetch_related", "aggregate", "annotate"}
+
+
+def _decorator_name(node) -> str:
+    node = node.func if isinstance(node, ast.Call) else node
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return ""
+
+
+def _parse_python(content: str) -> dict | None:
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    facts = {
+        "imports": [], "annotations": [], "classes": [], "endpoints": [], "queries": [],
+        "control_flow": 0, "logic_functions": 0, "calls": 0, "patterns": []
+    }
+
+    # 클래스 본문의 필드 정의(Field(...), field(...))와 decorator 안의 호출은 로직으로 세지 않음
+    ignored_calls = set()
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            facts["imports"] += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            facts["imports"].append(node.module)
+        elif isinstance(node, ast.ClassDef):
+            facts["classes"].append(node.name)
+            bases = {_decorator_name(b) for b in node.bases}
+            decorators = {_decorator_name(d) for d in node.decorator_list}
+            facts["annotations"] += sorted(decorators)
+            if bases & _PYTHON_MODEL_BASES or "dataclass" in decorators:
+                facts["patterns"].append("Enum" if bases & {"Enum", "IntEnum", "StrEnum"} else "Data model")
+            for stmt in node.body:
+                if isinstance(stmt, (ast.Assign, ast.AnnAssign)):
+                    ignored_calls.update(id(n) for n in ast.walk(stmt) if isinstance(n, ast.Call))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if not (node.name.startswith("__") and node.name.endswith("__")):
+                facts["logic_functions"] += 1
+
+            for decorator in node.decorator_list:
+                ignored_calls.update(id(n) for n in ast.walk(decorator) if isinstance(n, ast.Call))
+                name = _decorator_name(decorator)
+                facts["annotations"].append(name)
+
+                # @app.get("/path"), @router.post("/path"), @bp.route("/path")
+                if isinstance(decorator, ast.Call) and (name in HTTP_METHODS or name == "route"):
+                    args = decorator.args
+                    if args and isinstance(args[0], ast.Constant) and isinstance(args[0].value, str):
+                        method = name.upper() if name in HTTP_METHODS else "ROUTE"
+                        facts["endpoints"].append(f"{method} {args[0].value}")
+        elif isinstance(node, _PYTHON_CONTROL_FLOW):
+            facts["control_flow"] += 1
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and id(node) not in ignored_calls:
+            facts["calls"] += 1
+            if _decorator_name(node) in _PYTHON_QUERY_CALLS:
+                facts["queries"].append(_decorator_name(node))
+
+    facts["third_party"] = [m for m in facts["imports"] if m.split(".")[0] not in _PYTHON_STDLIB]
+    facts["modules"] = []
+    return facts
+#################################################################
+
+
+### Java / JS / TS (정규식)
+# 문자열은 살리고(엔드포인트 경로 추출용) 주석만 제거
+_C_COMMENT_RE = re.compile(r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`)|//[^\n]*|/\*.*?\*/', re.S)
+
+_JAVA_PACKAGE_RE = re.compile(r"^\s*package\s+([\w.]+)\s*;", re.M)
+_JAVA_IMPORT_RE = re.compile(r"^\s*import\s+(?:static\s+)?([\w.]+)(?:\.\*)?\s*;", re.M)
+_ANNOTATION_RE = re.compile(r"@(\w+)(?:\s*\(([^)]*)\))?")
+_JAVA_TYPE_RE = re.compile(r"\b(class|interface|enum|record)\s+(\w+)(?:<[^>{]*>)?([^{]*)\{")
+_JAVA_METHOD_RE = re.compile(
+    r"^\s*(?:(?:public|protected|private|static|final|synchronized|abstract|default|native)\s+)*"
+    r"(?:<[^>]+>\s+)?([\w.$]+(?:<[^;{()]*?>)?(?:\[\])*)\s+(\w+)\s*\(([^;{]*?)\)\s*(?:throws\s+[\w.,\s]+)?([{;])",
+    re.M
+)
+_JAVA_NOT_METHOD = {"return", "new", "throw", "else", "if", "for", "while", "switch", "catch", "case"}
+_JAVA_ACCESSOR_RE = re.compile(r"^(?:get|set|is)[A-Z]\w*$|^(?:equals|hashCode|toString|builder|of)$")
+_DERIVED_QUERY_RE = re.compile(r"^(?:find|exists|count|delete|read|get|query|search)\w*By[A-Z]\w*$")
+_JAVA_MAPPING_RE = re.compile(r"^(Get|Post|Put|Delete|Patch|Request)Mapping$")
+_STRING_ARG_RE = re.compile(r"[\"'`]([^\"'`]*)[\"'`]")
+
+_CONTROL_FLOW_RE = re.compile(r"\b(?:if|for|while|switch|catch)\s*\(|\bthrow\s+new\b|\?\?|\belse\b")
+
+_JS_IMPORT_RE = re.compile(r"""(?:\bimport\s+(?:[\w*{}\s,]+\s+from\s+)?|\brequire\s*\(\s*)['"]([^'"]+)['"]""")
+_JS_FUNCTION_RE = re.compile(
+    r"\bfunction\s*\*?\s*(\w*)\s*\(|\b(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?(?:\([^)]*\)|\w+)\s*=>"
+    r"|^\s*(?:async\s+)?(\w+)\s*\([^)]*\)\s*(?::\s*[\w<>\[\]|, ]+)?\s*\{",
+    re.M
+)
+_JS_TYPE_RE = re.compile(r"\b(class|interface|enum|type)\s+(\w+)")
+_JS_ROUTE_RE = re.compile(r"""\b(?:app|router|server|api)\.(get|post|put|delete|patch)\s*\(\s*['"`]([^'"`]+)""")
+_JS_DECORATOR_ROUTE_RE = re.compile(r"""@(Get|Post|Put|Delete|Patch)\s*\(\s*(?:['"`]([^'"`]*)['"`])?""")
+_JS_HOOK_RE = re.compile(r"\buse[A-Z]\w*\s*\(")
+_JSX_RE = re.compile(r"return\s*\(?\s*<[A-Za-z>]|=>\s*\(?\s*<[A-Za-z>]")
+_JS_NOT_FUNCTION = {"if", "for", "while", "switch", "catch", "function", "return"}
+_SQL_RE = re.compile(r"\b(?:SELECT\s+.+?\s+FROM|INSERT\s+INTO|UPDATE\s+\w+\s+SET|DELETE\s+FROM)\b", re.I | re.S)
+
+
+def _strip_comments(content: str) -> str:
+    return _C_COMMENT_RE.sub(lambda m: m.group(1) or "", content)
+
+
+def _parse_java(content: str) -> dict:
+    code = _strip_comments(content)
+
+    facts = {
+        "imports": _JAVA_IMPORT_RE.findall(code), "annotations": [], "classes": [], "endpoints": [],
+        "queries": [], "control_flow": len(_CONTROL_FLOW_RE.findall(code)), "logic_functions": 0,
+        "calls": 0, "patterns": []
+    }
+
+    package = _JAVA_PACKAGE_RE.search(code)
+    facts["modules"] = package.group(1).split(".")[-2:] if package else []
+
+    for name, args in _ANNOTATION_RE.findall(code):
+        if name == "interface":  # @interface 선언
+            continue
+        facts["annotations"].append(name)
+
+        mapping = _JAVA_MAPPING_RE.match(name)
+        if mapping:
+            path = _STRING_ARG_RE.search(args or "")
+            method = mapping.group(1).upper() if mapping.group(1) != "Request" else "ROUTE"
+            facts["endpoints"].append(f"{method} {path.group(1) if path else ''}".strip())
+        elif name in ("Query", "NamedQuery"):
+            query = _STRING_ARG_RE.search(args or "")
+            facts["queries"].append(query.group(1)[:80] if query else name)
+
+    for kind, name, tail in _JAVA_TYPE_RE.findall(code):
+        facts["classes"].append(name)
+        if kind == "enum":
+            facts["patterns"].append("Enum")
+        elif kind == "record":
+            facts["patterns"].append("Record")
+        if re.search(r"\b(?:Jpa|Crud|PagingAndSorting|Mongo)Repository\b", tail):
+            facts["patterns"].append("Repository")
+
+    for _, name, _, body in _JAVA_METHOD_RE.findall(code):
+        if name in _JAVA_NOT_METHOD or name in facts["classes"]:
+            continue
+        if _DERIVED_QUERY_RE.match(name) and body == ";":
+            facts["queries"].append(name)
+        elif body == "{" and not _JAVA_ACCESSOR_RE.match(name):
+            facts["logic_functions"] += 1
+
+    facts["queries"] += [m.group(0)[:80] for m in _SQL_RE.finditer(code) if "Query" not in facts["annotations"]]
+    facts["third_party"] = [m for m in facts["imports"] if not m.startswith(("java.", "javax.annotation"))]
+    return facts
+
+
+def _parse_js(content: str) -> dict:
+    code = _strip_comments(content)
+
+    functions = [
+        next(g for g in m.groups() if g is not None)
+        for m in _JS_FUNCTION_RE.finditer(code)
+    ]
+    functions = [f for f in functions if f not in _JS_NOT_FUNCTION]
+
+    facts = {
+        "imports": _JS_IMPORT_RE.findall(code),
+        "annotations": [name for name, _ in _ANNOTATION_RE.findall(code)],
+        "classes": [], "endpoints": [], "queries": [m.group(0)[:80] for m in _SQL_RE.finditer(code)],
+        "control_flow": len(_CONTROL_FLOW_RE.findall(code)) + len(re.findall(r"&&\s*<", code)),
+        "logic_functions": len(functions) + len(_JS_HOOK_RE.findall(code)),
+        "calls": 0, "patterns": [], "modules": []
+    }
+
+    for kind, name in _JS_TYPE_RE.findall(code):
+        facts["classes"].append(name)
+        if kind in ("interface", "type"):
+            facts["patterns"].append("Type definition")
+        elif kind == "enum":
+            facts["patterns"].append("Enum")
+
+    facts["endpoints"] += [f"{method.upper()} {path}" for method, path in _JS_ROUTE_RE.findall(code)]
+    facts["endpoints"] += [f"{method.upper()} {path}".strip() for method, path in _JS_DECORATOR_ROUTE_RE.findall(code)]
+
+    if _JSX_RE.search(code):
+        facts["patterns"].append("React component")
+        facts["logic_functions"] += 2  # 화면 컴포넌트는 로직이 적어도 기능 단서가 많음
+
+    facts["third_party"] = [m for m in facts["imports"] if not m.startswith((".", "/", "@/", "~/"))]
+    return facts
+#################################################################
+
+
+### 레이어 추정: annotation → 클래스 이름 접미사 → 디렉토리 이름 순
+def guess_layer(path: str, facts: dict) -> tuple[str, float]:
+    for annotation in facts["annotations"]:
+        if annotation in LAYER_ANNOTATIONS:
+            return LAYER_ANNOTATIONS[annotation], 0.8
+    if "Repository" in facts["patterns"]:
+        return "repository", 0.8
+
+    for class_name in facts["classes"]:
+        for suffix, layer in LAYER_BY_NAME_SUFFIX:
+            if class_name.endswith(suffix):
+                return layer, 0.6
+
+    normalized = path.replace("\\", "/")
+    if normalized.endswith("__init__.py"):
+        return "package-init", 0.9
+    if "Enum" in facts["patterns"]:
+        return "enum", 0.7
+
+    for directory in reversed(normalized.split("/")[:-1]):
+        if directory.lower() in LAYER_BY_DIRECTORY:
+            return LAYER_BY_DIRECTORY[directory.lower()], 0.5
+
+    if facts["endpoints"]:
+        return "controller", 0.6
+    return "", 0.0
+
+
+### 로직 복잡도 점수 (클수록 LLM 요약 가치가 큼)
+def triviality_score(facts: dict) -> float:
+    derived_queries = sum(1 for q in facts["queries"] if _DERIVED_QUERY_RE.match(q))
+    return round(
+        2 * facts["control_flow"]
+        + 3 * len(facts["endpoints"])
+        + 2 * (len(facts["queries"]) - derived_queries)
+        + 0.5 * derived_queries
+        + facts["logic_functions"]
+        + facts["calls"] / 4,
+        2
+    )
+#################################################################
+
+
+### 파일 1개 정적 분석 → summarize_file_with_llm과 같은 스키마 (지원하지 않는 언어 / 파싱 실패면 None)
+def analyze_file_statically(path: str, content: str, truncated: bool = False) -> dict | None:
+    extension = "." + path.rsplit(".", 1)[-1].lower() if "." in path else ""
+    language = LANGUAGE_BY_EXTENSION.get(extension)
+    if language is None:
+        return None
+
+    if language == "Python":
+        facts = _parse_python(content)
+    elif language == "Java":
+        facts = _parse_java(content)
+    else:
+        facts = _parse_js(content)
+    if facts is None:
+        return None
+
+    layer, confidence = guess_layer(path, facts)
+    score = triviality_score(facts)
+    generated = any(marker in content[:1000] for marker in GENERATED_MARKERS)
+
+    # 잘린 파일(snippet)은 중간 로직을 못 봤으므로 항상 LLM으로
+    trivial = not truncated and layer not in NON_TRIVIAL_LAYERS and (generated or score < TRIVIAL_SCORE_THRESHOLD)
+
+    frameworks, libraries, data_access = [], [], []
+    for module in facts["third_party"]:
+        known = _known_import(module)
+        if known is None:
+            libraries.append(module.split("/")[0] if not module.startswith("@") else "/".join(module.split("/")[:2]))
+            continue
+        name, is_framework = known
+        (frameworks if is_framework else libraries).append(name)
+        if name in DATA_ACCESS_SIGNALS:
+            data_access.append(DATA_ACCESS_SIGNALS[name])
+    if language != "Java":
+        libraries = [lib for lib in libraries if lib.split(".")[0] not in ("typing", "__future__")]
+
+    annotations = _uniq(facts["annotations"])
+    patterns = _uniq(facts["patterns"] + (["Lombok"] if "Lombok" in libraries else []) + (["DTO"] if layer == "dto" else []))
+    cross_cutting = _uniq(CROSS_CUTTING_ANNOTATIONS.get(a) for a in annotations)
+
+    keywords = _uniq(_domain_keyword(c) for c in facts["classes"])
+    evidence = (
+        [{"type": "endpoint", "text": e} for e in _uniq(facts["endpoints"])]
+        + [{"type": "query", "text": q} for q in _uniq(facts["queries"])]
+        + [{"type": "annotation", "text": f"@{a}"} for a in annotations]
+        + [{"type": "import", "text": m} for m in _uniq(facts["imports"])]
+    )[:MAX_EVIDENCE]
+
+    cluster_keys = _uniq(
+        [f"{k}+{layer}" for k in keywords[:3] if layer]
+        + [layer]
+        + [f"db+{d.lower()}" for d in _uniq(data_access)]
+    )
+
+    return {
+        "file": {
+            "path": path,
+            "language": language,
+            "frameworks": _uniq(frameworks),
+            "libraries": _uniq(libraries),
+            "layer_guess": layer,
+            "confidence": confidence
+        },
+        "domain_signals": {
+            "keywords": keywords,
+            "entities": _uniq(facts["classes"]),
+            "modules": facts["modules"]
+        },
+        "feature_candidates": [],
+        "technique_signals": {
+            "data_access": _uniq(data_access),
+            "patterns": patterns,
+            "cross_cutting": cross_cutting
+        },
+        "quality_signals": {
+            "strengths": [],
+            "risks": [],
+            "missing_standard_checks": []
+        },
+        "evidence": evidence,
+        "handoff_tags": {
+            "cluster_keys": cluster_keys,
+            "related_files_guess": []
+        },
+        "analysis_source": "static",
+        "static_analysis": {
+            "trivial": trivial,
+            "score": score,
+            "generated": generated,
+            "control_flow": facts["control_flow"],
+            "logic_functions": facts["logic_functions"],
+            "endpoints": len(facts["endpoints"]),
+            "queries": len(facts["queries"])
+        }
+    }
@@ -0,0 +1,13 @@
+import json
+
+
+### 토큰 수 대략 추정 (tokenizer 없이)
+# - 영문/코드: 약 4자당 1토큰
+# - 한글 등 non-ascii: 약 1자당 1토큰
+def estimate_tokens(text) -> int:
+    if not isinstance(text, str):
+        text = json.dumps(text, ensure_ascii=False)
+
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_count = len(text) - non_ascii
+    return ascii_count // 4 + non_ascii + 1
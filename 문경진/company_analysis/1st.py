@@ -1,8 +1,13 @@
 import os
+import sys
 import json
-from openai import OpenAI
+import asyncio
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # 문경진/common 공통 모듈 경로
+from common.llm_provider import OpenAIChatProvider, run_bounded
+
 load_dotenv()
 
 # =========================
@@ -12,12 +17,17 @@ BASE_DIR = "crawling\output"
 DART_DIR = os.path.join(BASE_DIR, "dart")
 NEWS_DIR = os.path.join(BASE_DIR, "news")
 
-client = OpenAI(
-    api_key=os.getenv("GMS_API_KEY"),
-    base_url=os.getenv("GMS_GPT_BASE_URL")
-)  # OPENAI_API_KEY 환경변수 사용
-
 MODEL = "gpt-4.1-mini"
+MAX_CONCURRENCY = 8  # 동시에 분석할 기업 수
+
+
+def make_provider() -> OpenAIChatProvider:
+    return OpenAIChatProvider(
+        model=MODEL,
+        api_key=os.getenv("GMS_API_KEY"),
+        base_url=os.getenv("GMS_GPT_BASE_URL"),
+        temperature=0.2
+    )
 
 
 # =========================
@@ -77,37 +87,48 @@ def build_prompt(company: str, dart_info: str, news_info: list) -> str:
 # =========================
 # LLM 호출
 # =========================
-def analyze_company(company: str) -> dict:
+async def analyze_company(company: str, provider: OpenAIChatProvider) -> dict:
     dart_info = load_dart_info(company)
     news_info = load_news_info(company)
 
     prompt = build_prompt(company, dart_info, news_info)
 
-    response = client.chat.completions.create(
-        model=MODEL,
-        messages=[
-            {"role": "system", "content": "너는 사실 기반 기업 분석 전문가다."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.2
+    return await provider.complete_json(
+        prompt,
+        system="너는 사실 기반 기업 분석 전문가다."
     )
 
-    return json.loads(response.choices[0].message.content)
+
+# 여러 기업을 MAX_CONCURRENCY개씩 동시에 분석 → {기업명: 결과}, 실패한 기업은 결과 대신 예외
+async def analyze_companies(companies: list, concurrency: int = MAX_CONCURRENCY) -> dict:
+    async with make_provider() as provider:
+        results = await run_bounded(
+            lambda company: analyze_company(company, provider),
+            companies,
+            concurrency=concurrency,
+            return_exceptions=True
+        )
+    return dict(zip(companies, results))
 
 
 # =========================
 # 실행 예시
 # =========================
 if __name__ == "__main__":
-    company = "비바리퍼블리카"  # 사용자 입력
-    result = analyze_company(company)
+    companies = ["비바리퍼블리카"]  # 사용자 입력 (여러 개면 동시에 분석)
+    results = asyncio.run(analyze_companies(companies))
 
     output_dir = r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\company_analysis"
     os.makedirs(output_dir, exist_ok=True)
 
-    output_path = os.path.join(output_dir, f"{company}_analysis.json")
+    for company, result in results.items():
+        if isinstance(result, Exception):
+            print(f"❌ 기업 분석 실패: {company} :: {result}")
+            continue
+
+        output_path = os.path.join(output_dir, f"{company}_analysis.json")
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
 
-    print(f"✅ 기업 분석 결과 저장 완료: {output_path}")
+        print(f"✅ 기업 분석 결과 저장 완료: {output_path}")
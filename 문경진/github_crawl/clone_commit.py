@@ -1,7 +1,8 @@
 import os
 import json
+import subprocess
 import requests
-from datetime import datetime
+from datetime import datetime, timezone
 
 # ==============================
 # 설정값
@@ -14,6 +15,9 @@ SAVE_DIR = rf"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\{REPO}"
 SAVE_FILE = f"{OWNER}_{REPO}_commit_metadata.json"
 SAVE_PATH = os.path.join(SAVE_DIR, SAVE_FILE)
 
+# 로컬 클론 경로 (clone_repo.py로 받은 레포) → git log로 바로 추출, API 호출 없음
+REPO_PATH = rf"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\{REPO}"
+
 # ==============================
 # GitHub 커밋 수집 함수
 # ==============================
@@ -64,6 +68,79 @@ def structure_commits(commits):
 
     return structured
 
+# ==============================
+# 로컬 git log 기반 커밋 수집 (REST 페이지네이션 대체)
+# ==============================
+# 커밋 헤더: \x1e(시작) 작성자 \x1f 작성일 \x1f 메시지 \x1d(끝), 그 뒤로 --numstat 줄들
+GIT_LOG_FORMAT = "%x1e%an%x1f%aI%x1f%B%x1d"
+
+def to_utc_iso(date_str):
+    # GitHub API와 같은 형식 (예: 2024-01-01T12:00:00Z)
+    return datetime.fromisoformat(date_str).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def iter_local_commits(repo_path):
+    """
+    로컬 클론에서 git log를 한 번만 스트리밍으로 읽어 커밋을 최신순으로 yield 한다.
+    structure_commits와 같은 스키마(message, author_name, author_date)에
+    files_changed, insertions, deletions를 추가한다. (바이너리 파일은 줄 수 0으로 셈)
+    - shallow clone이면 받아온 히스토리까지만 나옴
+    - partial clone(--filter=blob:none)이면 numstat 계산 때 blob을 추가로 받아오므로 느릴 수 있음
+    """
+    process = subprocess.Popen(
+        ["git", "-C", repo_path, "log", f"--format={GIT_LOG_FORMAT}", "--numstat", "--no-renames"],
+        stdout=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace"
+    )
+
+    current = None
+    header = None  # 메시지가 여러 줄이라 \x1d가 나올 때까지 모음
+
+    for line in process.stdout:
+        if line.startswith("\x1e"):
+            if current:
+                yield current
+            current = None
+            header = line[1:]
+        elif header is not None:
+            header += line
+        elif current and line.strip():
+            added, deleted, _ = line.rstrip("\n").split("\t", 2)
+            current["files_changed"] += 1
+            current["insertions"] += int(added) if added.isdigit() else 0
+            current["deletions"] += int(deleted) if deleted.isdigit() else 0
+            continue
+        else:
+            continue
+
+        if "\x1d" in header:
+            author_name, author_date, message = header.split("\x1d", 1)[0].split("\x1f", 2)
+            current = {
+                "message": message.rstrip("\n"),
+                "author_name": author_name,
+                "author_date": to_utc_iso(author_date),
+                "files_changed": 0,
+                "insertions": 0,
+                "deletions": 0
+            }
+            header = None
+
+    if current:
+        yield current
+
+    process.stdout.close()
+    if process.wait() != 0:
+        raise subprocess.CalledProcessError(process.returncode, process.args)
+
+def is_shallow_repo(repo_path):
+    result = subprocess.run(
+        ["git", "-C", repo_path, "rev-parse", "--is-shallow-repository"],
+        capture_output=True,
+        text=True
+    )
+    return result.stdout.strip() == "true"
+
 # ==============================
 # JSON 저장
 # ==============================
@@ -87,13 +164,19 @@ def save_to_json(data, path):
 # 실행
 # ==============================
 if __name__ == "__main__":
-    print("GitHub 커밋 수집 시작...")
-    commits = get_all_commits(OWNER, REPO)
-
-    print(f"총 커밋 수: {len(commits)}")
-
-    print("커밋 메타데이터 구조화 중...")
-    structured_commits = structure_commits(commits)
+    if os.path.isdir(os.path.join(REPO_PATH, ".git")):
+        print("로컬 git log 커밋 수집 시작...")
+        if is_shallow_repo(REPO_PATH):
+            print("shallow clone이라 일부 커밋만 수집됨 (전체가 필요하면 depth 없이 clone)")
+        structured_commits = list(iter_local_commits(REPO_PATH))
+    else:
+        print("GitHub 커밋 수집 시작...")
+        commits = get_all_commits(OWNER, REPO)
+
+        print("커밋 메타데이터 구조화 중...")
+        structured_commits = structure_commits(commits)
+
+    print(f"총 커밋 수: {len(structured_commits)}")
 
     print("JSON 파일 저장 중...")
     save_to_json(structured_commits, SAVE_PATH)
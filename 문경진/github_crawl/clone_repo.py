@@ -1,6 +1,7 @@
 import os
 import subprocess
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 OWNER = 'HTTP501'
 REPO = 'idk'
@@ -9,7 +10,18 @@ base_dir = r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl" # 레포
 repo_url = rf"https://github.com/{OWNER}/{REPO}.git" # 가져올 레포 url
 
 # 레포 클론해서 가져오기
-def clone_github_repo(repo_url: str, base_dir="repos") -> str:
+# - depth: 히스토리가 필요 없으면 1 (shallow clone)
+# - blob_filter: 커밋 히스토리는 필요하지만 과거 파일 내용은 필요 없으면 True (--filter=blob:none, partial clone)
+# - 이미 클론된 레포는 다시 받지 않고 git pull --ff-only로 원격 최신 커밋 반영 (update_existing=False면 그대로 사용)
+#   reset_local=True면 로컬 변경을 버리고 원격 커밋으로 강제로 맞춤 (force push된 레포 등)
+def clone_github_repo(
+    repo_url: str,
+    base_dir="repos",
+    depth: int | None = None,
+    blob_filter: bool = False,
+    update_existing: bool = True,
+    reset_local: bool = False
+) -> str:
 
     os.makedirs(base_dir, exist_ok=True)
 
@@ -17,17 +29,178 @@ def clone_github_repo(repo_url: str, base_dir="repos") -> str:
     repo_path = os.path.join(base_dir, repo_name)
 
     if os.path.exists(repo_path):
-        print(f"이미 존재함: {repo_path}")
+        if update_existing:
+            update_github_repo(repo_path, depth=depth, reset_local=reset_local)
+        else:
+            print(f"이미 존재함: {repo_path}")
         return repo_path
 
+    command = ["git", "clone", "--quiet"]
+    if depth:
+        command += ["--depth", str(depth)]
+    if blob_filter:
+        command += ["--filter=blob:none"]
+
     print(f"Cloning {repo_url}")
     subprocess.run(
-        ["git", "clone", repo_url, repo_path],
+        [*command, repo_url, repo_path],
         check=True
     )
 
     return repo_path
 
-clone_github_repo(repo_url=repo_url, base_dir=base_dir)
+# 기존 클론을 원격 최신 커밋으로 갱신
+# - 기본: fast-forward만 (로컬 변경 / 갈라진 히스토리가 있으면 git 에러 → 로컬 작업을 지우지 않음)
+# - reset_local=True: 원격 기본 브랜치를 fetch해서 reset --hard (로컬 변경은 버림)
+#   depth는 이때만 사용 (fast-forward는 기존 shallow 경계부터 새 커밋만 받음)
+def update_github_repo(repo_path: str, depth: int | None = None, reset_local: bool = False) -> str:
+    print(f"Fetching {repo_path}")
+
+    if not reset_local:
+        run_git(repo_path, "pull", "--quiet", "--ff-only")
+        return repo_path
+
+    fetch_args = ["fetch", "--quiet", "origin", "HEAD"]
+    if depth:
+        fetch_args[1:1] = ["--depth", str(depth)]
+
+    run_git(repo_path, *fetch_args)
+    run_git(repo_path, "reset", "--quiet", "--hard", "FETCH_HEAD")
+    return repo_path
+########################################################################################
+
+
+### 여러 레포 병렬 클론 (worker pool)
+def clone_many_repos(
+    repo_urls: list,
+    base_dir="repos",
+    max_workers: int = 4,
+    depth: int | None = None,
+    blob_filter: bool = False
+) -> dict:
+    """
+    repo_urls를 최대 max_workers개씩 동시에 clone / fetch 한다.
+    기본은 전체 clone: clone_commit.iter_local_commits가 git log --numstat으로 전체 히스토리를 읽음
+    - depth를 주면 shallow clone이라 커밋 분석에 그 개수만큼의 히스토리만 보임
+    - blob_filter=True(partial clone)면 numstat 계산 때 blob을 하나씩 추가로 받아와서 느림
+    반환: {repo_url: 로컬 경로} (실패한 레포는 ERROR 로그만 남기고 제외)
+    """
+    repo_paths = {}
+    total = len(repo_urls)
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                clone_github_repo,
+                repo_url=url,
+                base_dir=base_dir,
+                depth=depth,
+                blob_filter=blob_filter
+            ): url
+            for url in repo_urls
+        }
+
+        for future in as_completed(futures):
+            url = futures[future]
+            done += 1
+
+            try:
+                repo_paths[url] = future.result()
+                print(f"[{done}/{total}] DONE   {url}")
+            except Exception as e:
+                print(f"[{done}/{total}] ERROR  {url} :: {e}")
+
+    return repo_paths
+########################################################################################
+
+
+### 증분 분석용 git 헬퍼
+class CommitNotFoundError(LookupError):
+    """원격에서도 커밋을 찾을 수 없음 (force push로 사라진 커밋 등) → 증분 분석 불가, 전체 분석 필요"""
+
+
+def run_git(repo_path: str, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", repo_path, *args],
+        check=True,
+        capture_output=True,
+        text=True,
+        encoding="utf-8"
+    )
+    return result.stdout
+
+# 현재 체크아웃된 커밋 SHA
+def get_head_commit_sha(repo_path: str) -> str:
+    return run_git(repo_path, "rev-parse", "HEAD").strip()
+
+# 원격의 새 커밋 반영(fast-forward) 후 HEAD SHA 반환
+def pull_github_repo(repo_path: str, reset_local: bool = False) -> str:
+    update_github_repo(repo_path, reset_local=reset_local)
+    return get_head_commit_sha(repo_path)
+
+def has_commit(repo_path: str, sha: str) -> bool:
+    try:
+        run_git(repo_path, "cat-file", "-e", f"{sha}^{{commit}}")
+        return True
+    except subprocess.CalledProcessError:
+        return False
+
+# since_sha가 로컬에 없으면 받아옴
+# - shallow clone: 나머지 히스토리 전체 fetch (--unshallow는 shallow 레포에서만 가능)
+# - 전체 클론: 해당 커밋만 원격에서 fetch
+# 그래도 없으면 CommitNotFoundError
+def ensure_commit_available(repo_path: str, sha: str):
+    if has_commit(repo_path, sha):
+        return
+
+    if run_git(repo_path, "rev-parse", "--is-shallow-repository").strip() == "true":
+        print(f"{sha[:7]} 커밋이 로컬에 없음 → 전체 히스토리 fetch")
+        run_git(repo_path, "fetch", "--quiet", "--unshallow", "origin")
+    else:
+        print(f"{sha[:7]} 커밋이 로컬에 없음 → 원격에서 커밋 fetch")
+        try:
+            run_git(repo_path, "fetch", "--quiet", "origin", sha)
+        except subprocess.CalledProcessError:
+            pass
+
+    if not has_commit(repo_path, sha):
+        raise CommitNotFoundError(f"{sha[:7]} 커밋을 원격에서도 찾을 수 없음")
+
+def get_changed_files_since(repo_path: str, since_sha: str, until_sha: str = "HEAD") -> tuple[set, set]:
+    """
+    since_sha 이후 변경된 파일 목록을 (changed, deleted)로 반환한다.
+    - changed: 추가/수정된 파일 (rename의 새 경로 포함)
+    - deleted: 삭제된 파일 (rename의 이전 경로 포함)
+    경로는 레포 루트 기준 상대경로이며 구분자는 "/"
+    """
+    ensure_commit_available(repo_path, since_sha)
+    output = run_git(repo_path, "diff", "--name-status", "-M", since_sha, until_sha)
+
+    changed, deleted = set(), set()
+    for line in output.splitlines():
+        parts = line.split("\t")
+        if len(parts) < 2:
+            continue
+
+        status = parts[0]
+        if status.startswith("R"):
+            deleted.add(parts[1])
+            changed.add(parts[2])
+        elif status.startswith("D"):
+            deleted.add(parts[1])
+        else:
+            changed.add(parts[-1])
+
+    return changed, deleted
+
 
+if __name__ == "__main__":
+    clone_github_repo(repo_url=repo_url, base_dir=base_dir)
 
+    # 사용자 레포 여러 개를 한 번에 받을 때 (커밋 분석에 전체 히스토리가 필요하므로 shallow clone 안 함)
+    # clone_many_repos(
+    #     repo_urls=[rf"https://github.com/{OWNER}/{name}.git" for name in ["idk", "algogo_server"]],
+    #     base_dir=base_dir,
+    #     max_workers=4
+    # )
@@ -1,11 +1,23 @@
 import os
+import sys
 import json
-import re
 from pathlib import Path
 from typing import List, Dict
 from openai import OpenAI
 from dotenv import load_dotenv
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # 문경진/common 공통 모듈 경로
+from common.summary_cache import SummaryCache
+from common.batching import pack_into_batches
+from common.token_utils import estimate_tokens
+from common.snippet import read_text_snippet, SNIPPET_THRESHOLD_BYTES
+from common.instrumentation import instrument, annotate, record_llm_usage
+from common.hierarchical_reduce import reduce_summaries_hierarchically
+from common.static_analyzer import analyze_file_statically
+from common.path_filter import PathFilter
+from common.dedup import DuplicateIndex
+from common.json_parser import parse_llm_json
+
 load_dotenv()
 
 client = OpenAI(
@@ -15,7 +27,10 @@ client = OpenAI(
 
 
 ### 개별 파일 내 코드가 너무 길 때, 처음 1500자와 끝 1500자만 input으로 넣어서 분석 및 요약
-def make_snippet_for_llm(text: str, head_len=1500, tail_len=1500) -> str:
+SNIPPET_HEAD_LEN = 1500
+SNIPPET_TAIL_LEN = 1500
+
+def make_snippet_for_llm(text: str, head_len=SNIPPET_HEAD_LEN, tail_len=SNIPPET_TAIL_LEN) -> str:
     if len(text) <= head_len + tail_len:
         return text
     return (
@@ -26,14 +41,34 @@ def make_snippet_for_llm(text: str, head_len=1500, tail_len=1500) -> str:
 ########################################################################################
 
 
-### json 로드 시 불필요한 노이즈 제거
-def safe_json_loads(text: str) -> dict:
-    cleaned = re.sub(r"```(?:json)?", "", text).strip()
-    start = cleaned.find("{")
-    end = cleaned.rfind("}")
-    if start == -1 or end == -1:
-        raise ValueError("JSON 파싱 실패")
-    return json.loads(cleaned[start:end+1])
+### 단계별 LLM 응답 JSON 스키마 (common/json_parser.parse_llm_json으로 추출 / 검증)
+# {key: 기본값} - 빠지거나 null인 key는 기본값으로 채우고, 타입이 다르면 파싱 실패로 처리
+FILE_SUMMARY_SCHEMA = {
+    "file": {},
+    "domain_signals": {},
+    "feature_candidates": [],
+    "technique_signals": {},
+    "quality_signals": {},
+    "evidence": [],
+    "handoff_tags": {}
+}
+BATCH_SUMMARY_SCHEMA = {
+    "batch_mixture_flag": False,
+    "languages": [],
+    "technologies": [],
+    "feature_clusters": [],
+    "suggested_cluster_keys": []
+}
+FINAL_REPORT_SCHEMA = {
+    "project_domain": "",
+    "tech_stack": {},
+    "core_features": [],
+    "collaboration_style": ""
+}
+COMMIT_STYLE_SCHEMA = {
+    "collaboration_type": "",
+    "collaboration_signals": {}
+}
 ########################################################################################
 
 
@@ -54,40 +89,109 @@ EXCLUDE_DIRS = {
     ".DS_Store", "Thumbs.db", ".jpg", ".png"
 }
 
-def load_repo_as_analysis_input(repo_root: str, ALLOWED_EXTENSIONS=ALLOWED_EXTENSIONS, EXCLUDE_DIRS=EXCLUDE_DIRS) -> List[Dict]:
-    repo_files = []
+def normalize_repo_path(path: str) -> str:
+    return path.replace("\\", "/")
 
-    for root, dirs, files in os.walk(repo_root):
-        dirs[:] = [d for d in dirs if d not in EXCLUDE_DIRS]
+# 통째로 읽지 않고 건너뛸 파일 (크기 / 생성물 / 바이너리)
+MAX_FILE_BYTES = 1_000_000  # 1MB 초과 파일은 vendored / 생성 코드로 보고 제외
+GENERATED_FILE_SUFFIXES = (
+    ".min.js", ".bundle.js", ".chunk.js", ".d.ts",
+    "_pb2.py", "_pb2_grpc.py",
+    "pnpm-lock.yaml", "yarn.lock"
+)
 
-        for file in files:
-            if not file.endswith(ALLOWED_EXTENSIONS):
+def iter_repo_files(
+    repo_root: str,
+    ALLOWED_EXTENSIONS=ALLOWED_EXTENSIONS,
+    EXCLUDE_DIRS=EXCLUDE_DIRS,
+    only_paths: set | None = None,
+    max_file_bytes: int = MAX_FILE_BYTES,
+    snippet_threshold_bytes: int = SNIPPET_THRESHOLD_BYTES,
+    skip_paths: set | None = None,
+    use_gitignore: bool = True
+):
+    """
+    레포 파일을 하나씩 읽어서 {"path", "content"}를 yield하는 제너레이터.
+    - 파일을 읽기 전에 stat으로 크기를 확인해서 max_file_bytes 초과 파일은 읽지 않고 제외
+    - snippet_threshold_bytes보다 큰 파일은 전체를 읽지 않고 LLM에 들어갈 앞/뒤 snippet 분량만 읽음
+      (content가 make_snippet_for_llm 결과와 같은 snippet, "truncated": True)
+    - 생성 파일(GENERATED_FILE_SUFFIXES)과 바이너리(앞부분에 NUL 바이트)는 제외
+    - only_paths가 주어지면 해당 경로("/" 구분 상대경로)의 파일만 로드 (증분 분석용)
+    - skip_paths에 있는 경로는 읽지 않고 건너뜀 (중단된 실행 이어하기용)
+    - use_gitignore=True면 레포의 .gitignore에 걸리는 파일/디렉토리도 제외
+    """
+    # 확장자 / 생성 파일 / 제외 디렉토리 / .gitignore 규칙을 미리 컴파일해서 한 번의 탐색으로 적용
+    path_filter = PathFilter(
+        extensions=ALLOWED_EXTENSIONS,
+        exclude_dirs=EXCLUDE_DIRS,
+        exclude_suffixes=GENERATED_FILE_SUFFIXES,
+        skip_hidden_files=True,
+        use_gitignore=use_gitignore
+    )
+
+    for root, rel_dir, names in path_filter.iter_dirs(repo_root):
+        for file in names:
+            path = os.path.join(root, file)
+            rel_path = os.path.relpath(path, repo_root)
+            normalized_path = rel_dir + "/" + file if rel_dir else file
+            if only_paths is not None and normalized_path not in only_paths:
                 continue
-            if file.startswith("."):
+            if skip_paths and normalized_path in skip_paths:
                 continue
 
-            path = os.path.join(root, file)
             try:
-                content = Path(path).read_text(
-                    encoding="utf-8",
-                    errors="ignore"
+                if os.path.getsize(path) > max_file_bytes:
+                    print(f"SKIP (용량 초과) {rel_path}")
+                    continue
+
+                content, truncated = read_text_snippet(
+                    path,
+                    head_len=SNIPPET_HEAD_LEN,
+                    tail_len=SNIPPET_TAIL_LEN,
+                    threshold_bytes=snippet_threshold_bytes
                 )
             except Exception:
                 continue
 
-            repo_files.append({
-                "path": os.path.relpath(path, repo_root),
-                "content": content
-            })
+            if content is None:  # 바이너리
+                continue
+
+            yield {
+                "path": rel_path,
+                "content": content,
+                "truncated": truncated
+            }
 
-    return repo_files
+def load_repo_as_analysis_input(repo_root: str, ALLOWED_EXTENSIONS=ALLOWED_EXTENSIONS, EXCLUDE_DIRS=EXCLUDE_DIRS, only_paths: set | None = None) -> List[Dict]:
+    """
+    iter_repo_files 결과를 리스트로 한 번에 반환 (전체 목록이 필요할 때만 사용)
+    """
+    return list(iter_repo_files(
+        repo_root=repo_root,
+        ALLOWED_EXTENSIONS=ALLOWED_EXTENSIONS,
+        EXCLUDE_DIRS=EXCLUDE_DIRS,
+        only_paths=only_paths
+    ))
 ########################################################################################
 
 
 ### 개별 파일 단위 요약 및 분석
 MODEL_NAME = 'gpt-4o-mini'
-def summarize_file_with_llm(path: str, content: str, client, MODEL_NAME=MODEL_NAME) -> dict:
+FILE_PROMPT_VERSION = "file-summary-v1"  # 아래 프롬프트를 수정하면 버전도 올려서 기존 캐시를 무효화
+
+@instrument("file_summary")
+def summarize_file_with_llm(path: str, content: str, client, MODEL_NAME=MODEL_NAME, cache: SummaryCache | None = None) -> dict:
     snippet = make_snippet_for_llm(content)
+    annotate(path=path)
+
+    # 같은 snippet / 프롬프트 / 모델이면 캐시된 요약 재사용 (LLM 호출 생략)
+    if cache is not None:
+        cache_key = SummaryCache.make_key(snippet, FILE_PROMPT_VERSION, MODEL_NAME)
+        cached = cache.get(cache_key)
+        annotate(cache_hit=cached is not None)
+        if cached is not None:
+            cached.setdefault("file", {})["path"] = path
+            return cached
 
     prompt = f"""
 당신은 여러 프로젝트를 자동 분석하기 위해,
@@ -212,12 +316,147 @@ def summarize_file_with_llm(path: str, content: str, client, MODEL_NAME=MODEL_NA
         input=prompt,
         temperature=0.2
     )
+    record_llm_usage(prompt=prompt, response_text=response.output_text, usage=response.usage)
 
-    result = safe_json_loads(response.output_text)
+    result = parse_llm_json(response.output_text, schema=FILE_SUMMARY_SCHEMA)
+    result["file"]["path"] = path  # LLM이 경로를 바꿔 적는 경우 방지 (증분 분석에서 경로로 매칭)
+
+    if cache is not None:
+        cache.put(cache_key, result)
     return result
 ########################################################################################
 
 
+### 개별 파일 요약 병렬 처리 (동시 요청 수 제한)
+import threading
+from datetime import datetime
+import copy
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+
+def checkpoint_filename(path: str) -> str:
+    return path.replace("\\", "_").replace("/", "_") + ".json"
+
+def summarize_files_concurrently(
+    repo_files,
+    client,
+    output_dir: str,
+    max_workers: int = 8,
+    MODEL_NAME=MODEL_NAME,
+    cache: SummaryCache | None = None,
+    failed_paths: list | None = None,
+    on_done=None,
+    static_prefilter: bool = True,
+    dedup: DuplicateIndex | None = None
+) -> list:
+    """
+    summarize_file_with_llm 호출을 최대 max_workers개까지 동시에 실행한다.
+    - repo_files는 리스트 또는 iter_repo_files 제너레이터 (파일을 찾는 대로 바로 요약 시작)
+    - 대기 중인 파일은 max_workers * 2개까지만 메모리에 올려 둠
+    - 파일 요약이 끝나는 즉시 output_dir에 JSON으로 저장 (checkpoint)
+    - 반환 결과는 repo_files의 순서(경로 순서)를 그대로 유지
+    - 실패한 파일은 ERROR 로그만 남기고 결과에서 제외 (failed_paths가 주어지면 경로 추가)
+    - on_done(path)가 주어지면 checkpoint 저장 직후 호출 (RunManifest.mark_file_done 등)
+    - static_prefilter=True면 정적 분석(common/static_analyzer.py)에서 trivial로 판단된 파일
+      (DTO / enum / __init__.py 등)은 LLM 호출 없이 정적 요약을 그대로 사용 ("analysis_source": "static")
+    - dedup(DuplicateIndex)이 주어지면 내용이 같거나 거의 같은 파일은 대표 파일 1개만 요약하고,
+      나머지는 대표 요약을 복사해서 경로만 바꿔 저장 ("duplicate_of": 대표 경로)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def save_checkpoint(path: str, summary: dict) -> dict:
+        output_path = os.path.join(output_dir, checkpoint_filename(path))
+        with open(output_path, "w", encoding="utf-8") as out:
+            json.dump(summary, out, ensure_ascii=False, indent=2)
+
+        if on_done is not None:
+            on_done(normalize_repo_path(path))
+
+        return summary
+
+    def summarize_and_save(f: dict) -> dict:
+        summary = None
+        if static_prefilter:
+            summary = analyze_file_statically(f["path"], f["content"], truncated=f.get("truncated", False))
+            if summary is not None and not summary["static_analysis"]["trivial"]:
+                summary = None
+
+        if summary is None:
+            summary = summarize_file_with_llm(
+                path=f["path"],
+                content=f["content"],
+                client=client,
+                MODEL_NAME=MODEL_NAME,
+                cache=cache
+            )
+
+        return save_checkpoint(f["path"], summary)
+
+    # 중복 파일: 대표 파일 요약이 끝나면(다른 스레드를 막지 않고 callback으로) 복사해서 저장
+    def fan_out_duplicate(path: str, representative: str) -> Future:
+        duplicate_future = Future()
+
+        def on_representative_done(representative_future):
+            try:
+                summary = copy.deepcopy(representative_future.result())
+                summary.setdefault("file", {})["path"] = path
+                summary["duplicate_of"] = representative
+                duplicate_future.set_result(save_checkpoint(path, summary))
+            except Exception as e:
+                duplicate_future.set_exception(e)
+
+        representative_futures[representative].add_done_callback(on_representative_done)
+        return duplicate_future
+
+    total = len(repo_files) if hasattr(repo_files, "__len__") else "?"
+    results = {}
+    pending = {}  # future -> (순번, 경로)
+    representative_futures = {}  # 대표 파일 경로 -> future (dedup 사용 시)
+    done = 0
+
+    def collect(finished):
+        nonlocal done
+        for future in finished:
+            idx, path = pending.pop(future)
+            done += 1
+
+            try:
+                results[idx] = future.result()
+                if "duplicate_of" in results[idx]:
+                    status = "DUP   "
+                elif results[idx].get("analysis_source") == "static":
+                    status = "STATIC"
+                else:
+                    status = "DONE  "
+                print(f"[{done}/{total}] {status} {path}")
+            except Exception as e:
+                print(f"[{done}/{total}] ERROR  {path} :: {e}")
+                if failed_paths is not None:
+                    failed_paths.append(path)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for idx, f in enumerate(repo_files):
+            representative = dedup.find_or_add(f["path"], f["content"]) if dedup is not None else None
+
+            if representative is not None:
+                future = fan_out_duplicate(f["path"], representative)
+            else:
+                future = executor.submit(summarize_and_save, f)
+                if dedup is not None:
+                    representative_futures[f["path"]] = future
+            pending[future] = (idx, f["path"])
+
+            if len(pending) >= max_workers * 2:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(finished)
+
+    return [results[idx] for idx in sorted(results)]
+########################################################################################
+
+
 ### 배치 처리
 def split_into_batches(items: list, batch_size: int):
     return [
@@ -227,8 +466,218 @@ def split_into_batches(items: list, batch_size: int):
 ########################################################################################
 
 
+### 토큰 예산 기반 배치 나누기 (summarize_batch_semantic 프롬프트가 context 한도를 넘지 않도록)
+BATCH_MAX_TOKENS = 24000  # 배치 1개에 들어가는 파일 요약들의 추정 토큰 합 상한 (프롬프트 본문 제외)
+
+def batch_group_key(summary: dict, group_by: str | None):
+    if group_by == "directory":
+        return os.path.dirname(normalize_repo_path(summary.get("file", {}).get("path", "")))
+    if group_by == "cluster_key":
+        cluster_keys = summary.get("handoff_tags", {}).get("cluster_keys") or [""]
+        return cluster_keys[0]
+    return None
+
+def pack_paths_into_batches(
+    paths: list,
+    summaries_by_path: dict,
+    max_tokens: int = BATCH_MAX_TOKENS,
+    group_by: str | None = "directory"
+) -> list:
+    """
+    파일 요약의 직렬화 크기를 추정해서 max_tokens까지 채운 배치(경로 리스트)들로 나눈다.
+    group_by: "directory" / "cluster_key" / None → 같은 그룹의 파일을 같은 배치에 모음
+    """
+    return pack_into_batches(
+        items=paths,
+        max_tokens=max_tokens,
+        size_fn=lambda p: estimate_tokens(
+            json.dumps({"path": p, "analysis": summaries_by_path[p]}, ensure_ascii=False)
+        ),
+        group_fn=(lambda p: batch_group_key(summaries_by_path[p], group_by)) if group_by else None
+    )
+########################################################################################
+
+
+### 증분 분석: 분석한 커밋 SHA / 파일 / 배치 구성을 manifest로 기록하고 변경분만 다시 계산
+ANALYSIS_MANIFEST_NAME = "analysis_manifest.json"
+
+def load_analysis_manifest(output_dir: str) -> dict | None:
+    manifest_path = os.path.join(output_dir, ANALYSIS_MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_analysis_manifest(output_dir: str, manifest: dict):
+    manifest_path = os.path.join(output_dir, ANALYSIS_MANIFEST_NAME)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+# 이전 실행에서 저장한 파일 단위 요약 checkpoint 로드 (없거나 깨진 파일은 제외)
+def load_file_summary_checkpoints(paths, divided_summary_dir: str) -> dict:
+    summaries = {}
+    for path in paths:
+        checkpoint_path = os.path.join(divided_summary_dir, checkpoint_filename(path))
+        try:
+            with open(checkpoint_path, "r", encoding="utf-8") as f:
+                summaries[path] = json.load(f)
+        except (OSError, ValueError):
+            continue
+    return summaries
+
+def plan_incremental_batches(
+    previous_batches: list,
+    available_paths: list,
+    changed_paths: set,
+    batch_size: int = 10,
+    pack_fn=None
+) -> tuple[list, set]:
+    """
+    이전 배치 구성(previous_batches: [{"batch_id", "paths"}])을 최대한 유지하면서
+    - 변경/삭제/요약 실패 파일이 포함된 배치만 dirty로 표시
+    - 어느 배치에도 없던 새 파일은 새 batch_id로 pack_fn(없으면 split_into_batches)
+    (batch 구성, 다시 요약해야 할 batch_id 집합)을 반환한다.
+    """
+    available = set(available_paths)
+    batches = []
+    dirty_ids = set()
+    assigned = set()
+
+    for batch in previous_batches:
+        kept = [p for p in batch["paths"] if p in available]
+        assigned.update(kept)
+        if not kept:
+            continue
+
+        batches.append({"batch_id": batch["batch_id"], "paths": kept})
+        if len(kept) != len(batch["paths"]) or any(p in changed_paths for p in kept):
+            dirty_ids.add(batch["batch_id"])
+
+    next_id = max((b["batch_id"] for b in previous_batches), default=0) + 1
+    new_paths = [p for p in available_paths if p not in assigned]
+
+    if pack_fn is not None:
+        new_chunks = pack_fn(new_paths)
+    else:
+        new_chunks = split_into_batches(items=new_paths, batch_size=batch_size)
+
+    for chunk in new_chunks:
+        batches.append({"batch_id": next_id, "paths": chunk})
+        dirty_ids.add(next_id)
+        next_id += 1
+
+    return batches, dirty_ids
+########################################################################################
+
+
+### 중단된 실행 이어하기 (resume)
+# - run_manifest.json: 분석 중인 커밋 SHA / 상태(running, completed) / 배치 구성
+# - run_journal.jsonl: checkpoint를 저장할 때마다 한 줄씩 추가 ({"file": 경로} / {"batch": id, "plan": 배치 구성 버전})
+# 같은 커밋으로 다시 실행했을 때 이전 실행이 running 상태로 끝났으면
+# journal에 기록된 파일/배치는 디스크 checkpoint를 다시 읽고 다시 계산하지 않음
+RUN_MANIFEST_NAME = "run_manifest.json"
+RUN_JOURNAL_NAME = "run_journal.jsonl"
+
+class RunManifest:
+    def __init__(self, output_dir: str, commit_sha: str, resume: bool = True):
+        os.makedirs(output_dir, exist_ok=True)
+        self.manifest_path = os.path.join(output_dir, RUN_MANIFEST_NAME)
+        self.journal_path = os.path.join(output_dir, RUN_JOURNAL_NAME)
+        self._lock = threading.Lock()
+
+        previous = None
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+
+        self.resumed = bool(
+            resume and previous
+            and previous.get("status") == "running"
+            and previous.get("commit_sha") == commit_sha
+        )
+
+        self.done_files = set()
+        self.done_batches = set()
+
+        if self.resumed:
+            self.data = previous
+            self._read_journal()
+        else:
+            self.data = {
+                "commit_sha": commit_sha,
+                "status": "running",
+                "started_at": datetime.now().isoformat(timespec="seconds"),
+                "plan_version": 0,
+                "batch_plan": None,
+                "dirty_batch_ids": None
+            }
+            open(self.journal_path, "w", encoding="utf-8").close()
+            self._save()
+
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def _read_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:  # 비정상 종료로 마지막 줄이 잘린 경우
+                    continue
+                if "file" in entry:
+                    self.done_files.add(entry["file"])
+                elif entry.get("plan") == self.data["plan_version"]:
+                    self.done_batches.add(entry["batch"])
+
+    def _save(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _append(self, entry: dict):
+        with self._lock:
+            self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._journal.flush()
+
+    def mark_file_done(self, path: str):
+        self._append({"file": path})
+
+    def mark_batch_done(self, batch_id: int):
+        self.done_batches.add(batch_id)
+        self._append({"batch": batch_id, "plan": self.data["plan_version"]})
+
+    def saved_batch_plan(self, available_paths) -> tuple[list, set] | None:
+        """이전 실행의 배치 구성이 지금 파일 목록과 같으면 (batch_plan, dirty_batch_ids) 반환"""
+        plan = self.data.get("batch_plan")
+        if not plan:
+            return None
+        if {p for b in plan for p in b["paths"]} != set(available_paths):
+            return None
+        return plan, set(self.data["dirty_batch_ids"])
+
+    def set_batch_plan(self, batch_plan: list, dirty_batch_ids: set):
+        # 배치 구성이 바뀌면 이전 배치 완료 기록은 무효
+        self.data["plan_version"] += 1
+        self.data["batch_plan"] = batch_plan
+        self.data["dirty_batch_ids"] = sorted(dirty_batch_ids)
+        self.done_batches = set()
+        self._save()
+
+    def complete(self):
+        self.data["status"] = "completed"
+        self.data["completed_at"] = datetime.now().isoformat(timespec="seconds")
+        self._save()
+        self._journal.close()
+########################################################################################
+
+
 ### 배치 단위 의미 요약
+@instrument("batch_summary")
 def summarize_batch_semantic(batch_data: dict, client: OpenAI, model: str) -> dict:
+    annotate(batch_id=batch_data["batch_id"], files=len(batch_data["summaries"]))
+
     compact = [
         {
             "path": i["file"]["path"],   
@@ -347,14 +796,118 @@ def summarize_batch_semantic(batch_data: dict, client: OpenAI, model: str) -> di
         input=prompt,
         temperature=0.2
     )
+    record_llm_usage(prompt=prompt, response_text=response.output_text, usage=response.usage)
 
-    result = safe_json_loads(response.output_text)
+    result = parse_llm_json(response.output_text, schema=BATCH_SUMMARY_SCHEMA)
     result["batch_id"] = batch_data["batch_id"]
     return result
 #######################################################################################
 
 
 
+### 배치 요약이 많을 때 계층적으로 병합 (super-batch)
+# 배치 요약 전체가 최종 프롬프트 예산(FINAL_INPUT_MAX_TOKENS)을 넘으면
+# 여러 배치 요약 → super-batch 요약 1개로 병렬 병합을 반복해서 예산 안으로 줄인다.
+# 병합 결과는 배치 요약과 같은 스키마라서 다음 단계에서 다시 병합할 수 있다.
+FINAL_INPUT_MAX_TOKENS = 60000  # 최종 프롬프트에 들어가는 배치 요약들의 추정 토큰 합 상한
+
+@instrument("super_batch_summary")
+def merge_batch_summaries(batch_summaries: list, client: OpenAI, model: str, level: int, group_id: int) -> dict:
+    merged_batch_ids = [s.get("batch_id") for s in batch_summaries]
+    annotate(level=level, group_id=group_id, batches=len(batch_summaries))
+
+    prompt = f"""
+너는 개발자 프로젝트 레포지토리의 **배치 요약 병합 AI**다.
+
+아래 입력은 같은 프로젝트의 서로 다른 배치에서 추출한
+**배치 단위 기능 군집 요약(JSON)** 리스트다.
+너의 목표는 이 요약들을 **하나의 배치 요약과 같은 형식**으로 병합해서,
+다음 단계(전체 레포 분석)에서 그대로 재조립할 수 있게 만드는 것이다.
+
+---
+
+## 해야 할 일
+
+### 1) 기능 군집 병합
+- 서로 다른 배치에 있더라도 같은 도메인 / 유사한 책임 / 같은 기술 패턴을 가진
+  feature_clusters는 **하나의 군집으로 병합**하라.
+- 서로 다른 기능은 억지로 합치지 말고 분리된 군집으로 유지하라.
+- 병합 후 군집 수는 **1~8개**로 제한하고, 근거가 약한 군집부터 생략하라.
+
+### 2) 병합 규칙
+- domain_tags, implementation_signals, technologies, languages는 유니크하게 합쳐라.
+- responsibilities는 중복을 합쳐 3~8개로 정리하라.
+- related_files, evidence는 대표적인 것 위주로 **최대 10개**까지만 남겨라.
+- confidence는 여러 배치에서 반복 등장한 군집일수록 높게 조정하라.
+- 입력에 없는 기능이나 기술을 새로 만들어내지 마라.
+
+---
+
+## 출력 스키마 (JSON only)
+
+{{
+  "batch_id": "",
+  "batch_mixture_flag": false,
+  "languages": [],
+  "technologies": [],
+  "feature_clusters": [
+    {{
+      "cluster_name": "",
+      "domain_tags": [],
+      "responsibilities": [],
+      "implementation_signals": [],
+      "related_files": [],
+      "evidence": [],
+      "confidence": 0.0,
+      "risks_or_unknowns": []
+    }}
+  ],
+  "suggested_cluster_keys": []
+}}
+
+---
+
+[입력]
+{json.dumps(batch_summaries, ensure_ascii=False)}
+
+---
+
+⚠️ 주의사항
+
+- 반드시 **JSON만 출력**하고,
+  설명 문장이나 코드 블록은 절대 포함하지 마라.
+"""
+
+    response = client.responses.create(
+        model=model,
+        input=prompt,
+        temperature=0.2
+    )
+    record_llm_usage(prompt=prompt, response_text=response.output_text, usage=response.usage)
+
+    result = parse_llm_json(response.output_text, schema=BATCH_SUMMARY_SCHEMA)
+    result["batch_id"] = f"L{level}-{group_id}"
+    result["merged_batch_ids"] = merged_batch_ids
+    return result
+
+
+def reduce_batch_summaries(
+    batch_semantic_summaries: list,
+    client,
+    model: str,
+    max_tokens: int = FINAL_INPUT_MAX_TOKENS,
+    max_workers: int = 4
+) -> list:
+    return reduce_summaries_hierarchically(
+        batch_semantic_summaries,
+        merge_fn=lambda group, level, group_id: merge_batch_summaries(group, client, model, level, group_id),
+        max_tokens=max_tokens,
+        max_workers=max_workers
+    )
+#######################################################################################
+
+
+
 ### 배치 단위로 요약된 내용들을 바탕으로 최종 레포 분석에 사용할 프롬프트 구성
 def build_final_project_prompt(
     batch_semantic_summaries: list,
@@ -509,6 +1062,7 @@ def build_final_project_prompt(
 
 
 ### 배치 의미 요약들을 바탕으로 프로젝트 최종 분석 수행
+@instrument("final_report")
 def analyze_project_from_batches(
     batch_semantic_summaries: list,
     client,
@@ -528,14 +1082,18 @@ def analyze_project_from_batches(
         input=prompt,
         temperature=0.2
     )
+    record_llm_usage(prompt=prompt, response_text=response.output_text, usage=response.usage)
 
-    return safe_json_loads(response.output_text)
+    return parse_llm_json(response.output_text, schema=FINAL_REPORT_SCHEMA)
 #################################################################
 
 
 ### GitHub API로 언어 사용량 가져오기
 import requests
 
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")  # 벤치마크에서는 로컬 fake 서버
+
+@instrument("repo_languages")
 def fetch_repo_languages(
     owner: str,
     repo: str,
@@ -550,7 +1108,7 @@ def fetch_repo_languages(
         ...
     }
     """
-    url = f"https://api.github.com/repos/{owner}/{repo}/languages"
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/languages"
 
     headers = {
         "Accept": "application/vnd.github+json"
@@ -716,12 +1274,14 @@ def summarize_commit_style_with_llm(
         input=prompt,
         temperature=0.2
     )
+    record_llm_usage(prompt=prompt, response_text=response.output_text, usage=response.usage)
 
     return response.output_text.strip()
 ########################################################
 
 
 ### 커밋 요약 전체 함수
+@instrument("commit_style")
 def analyze_commit_style(
     commit_metadata: dict,
     client,
@@ -742,4 +1302,4 @@ def analyze_commit_style(
         model=model
     )
 
-    return safe_json_loads(raw)
+    return parse_llm_json(raw, schema=COMMIT_STYLE_SCHEMA)
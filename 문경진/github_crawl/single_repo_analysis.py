@@ -4,27 +4,48 @@ from pathlib import Path
 from typing import List, Dict
 from openai import OpenAI
 from dotenv import load_dotenv
-from single_analysis_method import load_repo_as_analysis_input, summarize_file_with_llm, split_into_batches, summarize_batch_semantic, get_repo_main_languages, analyze_commit_style, analyze_project_from_batches
+from single_analysis_method import iter_repo_files, summarize_files_concurrently, summarize_batch_semantic, get_repo_main_languages, analyze_commit_style, analyze_project_from_batches, reduce_batch_summaries, SummaryCache
+from single_analysis_method import normalize_repo_path, load_analysis_manifest, save_analysis_manifest, load_file_summary_checkpoints, plan_incremental_batches, pack_paths_into_batches, RunManifest
+from clone_repo import get_head_commit_sha, pull_github_repo, get_changed_files_since, CommitNotFoundError
+from common.instrumentation import configure_instrumentation, instrumented_http_client, stage_summary
+from common.pipeline_dag import PipelineDAG
+from common.dedup import DuplicateIndex
 
 # ==============================
 # 0. 기본 설정
 # ==============================
 
-OWNER = 'team-algogo'
-REPO = 'algogo_server'
+# 경로/설정값은 환경변수로 덮어쓸 수 있음 (benchmark/run_benchmark.py 등에서 사용)
+OWNER = os.getenv("ANALYSIS_OWNER", 'team-algogo')
+REPO = os.getenv("ANALYSIS_REPO", 'algogo_server')
 
-REPO_PATH = rf"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\{REPO}"
+REPO_PATH = os.getenv("ANALYSIS_REPO_PATH", rf"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\{REPO}")
 
-BASE_OUTPUT_DIR = rf"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\{OWNER}_{REPO}_summary"
+BASE_OUTPUT_DIR = os.getenv("ANALYSIS_OUTPUT_DIR", rf"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\{OWNER}_{REPO}_summary")
 DIVIDED_SUMMARY_DIR = os.path.join(BASE_OUTPUT_DIR, "repo_divided_summary")
 BATCH_SUMMARY_DIR = os.path.join(BASE_OUTPUT_DIR, "repo_batch_summary")
 
+# 파일 단위 요약 캐시 (레포/실행이 바뀌어도 재사용)
+SUMMARY_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR", r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\summary_cache")
+SUMMARY_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
 os.makedirs(DIVIDED_SUMMARY_DIR, exist_ok=True)
 os.makedirs(BATCH_SUMMARY_DIR, exist_ok=True)
 
-BATCH_SIZE = 10
-MODEL_NAME = "gpt-4o-mini"
+# 단계별 계측 결과 (wall time / 토큰 / 재시도) → 리포트 옆에 JSON lines로 저장
+STAGE_METRICS_PATH = os.path.join(BASE_OUTPUT_DIR, f"{OWNER}_{REPO}_stage_metrics.jsonl")
+configure_instrumentation(STAGE_METRICS_PATH, repo=f"{OWNER}/{REPO}")
+
+BATCH_MAX_TOKENS = 24000  # 배치 프롬프트에 들어가는 파일 요약 토큰 합 상한
+BATCH_GROUP_BY = "directory"  # "directory" / "cluster_key" / None
+FINAL_INPUT_MAX_TOKENS = int(os.getenv("ANALYSIS_FINAL_MAX_TOKENS", "60000"))  # 최종 프롬프트에 넣을 배치 요약 토큰 합 상한 (넘으면 계층적으로 병합)
+MODEL_NAME = os.getenv("ANALYSIS_MODEL_NAME", "gpt-4o-mini")
 TEMPERATURE = 0.2
+MAX_WORKERS = int(os.getenv("ANALYSIS_MAX_WORKERS", "8"))  # 동시에 진행할 파일 단위 LLM 호출 수
+STATIC_PREFILTER = os.getenv("ANALYSIS_STATIC_PREFILTER", "1") == "1"  # DTO / enum 등 trivial 파일은 정적 분석 결과로 대체
+DEDUP = os.getenv("ANALYSIS_DEDUP", "1") == "1"  # 복붙 / vendored 등 중복·유사 중복 파일은 대표 1개만 요약
+INCREMENTAL = os.getenv("ANALYSIS_INCREMENTAL", "1") == "1"  # 이전 분석 결과(analysis_manifest.json)가 있으면 변경된 파일/배치만 다시 분석
+RESUME = os.getenv("ANALYSIS_RESUME", "1") == "1"  # 같은 커밋의 이전 실행이 중간에 끊겼으면 저장된 checkpoint부터 이어서 실행
 
 # ==============================
 # 1. OpenAI Client
@@ -34,138 +55,256 @@ load_dotenv()
 
 client = OpenAI(
     api_key=os.getenv("GMS_API_KEY"),
-    base_url=os.getenv("GMS_BASE_URL")
+    base_url=os.getenv("GMS_BASE_URL"),
+    http_client=instrumented_http_client()  # SDK 내부 재시도 횟수까지 계측
 )
 
 # ==============================
-# 2. 레포 파일 로더
-# ==============================
-repo_files = load_repo_as_analysis_input(repo_root=REPO_PATH)
-print(f"레포 파일 로드 완료 (파일 갯수 : {len(repo_files)}")
-
-# ==============================
-# 3. 파일 단위 요약(개별 파일 - LLM 여러 번) + 저장
+# 2. 레포 파일 로더 (증분 모드면 마지막 분석 커밋 이후 변경된 파일만)
 # ==============================
+manifest = load_analysis_manifest(BASE_OUTPUT_DIR) if INCREMENTAL else None
 
-file_summaries = []
-total = len(repo_files)
-
-os.makedirs(DIVIDED_SUMMARY_DIR, exist_ok=True)
-
-for idx, f in enumerate(repo_files, start=1):
-    print(f"[{idx}/{total}] START  {f['path']}")
-
+if manifest:
+    head_sha = pull_github_repo(REPO_PATH)
     try:
-        summary = summarize_file_with_llm(
-            path=f['path'],
-            content=f["content"],
-            client=client
-        )
+        changed_paths, deleted_paths = get_changed_files_since(REPO_PATH, manifest["commit_sha"], head_sha)
+    except CommitNotFoundError as e:
+        print(f"{e} → 증분 분석 대신 전체 분석")
+        manifest = None
 
-        # 메모리에도 저장
-        file_summaries.append(summary)
+if manifest:
+    # 지난 실행에서 요약에 실패한 파일도 다시 시도
+    changed_paths |= set(manifest.get("failed_files", []))
+    changed_paths -= deleted_paths
 
-        # 즉시 파일로 저장 (checkpoint)
-        filename = (f["path"].replace("\\", "_").replace("/", "_") + ".json")
-        output_path = os.path.join(DIVIDED_SUMMARY_DIR, filename)
+    print(f"증분 분석: {manifest['commit_sha'][:7]} → {head_sha[:7]} (변경 {len(changed_paths)}개, 삭제 {len(deleted_paths)}개)")
+else:
+    head_sha = get_head_commit_sha(REPO_PATH)
+    changed_paths, deleted_paths = None, set()
 
-        with open(output_path, "w", encoding="utf-8") as out:
-            json.dump(summary, out, ensure_ascii=False, indent=2)
+# 실행 진행 상황 기록 (중간에 끊기면 다음 실행에서 완료된 파일/배치는 건너뜀)
+run = RunManifest(BASE_OUTPUT_DIR, head_sha, resume=RESUME)
+if run.resumed:
+    print(f"이전 실행 이어하기: 파일 {len(run.done_files)}개 / 배치 {len(run.done_batches)}개 완료됨")
 
-        print(f"[{idx}/{total}] DONE   {f['path']}")
+# 파일을 찾는 대로 바로 요약 단계로 넘기는 제너레이터 (전체 파일을 메모리에 올리지 않음)
+repo_files = iter_repo_files(repo_root=REPO_PATH, only_paths=changed_paths, skip_paths=run.done_files)
 
-    except Exception as e:
-        print(f"[{idx}/{total}] ERROR  {f['path']} :: {e}")
-
-
-# ==============================
-# 4. 파일 단위 요약 결과를 배치(10)으로 나누기
 # ==============================
-batches = split_into_batches(
-    items=file_summaries,
-    batch_size=10
-)
-print("배치(10)으로 나누기 완료")
-
+# 3. 파일 단위 요약(개별 파일 - LLM 여러 번, 동시 실행) + 저장
 # ==============================
+# 3~8 단계는 의존성 그래프(DAG)로 실행
+# - 파일 요약 → 배치 요약 → 최종 리포트는 순서대로
+# - 커밋 스타일 분석 / 언어 조회는 파일 요약과 상관없으므로 처음부터 동시에 실행
+def run_file_summaries() -> dict:
+    summary_cache = SummaryCache(cache_dir=SUMMARY_CACHE_DIR, max_bytes=SUMMARY_CACHE_MAX_BYTES)
+    failed_summary_paths = []
+    duplicate_index = DuplicateIndex() if DEDUP else None
+
+    file_summaries = summarize_files_concurrently(
+        repo_files=repo_files,
+        client=client,
+        output_dir=DIVIDED_SUMMARY_DIR,
+        max_workers=MAX_WORKERS,
+        MODEL_NAME=MODEL_NAME,
+        cache=summary_cache,
+        failed_paths=failed_summary_paths,
+        on_done=run.mark_file_done,
+        static_prefilter=STATIC_PREFILTER,
+        dedup=duplicate_index
+    )
+    print(f"파일 단위 요약 완료 (성공 {len(file_summaries)}/{len(file_summaries) + len(failed_summary_paths)})")
+    static_count = sum(1 for s in file_summaries if s.get("analysis_source") == "static")
+    print(f"정적 분석으로 요약 (LLM 호출 생략): {static_count}개")
+    if duplicate_index is not None:
+        print(f"중복 파일 현황 (완전 중복 / 유사 중복 / 대표): {duplicate_index.stats}")
+    print(f"요약 캐시 현황: {summary_cache.stats()}")
+
+    expected_paths = [normalize_repo_path(p) for p in failed_summary_paths]
+    summaries_by_path = {}
+    if manifest:
+        # 변경되지 않은 파일은 이전 checkpoint 재사용
+        unchanged_paths = [
+            p for p in manifest["files"]
+            if p not in changed_paths and p not in deleted_paths
+        ]
+        expected_paths += unchanged_paths
+        summaries_by_path.update(load_file_summary_checkpoints(unchanged_paths, DIVIDED_SUMMARY_DIR))
+
+    # 이어하기: 이전 실행에서 이미 요약한 파일은 checkpoint에서 로드
+    if run.done_files:
+        expected_paths += sorted(run.done_files)
+        summaries_by_path.update(load_file_summary_checkpoints(run.done_files, DIVIDED_SUMMARY_DIR))
+
+    for summary in file_summaries:
+        summaries_by_path[normalize_repo_path(summary["file"]["path"])] = summary
+
+    # 요약 실패 / checkpoint 유실 파일 → 다음 증분 실행에서 다시 시도
+    failed_files = sorted(p for p in expected_paths if p not in summaries_by_path)
+
+    return {"summaries_by_path": summaries_by_path, "failed_files": failed_files}
 
 
-# 5. 배치 단위로 의미 요약(LLM 1회 x batch 수) + 저장
 # ==============================
-batch_semantic_summaries = []
+# 4. 파일 단위 요약 결과를 토큰 예산 기준 배치로 나누기 (증분 모드면 변경 파일이 포함된 배치만 다시 계산)
+# 5. 배치 단위로 의미 요약(LLM 1회 x 변경된 batch 수) + 저장
+# ==============================
+def run_batch_summaries(file_summaries: dict) -> dict:
+    summaries_by_path = file_summaries["summaries_by_path"]
+
+    def pack_batches(paths: list) -> list:
+        return pack_paths_into_batches(
+            paths=paths,
+            summaries_by_path=summaries_by_path,
+            max_tokens=BATCH_MAX_TOKENS,
+            group_by=BATCH_GROUP_BY
+        )
 
-os.makedirs(BATCH_SUMMARY_DIR, exist_ok=True)
+    saved_plan = run.saved_batch_plan(summaries_by_path)
+    if saved_plan:
+        # 이어하기: 파일 목록이 같으면 이전 실행의 배치 구성을 그대로 써야 배치 checkpoint를 재사용할 수 있음
+        batch_plan, dirty_batch_ids = saved_plan
+    elif manifest:
+        batch_plan, dirty_batch_ids = plan_incremental_batches(
+            previous_batches=manifest["batches"],
+            available_paths=list(summaries_by_path),
+            changed_paths=changed_paths,
+            pack_fn=pack_batches
+        )
+    else:
+        batch_plan = [
+            {"batch_id": idx, "paths": paths}
+            for idx, paths in enumerate(pack_batches(list(summaries_by_path)), 1)
+        ]
+        dirty_batch_ids = {b["batch_id"] for b in batch_plan}
 
-total = len(batches)
+    if not saved_plan:
+        run.set_batch_plan(batch_plan, dirty_batch_ids)
 
-for idx, batch in enumerate(batches, 1):
-    print(f"[BATCH {idx}/{total}] START")
+    print(f"배치(최대 {BATCH_MAX_TOKENS} 토큰)로 나누기 완료 (다시 요약할 배치 {len(dirty_batch_ids)}/{len(batch_plan)})")
 
-    batch_json = {
-        "batch_id": idx,
-        "files_count": len(batch),
-        "summaries": batch
-    }
+    batch_semantic_summaries = []
 
-    try:
-        semantic = summarize_batch_semantic(
-            batch_data=batch_json,
-            client=client,
-            model=MODEL_NAME
-        )
+    os.makedirs(BATCH_SUMMARY_DIR, exist_ok=True)
 
-        batch_semantic_summaries.append(semantic)
+    total = len(batch_plan)
 
+    for idx, batch in enumerate(batch_plan, 1):
+        batch_id = batch["batch_id"]
         output_path = os.path.join(
             BATCH_SUMMARY_DIR,
-            f"batch_{idx}_semantic.json"
+            f"batch_{batch_id}_semantic.json"
         )
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(semantic, f, ensure_ascii=False, indent=2)
+        skip = batch_id not in dirty_batch_ids or batch_id in run.done_batches
+        if skip and os.path.exists(output_path):
+            with open(output_path, "r", encoding="utf-8") as f:
+                batch_semantic_summaries.append(json.load(f))
+            print(f"[BATCH {idx}/{total}] SKIP   ({'이전 실행에서 완료' if batch_id in run.done_batches else '변경 없음'}, batch_id={batch_id})")
+            continue
+
+        print(f"[BATCH {idx}/{total}] START")
+
+        batch_json = {
+            "batch_id": batch_id,
+            "files_count": len(batch["paths"]),
+            "summaries": [summaries_by_path[p] for p in batch["paths"]]
+        }
 
-        print(f"[BATCH {idx}/{total}] DONE")
+        try:
+            semantic = summarize_batch_semantic(
+                batch_data=batch_json,
+                client=client,
+                model=MODEL_NAME
+            )
 
-    except Exception as e:
-        print(f"[BATCH {idx}/{total}] ERROR :: {e}")
+            batch_semantic_summaries.append(semantic)
 
-print("배치 별 요약 완료")
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(semantic, f, ensure_ascii=False, indent=2)
+            run.mark_batch_done(batch_id)
+
+            print(f"[BATCH {idx}/{total}] DONE")
+
+        except Exception as e:
+            print(f"[BATCH {idx}/{total}] ERROR :: {e}")
+            # 다음 증분 실행에서 다시 요약되도록 배치 구성에서 제외
+            batch_plan[idx - 1] = None
+
+    print("배치 별 요약 완료")
+
+    return {
+        "batch_plan": [b for b in batch_plan if b is not None],
+        "batch_semantic_summaries": batch_semantic_summaries
+    }
 
 
 # ==============================
 # 6. 요약된 파일들 바탕으로 최종 리포트 생성
 # ==============================
-final_result = analyze_project_from_batches(
-    batch_semantic_summaries=batch_semantic_summaries,
-    client=client,
-    model=MODEL_NAME,
-    repo_analysis_id=f"{OWNER}_{REPO}"
-)
+# 배치 요약이 최종 프롬프트 예산을 넘으면 super-batch로 병렬 병합을 반복해서 줄인 뒤 최종 분석
+def run_final_report(batch_summaries: dict) -> dict:
+    reduced_summaries = reduce_batch_summaries(
+        batch_summaries["batch_semantic_summaries"],
+        client=client,
+        model=MODEL_NAME,
+        max_tokens=FINAL_INPUT_MAX_TOKENS,
+        max_workers=MAX_WORKERS
+    )
+
+    return analyze_project_from_batches(
+        batch_semantic_summaries=reduced_summaries,
+        client=client,
+        model=MODEL_NAME,
+        repo_analysis_id=f"{OWNER}_{REPO}"
+    )
 
 
 # ==============================
-# 7. 커밋 스타일 분석해서 협업 지표 리포트에 추가
+# 7. 커밋 스타일 분석 (파일 요약과 동시에 실행)
 # =============================
 
-with open(
-    rf"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\{REPO}\{OWNER}_{REPO}_commit_metadata.json",
-    encoding="utf-8"
-) as f:
-    commit_metadata = json.load(f)
-
-commit_style = analyze_commit_style(
-    commit_metadata=commit_metadata,
-    client=client,
-    model=MODEL_NAME
+COMMIT_METADATA_PATH = os.getenv(
+    "COMMIT_METADATA_PATH",
+    rf"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\{REPO}\{OWNER}_{REPO}_commit_metadata.json"
 )
-final_result["collaboration_style"] = commit_style
+
+def run_commit_style() -> dict:
+    with open(COMMIT_METADATA_PATH, encoding="utf-8") as f:
+        commit_metadata = json.load(f)
+
+    return analyze_commit_style(
+        commit_metadata=commit_metadata,
+        client=client,
+        model=MODEL_NAME
+    )
 
 
 # ==============================
-# 8. github api로 해당 레포에서 사용 언어 리스트 가져와서 리포트에 추가
+# 8. github api로 해당 레포에서 사용 언어 리스트 가져오기 (파일 요약과 동시에 실행)
 # ==============================
-languages = get_repo_main_languages(owner=OWNER, repo=REPO)
-final_result["tech_stack"]["languages"] = languages
+def run_languages() -> list:
+    return get_repo_main_languages(owner=OWNER, repo=REPO)
+
+
+# 최종 리포트에 협업 지표 / 사용 언어 추가
+def assemble_report(final_report: dict, commit_style: dict, languages: list) -> dict:
+    final_report["collaboration_style"] = commit_style
+    final_report["tech_stack"]["languages"] = languages
+    return final_report
+
+
+dag = PipelineDAG()
+dag.add("file_summaries", run_file_summaries)
+dag.add("batch_summaries", run_batch_summaries, deps=["file_summaries"])
+dag.add("final_report", run_final_report, deps=["batch_summaries"])
+dag.add("commit_style", run_commit_style)
+dag.add("languages", run_languages)
+dag.add("report", assemble_report, deps=["final_report", "commit_style", "languages"])
+
+results = dag.run()
+final_result = results["report"]
+print(f"DAG 단계별 소요 시간: { {name: round(t, 1) for name, t in dag.timings.items()} }")
 
     
 # ==============================
@@ -178,4 +317,14 @@ final_output_path = os.path.join(
 with open(final_output_path, "w", encoding="utf-8") as f:
     json.dump(final_result, f, ensure_ascii=False, indent=2)
 
-print("프로젝트 최종 분석 완료")
\ No newline at end of file
+# 다음 증분 분석을 위해 분석한 커밋 / 파일 / 배치 구성 기록
+save_analysis_manifest(BASE_OUTPUT_DIR, {
+    "commit_sha": head_sha,
+    "files": list(results["file_summaries"]["summaries_by_path"]),
+    "failed_files": results["file_summaries"]["failed_files"],
+    "batches": results["batch_summaries"]["batch_plan"]
+})
+run.complete()
+
+print("프로젝트 최종 분석 완료")
+print(f"단계별 소요 시간: {json.dumps(stage_summary(), ensure_ascii=False)}")
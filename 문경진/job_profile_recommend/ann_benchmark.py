@@ -0,0 +1,146 @@
+import time
+import tempfile
+import argparse
+from datetime import date, timedelta
+
+import numpy as np
+
+from vector_store import VectorStore
+from job_recommender import normalize_rows, top_k_indices
+from ann_index import IVFIndex, train_centroids, default_n_lists
+
+
+### ANN 인덱스 recall / latency 벤치마크 (정확한 검색 = 전체 행렬 내적 기준)
+# - 합성 데이터: 군집 중심 + 잡음 (실제 공고 임베딩처럼 직무별로 뭉쳐 있는 분포), 질의도 같은 분포에서 생성
+# - --store를 주면 실제 벡터 저장소로 측정 (질의 = 저장된 벡터 + 잡음)
+# 보고 항목: 인덱스 생성 시간, nprobe별 recall@k / p50 / p95 latency, 추가 / 삭제 / 저장소 동기화 처리량
+# (동기화는 마감 삭제된 공고가 저장소에 벡터가 남아 있어도 다시 들어오지 않는지도 확인)
+#
+# 사용 예:
+#   python ann_benchmark.py --n 100000 --dim 3072
+#   python ann_benchmark.py --n 1000000 --dim 256 --nprobe 4 8 16 32
+#   python ann_benchmark.py --store C:\...\output\embedding_store
+
+
+def percentile(values: list, p: float) -> float | None:
+    # nearest-rank
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def make_clustered_vectors(n: int, centers: np.ndarray, noise: float, rng) -> np.ndarray:
+    n_clusters, dim = centers.shape
+    vectors = np.empty((n, dim), dtype=np.float32)
+    chunk_rows = 65536
+    for start in range(0, n, chunk_rows):
+        rows = min(chunk_rows, n - start)
+        labels = rng.integers(n_clusters, size=rows)
+        vectors[start:start + rows] = centers[labels] + noise * rng.standard_normal((rows, dim), dtype=np.float32)
+    return vectors
+
+
+def time_queries(search_fn, queries) -> tuple[list, list]:
+    """질의마다 (결과 id 집합, 소요 ms)"""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = search_fn(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(result)
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store", help="실제 벡터 저장소 경로 (없으면 합성 데이터)")
+    parser.add_argument("--n", type=int, default=100_000, help="합성 공고 수")
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--clusters", type=int, default=2000, help="합성 데이터 군집 수")
+    parser.add_argument("--noise", type=float, default=1.0, help="군집 중심 대비 잡음 크기 (클수록 군집이 겹쳐서 어려움)")
+    parser.add_argument("--n-lists", type=int, default=None, help="기본: sqrt(n)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    if args.store:
+        store = VectorStore(args.store)
+        ids = list(store.ids)
+        vectors = normalize_rows(store.vectors)
+        picked = vectors[rng.choice(len(vectors), args.queries)]
+        # 질의 = 저장된 공고 + 작은 잡음 (잡음 norm ≈ 0.3, 공고 벡터 norm = 1)
+        queries = picked + 0.3 * rng.standard_normal(picked.shape, dtype=np.float32) / np.sqrt(picked.shape[1])
+    else:
+        ids = [f"job_{i}" for i in range(args.n)]
+        centers = rng.standard_normal((args.clusters, args.dim), dtype=np.float32)
+        vectors = normalize_rows(make_clustered_vectors(args.n, centers, args.noise, rng))
+        queries = make_clustered_vectors(args.queries, centers, args.noise, rng)
+    queries = normalize_rows(queries)
+    print(f"공고 {len(vectors)}개 × {vectors.shape[1]}차원 ({vectors.nbytes / 1e6:.0f}MB) / 질의 {len(queries)}개 / top-{args.top_k}")
+
+    # 1) 정확한 검색 (JobRecommender와 같은 방식)
+    exact_results, exact_latencies = time_queries(
+        lambda q: set(top_k_indices(vectors @ q, args.top_k).tolist()), queries
+    )
+    print(f"[EXACT] p50 {percentile(exact_latencies, 50):.2f}ms / p95 {percentile(exact_latencies, 95):.2f}ms")
+
+    # 2) 인덱스 생성
+    n_lists = args.n_lists or default_n_lists(len(vectors))
+    start = time.perf_counter()
+    index = IVFIndex(train_centroids(vectors, n_lists, seed=args.seed))
+    train_sec = time.perf_counter() - start
+    index.add(ids, vectors)
+    build_sec = time.perf_counter() - start
+    print(f"[BUILD] list {index.n_lists}개 / 학습 {train_sec:.1f}s / 전체 {build_sec:.1f}s")
+
+    # 3) nprobe별 recall / latency
+    row_of = {job_profile_id: row for row, job_profile_id in enumerate(ids)}
+    for nprobe in args.nprobe:
+        ann_results, ann_latencies = time_queries(
+            lambda q: {row_of[r["job_profile_id"]] for r in index.search(q, top_k=args.top_k, nprobe=nprobe)}, queries
+        )
+        recall = np.mean([len(a & e) / len(e) for a, e in zip(ann_results, exact_results)])
+        print(
+            f"[IVF nprobe={nprobe:>3}] recall@{args.top_k} {recall:.3f} / "
+            f"p50 {percentile(ann_latencies, 50):.2f}ms / p95 {percentile(ann_latencies, 95):.2f}ms"
+        )
+
+    # 4) 추가 / 마감 삭제 처리량 (전체의 1%를 다시 넣고 만료시킴)
+    n_churn = max(1, len(vectors) // 100)
+    churn_ids = [f"new_{i}" for i in range(n_churn)]
+    yesterday = date.today() - timedelta(days=1)
+
+    start = time.perf_counter()
+    index.add(churn_ids, vectors[:n_churn], expires_at={job_profile_id: yesterday for job_profile_id in churn_ids})
+    insert_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    removed = index.remove_expired()
+    remove_sec = time.perf_counter() - start
+
+    print(
+        f"[CHURN] 추가 {n_churn}개 {n_churn / insert_sec:,.0f}개/s / "
+        f"마감 삭제 {len(removed)}개 {len(removed) / remove_sec:,.0f}개/s / 인덱스 공고 수 {len(index)}"
+    )
+
+    # 5) 저장소 동기화: 마감 삭제된 공고 벡터는 저장소에 남아 있고 마감일 정보는 없음 (공고 JSON 삭제 등)
+    churn_store = VectorStore(tempfile.mkdtemp(prefix="ann_bench_sync_"), dim=vectors.shape[1])
+    churn_store.add(churn_ids, vectors[:n_churn])
+
+    start = time.perf_counter()
+    counts = index.sync_with_store(churn_store, expires_at={})
+    sync_sec = time.perf_counter() - start
+
+    print(f"[SYNC] 저장소 {len(churn_store)}개 {len(churn_store) / sync_sec:,.0f}개/s / {counts}")
+    if counts["added"] or any(job_profile_id in index for job_profile_id in churn_ids):
+        raise RuntimeError("마감 삭제된 공고가 동기화 후 인덱스에 다시 들어옴")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+import os
+import re
+import json
+from datetime import date
+from typing import Dict, List
+
+import numpy as np
+
+from vector_store import VectorStore, VECTOR_STORE_DIR
+from job_recommender import normalize_rows, normalize_query, top_k_indices
+
+
+### 공고 임베딩 근사 최근접 이웃(ANN) 인덱스 - IVF (inverted file)
+# 전체 공고와 내적(brute force)하면 공고 수에 비례해서 느려짐 (100만 개면 질의마다 행렬 전체를 읽음)
+# - 학습: 정규화된 벡터로 spherical k-means → n_lists개 centroid
+# - 저장: 공고마다 가장 가까운 centroid의 list에 넣음 (list별로 연속된 float32 행렬)
+# - 검색: 질의와 가까운 centroid nprobe개의 list만 내적 → top-k
+#   (nprobe를 키우면 recall ↑ / 속도 ↓, ann_benchmark.py로 조절)
+# - 공고 추가 / 삭제는 재학습 없이 해당 list에만 반영 (삭제는 list 마지막 행과 자리 바꿈)
+# - 마감일이 지난 공고는 remove_expired()로 삭제 (마감일 없음 / 상시채용은 만료 없음)
+#   삭제한 id와 마감일은 expired에 남겨서(index.json에 저장) 저장소에 벡터가 남아 있어도 동기화 때 다시 넣지 않음
+# - 저장소에서 다시 임베딩된 공고 / 마감일이 바뀐 공고는 sync_with_store()로 반영
+#
+# 사용 예:
+#   index = IVFIndex.build_from_store(VectorStore(VECTOR_STORE_DIR), expires_at=load_deadlines(EMPLOY_NOTICE_DIR))
+#   index.save(ANN_INDEX_DIR)
+#   results = IVFIndex.load(ANN_INDEX_DIR).search(query_embedding, top_k=10)
+
+DEFAULT_NPROBE = 8
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLES_PER_LIST = 64  # k-means 학습에 쓸 표본 수 = n_lists × 이 값 (전체로 학습할 필요 없음)
+ASSIGN_CHUNK_ROWS = 8192      # centroid 배정 / 저장소 읽기를 한 번에 처리할 행 수
+VECTOR_CHANGE_TOLERANCE = 1e-6  # 동기화할 때 인덱스 벡터와 저장소 벡터(정규화 후) 차이가 이보다 크면 다시 임베딩된 공고
+
+
+def default_n_lists(n_vectors: int) -> int:
+    """list 수 ≈ sqrt(n) → 공고 100만 개면 list 1000개 × 평균 1000개"""
+    return max(1, int(np.sqrt(n_vectors)))
+
+
+### 마감일 문자열 → date (원티드: "2025.03.31" / "2025-03-31" / "2025년 3월 31일", 상시채용 등은 None)
+DEADLINE_RE = re.compile(r"(\d{4})\s*[.\-/년]\s*(\d{1,2})\s*[.\-/월]\s*(\d{1,2})")
+
+
+def parse_deadline(text) -> date | None:
+    if not text:
+        return None
+    match = DEADLINE_RE.search(str(text))
+    if not match:
+        return None
+    try:
+        return date(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+
+def load_deadlines(employ_notice_dir: str) -> Dict[str, date]:
+    """공고 JSON 폴더 → {job_profile_id: 마감일} (마감일을 읽을 수 없는 공고는 제외)"""
+    deadlines = {}
+    for filename in os.listdir(employ_notice_dir):
+        if not filename.endswith(".json"):
+            continue
+        with open(os.path.join(employ_notice_dir, filename), "r", encoding="utf-8") as f:
+            job = json.load(f)
+
+        deadline = parse_deadline(job.get("마감일"))
+        if job.get("job_profile_id") and deadline is not None:
+            deadlines[job["job_profile_id"]] = deadline
+    return deadlines
+#################################################################
+
+
+### spherical k-means (정규화된 벡터 → 내적이 가장 큰 centroid에 배정)
+def assign_to_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_CHUNK_ROWS):
+        chunk = vectors[start:start + ASSIGN_CHUNK_ROWS]
+        assignments[start:start + ASSIGN_CHUNK_ROWS] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(vectors: np.ndarray, n_lists: int, n_iter: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """vectors: 정규화된 (n, dim) float32 → (n_lists, dim) 정규화된 centroid"""
+    rng = np.random.default_rng(seed)
+    n_lists = min(n_lists, len(vectors))
+
+    sample_size = min(len(vectors), n_lists * KMEANS_SAMPLES_PER_LIST)
+    sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignments = assign_to_centroids(sample, centroids)
+
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=n_lists)
+
+        # 빈 list는 임의의 표본으로 다시 시작
+        empty = np.flatnonzero(counts == 0)
+        sums[empty] = sample[rng.choice(sample_size, len(empty), replace=False)]
+        centroids = normalize_rows(sums)
+
+    return centroids
+#################################################################
+
+
+class IVFIndex:
+    def __init__(self, centroids: np.ndarray, nprobe: int = DEFAULT_NPROBE):
+        """
+        centroids: train_centroids 결과 (n_lists, dim)
+        nprobe: 검색할 때 볼 list 수 기본값
+        """
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.nprobe = nprobe
+
+        n_lists, dim = self.centroids.shape
+        self.list_vectors = [np.empty((0, dim), dtype=np.float32) for _ in range(n_lists)]  # 앞쪽 list_sizes[l]행만 유효 (뒤는 여유 공간)
+        self.list_sizes = [0] * n_lists
+        self.list_ids = [[] for _ in range(n_lists)]
+        self.locations = {}   # job_profile_id → (list 번호, list 안 위치)
+        self.expires_at = {}  # job_profile_id → 마감일 (없으면 만료 없음)
+        self.expired = {}     # remove_expired로 삭제된 job_profile_id → 마감일 (마감일이 연장되기 전에는 다시 넣지 않음)
+
+    @property
+    def dim(self) -> int:
+        return self.centroids.shape[1]
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def __contains__(self, job_profile_id: str) -> bool:
+        return job_profile_id in self.locations
+
+    ### 추가 / 삭제
+    def _append(self, list_no: int, job_profile_id: str, vector: np.ndarray):
+        size = self.list_sizes[list_no]
+        if size == len(self.list_vectors[list_no]):
+            # 용량 2배로 늘림 → 추가 1번당 복사 비용은 평균 O(1)
+            grown = np.empty((max(16, size * 2), self.dim), dtype=np.float32)
+            grown[:size] = self.list_vectors[list_no][:size]
+            self.list_vectors[list_no] = grown
+
+        self.list_vectors[list_no][size] = vector
+        self.list_ids[list_no].append(job_profile_id)
+        self.list_sizes[list_no] = size + 1
+        self.locations[job_profile_id] = (list_no, size)
+
+    def _remove(self, job_profile_id: str):
+        list_no, pos = self.locations.pop(job_profile_id)
+        last = self.list_sizes[list_no] - 1
+
+        if pos != last:
+            # 마지막 행을 삭제된 자리로 옮김
+            moved_id = self.list_ids[list_no][last]
+            self.list_vectors[list_no][pos] = self.list_vectors[list_no][last]
+            self.list_ids[list_no][pos] = moved_id
+            self.locations[moved_id] = (list_no, pos)
+
+        self.list_ids[list_no].pop()
+        self.list_sizes[list_no] = last
+        self.expires_at.pop(job_profile_id, None)
+
+    def add(self, job_profile_ids: List[str], embeddings, expires_at: Dict[str, date] | None = None) -> int:
+        """
+        공고 추가 (이미 있는 id는 새 벡터로 교체, 재학습 없음)
+        expires_at: {job_profile_id: 마감일} (없는 id는 만료 없음)
+        반환: 추가 / 교체된 공고 수
+        """
+        if len(job_profile_ids) == 0:
+            return 0
+
+        vectors = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        if vectors.shape != (len(job_profile_ids), self.dim):
+            raise ValueError(f"입력 shape 불일치: {vectors.shape} / ({len(job_profile_ids)}, {self.dim})")
+        return self._add_normalized(job_profile_ids, vectors, expires_at)
+
+    def _add_normalized(self, job_profile_ids: List[str], vectors: np.ndarray, expires_at: Dict[str, date] | None) -> int:
+        """add와 같음 (vectors는 이미 정규화된 float32)"""
+        assignments = assign_to_centroids(vectors, self.centroids)
+        for job_profile_id, vector, list_no in zip(job_profile_ids, vectors, assignments):
+            if job_profile_id in self.locations:
+                self._remove(job_profile_id)
+            self._append(int(list_no), job_profile_id, vector)
+            self.expired.pop(job_profile_id, None)
+
+            deadline = (expires_at or {}).get(job_profile_id)
+            if deadline is not None:
+                self.expires_at[job_profile_id] = deadline
+
+        return len(job_profile_ids)
+
+    def remove(self, job_profile_ids) -> int:
+        removed = 0
+        for job_profile_id in job_profile_ids:
+            if job_profile_id in self.locations:
+                self._remove(job_profile_id)
+                removed += 1
+        return removed
+
+    def remove_expired(self, today: date | None = None) -> List[str]:
+        """마감일이 today(기본 오늘)보다 이전인 공고 삭제 → 삭제된 id 목록"""
+        today = today or date.today()
+        expired = [job_profile_id for job_profile_id, deadline in self.expires_at.items() if deadline < today]
+        for job_profile_id in expired:
+            self.expired[job_profile_id] = self.expires_at[job_profile_id]
+        self.remove(expired)
+        return expired
+
+    def vector_of(self, job_profile_id: str) -> np.ndarray:
+        """인덱스에 들어 있는 (정규화된) 벡터"""
+        list_no, pos = self.locations[job_profile_id]
+        return self.list_vectors[list_no][pos]
+
+    def sync_with_store(
+        self,
+        store: VectorStore,
+        expires_at: Dict[str, date] | None = None,
+        today: date | None = None,
+        chunk_rows: int = ASSIGN_CHUNK_ROWS
+    ) -> Dict[str, int]:
+        """
+        벡터 저장소 / 마감일 → 인덱스 반영 (재학습 없음)
+        - 인덱스에 없는 공고 추가 (이미 마감된 공고 / remove_expired로 삭제된 공고는 제외)
+          삭제된 공고는 expires_at에 오늘 이후 마감일이 있을 때(마감 연장)만 다시 추가
+        - 저장소에서 다시 임베딩된 공고(저장소 벡터 ≠ 인덱스 벡터)는 새 벡터로 교체 (list가 바뀔 수 있음)
+        - 마감일이 바뀐 공고는 마감일만 갱신 (삭제는 remove_expired)
+          expires_at에 없는 공고(공고 JSON 삭제 / 마감일 파싱 실패)는 기존 마감일 유지 → 만료 없는 공고가 되지 않음
+        반환: {"added": 추가, "updated": 벡터 교체, "deadline_changed": 마감일만 갱신}
+        """
+        today = today or date.today()
+        expires_at = expires_at or {}
+        counts = {"added": 0, "updated": 0, "deadline_changed": 0}
+
+        def is_closed(job_profile_id: str) -> bool:
+            deadline = expires_at.get(job_profile_id)
+            if deadline is not None:
+                return deadline < today
+            return job_profile_id in self.expired
+
+        for start in range(0, len(store), chunk_rows):
+            ids = store.ids[start:start + chunk_rows]
+            vectors = normalize_rows(store.vectors[start:start + chunk_rows])
+
+            changed = np.ones(len(ids), dtype=bool)
+            indexed = [i for i, job_profile_id in enumerate(ids) if job_profile_id in self.locations]
+            if indexed:
+                current = np.stack([self.vector_of(ids[i]) for i in indexed])
+                changed[indexed] = np.abs(current - vectors[indexed]).max(axis=1) > VECTOR_CHANGE_TOLERANCE
+
+            rows = [i for i in np.flatnonzero(changed).tolist() if not is_closed(ids[i])]
+            updated = sum(ids[i] in self.locations for i in rows)
+            counts["updated"] += updated
+            counts["added"] += len(rows) - updated
+            self._add_normalized([ids[i] for i in rows], vectors[rows], expires_at)
+
+        for job_profile_id in self.locations:
+            deadline = expires_at.get(job_profile_id)
+            if deadline is None or self.expires_at.get(job_profile_id) == deadline:
+                continue
+            self.expires_at[job_profile_id] = deadline
+            counts["deadline_changed"] += 1
+
+        return counts
+
+    ### 검색
+    def search(self, query_embedding, top_k: int = 10, nprobe: int | None = None) -> List[Dict]:
+        """
+        query_embedding: 사용자 분석 텍스트 임베딩
+        반환: [{"job_profile_id": ..., "score": cosine 유사도}, ...] (점수 내림차순)
+        """
+        query = normalize_query(query_embedding, self.dim)
+
+        probe_lists = top_k_indices(self.centroids @ query, nprobe or self.nprobe)
+        probe_lists = [int(l) for l in probe_lists if self.list_sizes[l]]
+        if not probe_lists:
+            return []
+
+        scores = np.concatenate([self.list_vectors[l][:self.list_sizes[l]] @ query for l in probe_lists])
+        offsets = np.cumsum([self.list_sizes[l] for l in probe_lists])
+
+        results = []
+        for i in top_k_indices(scores, top_k):
+            part = int(np.searchsorted(offsets, i, side="right"))
+            pos = int(i - (offsets[part - 1] if part else 0))
+            results.append({"job_profile_id": self.list_ids[probe_lists[part]][pos], "score": float(scores[i])})
+        return results
+
+    ### 생성 / 저장 / 불러오기
+    @classmethod
+    def build_from_store(
+        cls,
+        store: VectorStore,
+        n_lists: int | None = None,
+        nprobe: int = DEFAULT_NPROBE,
+        expires_at: Dict[str, date] | None = None,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """
+        저장소 전체로 인덱스 생성 (정규화된 전체 행렬 복사본을 만들지 않음 → 메모리 ≈ 인덱스 크기 1배)
+        1) 표본만 정규화해서 centroid 학습
+        2) 청크 단위로 정규화 → list 배정만 기록
+        3) list별 크기대로 한 번에 할당한 뒤 청크를 다시 읽어서 채움
+        """
+        n = len(store)
+        if n == 0:
+            raise ValueError("벡터 저장소가 비어 있음")
+
+        n_lists = min(n_lists or default_n_lists(n), n)
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(n, min(n, n_lists * KMEANS_SAMPLES_PER_LIST), replace=False))
+        index = cls(train_centroids(normalize_rows(store.vectors[sample_rows]), n_lists, seed=seed), nprobe=nprobe)
+
+        chunk_starts = range(0, n, ASSIGN_CHUNK_ROWS)
+        assignments = np.concatenate([
+            assign_to_centroids(normalize_rows(store.vectors[start:start + ASSIGN_CHUNK_ROWS]), index.centroids)
+            for start in chunk_starts
+        ])
+
+        # 공고 행마다 list 안 위치 (list 안에서는 저장소 행 순서)
+        sizes = np.bincount(assignments, minlength=index.n_lists)
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        order = np.argsort(assignments, kind="stable")
+        positions = np.empty(n, dtype=np.int64)
+        positions[order] = np.arange(n) - offsets[assignments[order]]
+
+        index.list_vectors = [np.empty((size, index.dim), dtype=np.float32) for size in sizes.tolist()]
+        for start in chunk_starts:
+            chunk = normalize_rows(store.vectors[start:start + ASSIGN_CHUNK_ROWS])
+            chunk_lists = assignments[start:start + ASSIGN_CHUNK_ROWS]
+            chunk_order = np.argsort(chunk_lists, kind="stable")
+            # 같은 list인 행은 list 안에서도 연속된 위치 → list마다 슬라이스 1번으로 복사
+            bounds = np.flatnonzero(np.diff(chunk_lists[chunk_order])) + 1
+            for group in np.split(chunk_order, bounds):
+                list_no, first = int(chunk_lists[group[0]]), int(positions[start + group[0]])
+                index.list_vectors[list_no][first:first + len(group)] = chunk[group]
+
+        index.list_sizes = sizes.tolist()
+        for list_no in range(index.n_lists):
+            rows = order[offsets[list_no]:offsets[list_no + 1]].tolist()
+            index.list_ids[list_no] = [store.ids[row] for row in rows]
+            for pos, job_profile_id in enumerate(index.list_ids[list_no]):
+                index.locations[job_profile_id] = (list_no, pos)
+
+        for job_profile_id, deadline in (expires_at or {}).items():
+            if job_profile_id in index.locations:
+                index.expires_at[job_profile_id] = deadline
+        return index
+
+    def save(self, index_dir: str):
+        """centroids.npy / lists.npz (list 순서대로 이어 붙인 벡터) / index.json (id, 마감일, 마감 삭제된 id, 설정)"""
+        os.makedirs(index_dir, exist_ok=True)
+
+        np.save(os.path.join(index_dir, "centroids.npy"), self.centroids)
+
+        tmp_path = os.path.join(index_dir, "lists.tmp.npz")
+        np.savez(
+            tmp_path,
+            vectors=np.concatenate([vectors[:size] for vectors, size in zip(self.list_vectors, self.list_sizes)]),
+            sizes=np.asarray(self.list_sizes, dtype=np.int64)
+        )
+        os.replace(tmp_path, os.path.join(index_dir, "lists.npz"))
+
+        meta = {
+            "nprobe": self.nprobe,
+            "ids": [job_profile_id for ids in self.list_ids for job_profile_id in ids],
+            "expires_at": {job_profile_id: deadline.isoformat() for job_profile_id, deadline in self.expires_at.items()},
+            "expired": {job_profile_id: deadline.isoformat() for job_profile_id, deadline in self.expired.items()}
+        }
+        tmp_path = os.path.join(index_dir, "index.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(index_dir, "index.json"))
+
+    @classmethod
+    def load(cls, index_dir: str) -> "IVFIndex":
+        with open(os.path.join(index_dir, "index.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        lists = np.load(os.path.join(index_dir, "lists.npz"))
+
+        index = cls(np.load(os.path.join(index_dir, "centroids.npy")), nprobe=meta["nprobe"])
+
+        # NpzFile은 key에 접근할 때마다 배열 전체를 다시 읽으므로 1번만 읽고 list별로는 view
+        vectors, sizes = lists["vectors"], lists["sizes"].tolist()
+        start = 0
+        for list_no, size in enumerate(sizes):
+            index.list_vectors[list_no] = vectors[start:start + size]
+            index.list_ids[list_no] = meta["ids"][start:start + size]
+            index.list_sizes[list_no] = size
+            for pos, job_profile_id in enumerate(index.list_ids[list_no]):
+                index.locations[job_profile_id] = (list_no, pos)
+            start += size
+
+        index.expires_at = {job_profile_id: date.fromisoformat(d) for job_profile_id, d in meta["expires_at"].items()}
+        index.expired = {job_profile_id: date.fromisoformat(d) for job_profile_id, d in meta.get("expired", {}).items()}
+        return index
+
+
+EMPLOY_NOTICE_DIR = os.getenv("EMPLOY_NOTICE_DIR", r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\output\employ_notice")
+ANN_INDEX_DIR = os.getenv("ANN_INDEX_DIR", r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\output\ann_index")
+
+
+if __name__ == "__main__":
+    # 벡터 저장소 → 인덱스 동기화 (인덱스가 없으면 새로 학습, 있으면 새 공고 추가 / 바뀐 공고 반영 + 마감 공고 삭제)
+    store = VectorStore(VECTOR_STORE_DIR)
+    deadlines = load_deadlines(EMPLOY_NOTICE_DIR)
+
+    if os.path.exists(os.path.join(ANN_INDEX_DIR, "index.json")):
+        index = IVFIndex.load(ANN_INDEX_DIR)
+        counts = index.sync_with_store(store, expires_at=deadlines)
+        print(f"새 공고 {counts['added']}개 추가 / 다시 임베딩된 공고 {counts['updated']}개 교체 / 마감일 변경 {counts['deadline_changed']}개")
+    else:
+        index = IVFIndex.build_from_store(store, expires_at=deadlines)
+        print(f"인덱스 생성: 공고 {len(index)}개 / list {index.n_lists}개")
+
+    expired = index.remove_expired()
+    print(f"마감 공고 {len(expired)}개 삭제 → 인덱스 공고 수: {len(index)}")
+
+    index.save(ANN_INDEX_DIR)
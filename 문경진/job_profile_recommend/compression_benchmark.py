@@ -0,0 +1,127 @@
+import time
+import tempfile
+import argparse
+
+import numpy as np
+
+from vector_store import VectorStore
+from job_recommender import JobRecommender, normalize_rows
+from embedding_compression import CompressedRecommender, PCAReducer
+from ann_benchmark import percentile, time_queries
+
+
+### 임베딩 압축 방식별 메모리 / 추천 recall 벤치마크 (기준 = 원본 float32 전체 cosine top-k)
+# 비교 대상:
+# - int8 / PCA n차원 / PCA n차원 + int8 (각각 rerank 없음 / 원본 벡터 rerank)
+# - --store를 주면 앞쪽 n차원만 잘라서 다시 정규화한 저장소 = 임베딩 API dimensions 옵션과 같은 결과(text-embedding-3)도 비교
+#   (합성 데이터는 앞쪽 차원에 정보가 몰려 있지 않아서 의미 없으므로 제외)
+# - 합성 데이터: 낮은 rank의 잠재 요인(분산이 점점 작아짐) + 잡음 → 실제 문장 임베딩처럼 주성분 몇 개에 분산이 몰린 분포
+#
+# 사용 예:
+#   python compression_benchmark.py --n 50000
+#   python compression_benchmark.py --store C:\...\output\embedding_store --dims 1024 256
+
+
+def make_low_rank_vectors(n: int, dim: int, rank: int, noise: float, basis: np.ndarray, rng) -> np.ndarray:
+    decay = 1 / np.sqrt(np.arange(1, rank + 1, dtype=np.float32))  # 주성분 분산이 1/i로 줄어듦
+    latent = rng.standard_normal((n, rank), dtype=np.float32) * decay
+    return latent @ basis + noise * rng.standard_normal((n, dim), dtype=np.float32) / np.sqrt(dim)
+
+
+def truncated_store(store: VectorStore, dim: int) -> VectorStore:
+    """앞쪽 dim차원만 잘라서 다시 정규화한 임시 저장소 (= 임베딩 API dimensions=dim으로 만든 저장소)"""
+    truncated = VectorStore(tempfile.mkdtemp(prefix=f"dimensions_{dim}_"), dim=dim)
+    for start in range(0, len(store), 10000):
+        truncated.add(store.ids[start:start + 10000], normalize_rows(store.vectors[start:start + 10000, :dim]))
+    return truncated
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store", help="실제 벡터 저장소 경로 (없으면 합성 데이터)")
+    parser.add_argument("--n", type=int, default=50_000, help="합성 공고 수")
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--rank", type=int, default=256, help="합성 데이터 잠재 요인 수")
+    parser.add_argument("--noise", type=float, default=0.5, help="잠재 요인 대비 잡음 크기")
+    parser.add_argument("--dims", type=int, nargs="+", default=[1024, 512, 256, 128], help="PCA / 자르기 차원")
+    parser.add_argument("--rerank-factor", type=int, default=10)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    if args.store:
+        store = VectorStore(args.store)
+        picked = np.asarray(store.vectors[np.sort(rng.choice(len(store), args.queries))], dtype=np.float32)
+        # 질의 = 저장된 공고 + 작은 잡음 (잡음 norm ≈ 0.3, 공고 벡터 norm = 1)
+        queries = normalize_rows(picked) + 0.3 * rng.standard_normal(picked.shape, dtype=np.float32) / np.sqrt(store.dim)
+    else:
+        # 합성 공고를 임시 저장소에 기록 (rerank가 원본을 memmap에서 읽는 것까지 같은 조건으로 측정)
+        basis = normalize_rows(rng.standard_normal((args.rank, args.dim), dtype=np.float32))
+        store = VectorStore(tempfile.mkdtemp(prefix="compression_bench_"), dim=args.dim)
+        for start in range(0, args.n, 10000):
+            rows = min(10000, args.n - start)
+            store.add(
+                [f"job_{i}" for i in range(start, start + rows)],
+                make_low_rank_vectors(rows, args.dim, args.rank, args.noise, basis, rng)
+            )
+        queries = make_low_rank_vectors(args.queries, args.dim, args.rank, args.noise, basis, rng)
+    print(f"공고 {len(store)}개 × {store.dim}차원 / 질의 {len(queries)}개 / top-{args.top_k}")
+
+    # 기준: 원본 float32 전체 cosine
+    exact = JobRecommender(store)
+    exact_results, exact_latencies = time_queries(
+        lambda q: {r["job_profile_id"] for r in exact.recommend(q, top_k=args.top_k)}, queries
+    )
+    baseline_bytes = exact.matrix.nbytes
+    print(
+        f"{'방식':<28} {'메모리':>10} {'비율':>7} {'recall@' + str(args.top_k):>10} {'p50':>9}\n"
+        f"{'float32 (기준)':<28} {baseline_bytes / 1e6:>8.1f}MB {1:>7.3f} {1:>10.3f} {percentile(exact_latencies, 50):>7.2f}ms"
+    )
+    del exact
+
+    # PCA는 가장 큰 차원으로 1번만 학습하고 작은 차원은 앞쪽 주성분만 사용
+    start = time.perf_counter()
+    pca = PCAReducer.fit(store.vectors, dim=max(args.dims), seed=args.seed)
+    print(f"PCA 학습 {time.perf_counter() - start:.1f}s")
+
+    configs = [("int8", None, True)]
+    for dim in args.dims:
+        reducer = pca.truncated(dim)
+        configs.append((f"PCA {dim} ({reducer.explained_variance_ratio:.0%})", reducer, False))
+        configs.append((f"PCA {dim} + int8", reducer, True))
+
+    for name, reducer, quantize in configs:
+        for rerank_factor in (0, args.rerank_factor):
+            start = time.perf_counter()
+            recommender = CompressedRecommender(store, reducer=reducer, quantize=quantize, rerank_factor=rerank_factor)
+            build_sec = time.perf_counter() - start
+
+            results, latencies = time_queries(
+                lambda q: {r["job_profile_id"] for r in recommender.recommend(q, top_k=args.top_k)}, queries
+            )
+            recall = np.mean([len(a & e) / len(e) for a, e in zip(results, exact_results)])
+            label = name + (f" + rerank×{rerank_factor}" if rerank_factor else "")
+            print(
+                f"{label:<28} {recommender.memory_bytes / 1e6:>8.1f}MB {recommender.memory_bytes / baseline_bytes:>7.3f} "
+                f"{recall:>10.3f} {percentile(latencies, 50):>7.2f}ms (생성 {build_sec:.1f}s)"
+            )
+
+    # API dimensions: 저장소 자체가 축소 차원 (원본 벡터가 없으므로 rerank 불가), 질의도 같은 차원으로 임베딩
+    if args.store:
+        for dim in args.dims:
+            recommender = JobRecommender(truncated_store(store, dim))
+            results, latencies = time_queries(
+                lambda q: {r["job_profile_id"] for r in recommender.recommend(q[:dim], top_k=args.top_k)}, queries
+            )
+            recall = np.mean([len(a & e) / len(e) for a, e in zip(results, exact_results)])
+            print(
+                f"{f'API dimensions {dim}':<28} {recommender.matrix.nbytes / 1e6:>8.1f}MB "
+                f"{recommender.matrix.nbytes / baseline_bytes:>7.3f} {recall:>10.3f} {percentile(latencies, 50):>7.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+from typing import Dict, List
+
+import numpy as np
+
+from vector_store import VectorStore
+from job_recommender import JobRecommender, normalize_rows, normalize_query, top_k_indices
+
+
+### 추천용 임베딩 압축 (PCA 차원 축소 / int8 양자화) + 원본 벡터 재정렬(rerank)
+# 3072차원 float32 공고 행렬을 그대로 메모리에 올리면 공고 1개당 12KB (10만 개 1.2GB)
+# - PCAReducer: 공고 표본으로 주성분을 학습해서 dim차원으로 투영 (예: 3072 → 256 이면 1/12)
+# - Int8Quantizer: 차원별 scale로 float → int8 (1/4)
+# - CompressedRecommender: 압축 행렬로 후보를 top_k × rerank_factor개 고른 뒤,
+#   후보만 디스크(VectorStore memmap)의 원본 벡터로 다시 점수 매김 → 메모리는 압축본만, 순위는 원본 기준에 가깝게
+# 저장 자체를 줄이려면 임베딩 API의 dimensions 옵션(job_profile_embedding.EMBEDDING_DIMENSIONS)을 사용
+# 압축률별 메모리 / recall은 compression_benchmark.py로 측정
+#
+# 사용 예:
+#   store = VectorStore(VECTOR_STORE_DIR)
+#   recommender = CompressedRecommender(store, reducer=PCAReducer.fit(store.vectors, dim=256), quantize=True)
+#   results = recommender.recommend(query_embedding, top_k=10)
+
+PCA_SAMPLE_SIZE = 20000  # PCA 학습에 쓸 공고 표본 수
+RERANK_FACTOR = 10       # 원본 벡터로 다시 점수 매길 후보 수 = top_k × 이 값 (0이면 rerank 안 함)
+SCORE_CHUNK_ROWS = 65536 # PCA 투영을 이 행 수씩 (memmap 전체를 한 번에 float32로 바꾸지 않도록)
+INT8_CHUNK_ELEMENTS = 1 << 18  # int8 → float32 변환 청크 크기 (원소 수, float32 1MB → CPU 캐시 안에서 변환 + 내적)
+
+
+class PCAReducer:
+    def __init__(self, mean: np.ndarray, components: np.ndarray, variance_ratio: np.ndarray | None = None):
+        """
+        mean: (dim_in,) 정규화된 벡터들의 평균
+        components: (dim_out, dim_in) 주성분 (분산 큰 순서, 행마다 단위 벡터)
+        variance_ratio: (dim_out,) 주성분별 설명 분산 비율
+        """
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+        self.variance_ratio = None if variance_ratio is None else np.asarray(variance_ratio, dtype=np.float64)
+
+    @property
+    def dim(self) -> int:
+        return len(self.components)
+
+    @property
+    def explained_variance_ratio(self) -> float | None:
+        return None if self.variance_ratio is None else float(self.variance_ratio.sum())
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, dim: int, sample_size: int = PCA_SAMPLE_SIZE, seed: int = 0) -> "PCAReducer":
+        rng = np.random.default_rng(seed)
+        if len(vectors) > sample_size:
+            vectors = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+        sample = normalize_rows(vectors)
+
+        mean = sample.mean(axis=0)
+        sample -= mean
+        # 표본 SVD 대신 공분산(dim_in × dim_in) 고유값 분해 → 표본 수와 무관하게 dim_in³
+        eigenvalues, eigenvectors = np.linalg.eigh(sample.T @ sample)
+        order = np.argsort(eigenvalues)[::-1][:min(dim, len(eigenvalues))]
+
+        eigenvalues = np.clip(eigenvalues, 0, None)
+        return cls(mean, eigenvectors[:, order].T, eigenvalues[order] / eigenvalues.sum())
+
+    def truncated(self, dim: int) -> "PCAReducer":
+        """앞쪽 주성분 dim개만 쓰는 reducer (다시 학습할 필요 없음)"""
+        variance_ratio = None if self.variance_ratio is None else self.variance_ratio[:dim]
+        return PCAReducer(self.mean, self.components[:dim], variance_ratio)
+
+    def transform(self, vectors: np.ndarray, chunk_rows: int = SCORE_CHUNK_ROWS) -> np.ndarray:
+        """
+        공고 벡터 (n, dim_in) → (n, dim_out) float32: 정규화 → 평균 빼기 → 주성분 투영 (memmap도 청크 단위로 읽음)
+        투영 후 다시 정규화하지 않음 → x·q = (x - mean)·q + mean·q 이고 뒤의 항은 공고와 무관하므로
+        transform(x)·transform_query(q) 순위 = 주성분 공간 안에서의 원래 cosine 순위
+        """
+        reduced = np.empty((len(vectors), self.dim), dtype=np.float32)
+        for start in range(0, len(vectors), chunk_rows):
+            chunk = normalize_rows(vectors[start:start + chunk_rows])
+            reduced[start:start + chunk_rows] = (chunk - self.mean) @ self.components.T
+        return reduced
+
+    def transform_query(self, query: np.ndarray) -> np.ndarray:
+        """정규화된 질의 (dim_in,) → (dim_out,) (평균은 빼지 않음)"""
+        return self.components @ query
+
+    def save(self, path: str):
+        variance_ratio = np.empty(0) if self.variance_ratio is None else self.variance_ratio
+        np.savez(path, mean=self.mean, components=self.components, variance_ratio=variance_ratio)
+
+    @classmethod
+    def load(cls, path: str) -> "PCAReducer":
+        data = np.load(path)
+        return cls(data["mean"], data["components"], data["variance_ratio"] if data["variance_ratio"].size else None)
+
+
+class Int8Quantizer:
+    def __init__(self, scales: np.ndarray):
+        """scales: (dim,) 차원별 scale (값 = code × scale)"""
+        self.scales = np.asarray(scales, dtype=np.float32)
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray) -> "Int8Quantizer":
+        max_abs = np.abs(vectors).max(axis=0)
+        return cls(np.where(max_abs > 0, max_abs / 127, 1).astype(np.float32))
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(vectors / self.scales), -127, 127).astype(np.int8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32) * self.scales
+
+    def score(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """codes와 query의 내적 (scale은 query 쪽에 곱해서 행렬에는 변환만)"""
+        scaled_query = query * self.scales
+        scores = np.empty(len(codes), dtype=np.float32)
+        chunk_rows = max(1, INT8_CHUNK_ELEMENTS // codes.shape[1])
+        for start in range(0, len(codes), chunk_rows):
+            scores[start:start + chunk_rows] = codes[start:start + chunk_rows].astype(np.float32) @ scaled_query
+        return scores
+
+
+class CompressedRecommender(JobRecommender):
+    def __init__(
+        self,
+        store: VectorStore,
+        reducer: PCAReducer | None = None,
+        quantize: bool = True,
+        rerank_factor: int = RERANK_FACTOR
+    ):
+        """
+        reducer: PCA 차원 축소 (None이면 원래 차원)
+        quantize: int8 양자화 여부
+        rerank_factor: 후보 top_k × rerank_factor개를 원본 벡터로 재정렬 (0이면 압축 점수 그대로)
+        """
+        self.reducer = reducer
+        self.quantize = quantize
+        self.rerank_factor = rerank_factor
+        super().__init__(store)
+
+    def reload(self):
+        self.job_profile_ids = list(self.store.ids)
+        matrix = self.reducer.transform(self.store.vectors) if self.reducer else normalize_rows(self.store.vectors)
+        self.quantizer = Int8Quantizer.fit(matrix) if self.quantize and len(matrix) else None
+        self.matrix = self.quantizer.encode(matrix) if self.quantizer else matrix
+
+    @property
+    def memory_bytes(self) -> int:
+        """메모리에 올린 압축 행렬 크기 (원본은 디스크 memmap)"""
+        return self.matrix.nbytes
+
+    def score(self, query_embedding) -> np.ndarray:
+        """압축 행렬 기준 cosine 유사도 근사값 (n,)"""
+        query = normalize_query(query_embedding, self.store.dim)
+
+        offset = 0.0
+        if self.reducer is not None:
+            offset = float(self.reducer.mean @ query)  # 투영 전에 뺀 평균 몫 (모든 공고에 같은 값)
+            query = self.reducer.transform_query(query)
+
+        if self.quantizer is not None:
+            return self.quantizer.score(self.matrix, query) + offset
+        return self.matrix @ query + offset
+
+    def recommend(self, query_embedding, top_k: int = 10, exclude_ids=()) -> List[Dict]:
+        candidates = super().recommend(query_embedding, top_k=top_k * max(1, self.rerank_factor), exclude_ids=exclude_ids)
+        if not self.rerank_factor or not candidates:
+            return candidates[:top_k]
+
+        # 후보만 원본 벡터로 cosine 다시 계산 (memmap에서 후보 행만 읽음)
+        rows = np.sort([self.store.id_to_row[candidate["job_profile_id"]] for candidate in candidates])
+        full_scores = normalize_rows(self.store.vectors[rows]) @ normalize_query(query_embedding, self.store.dim)
+        return [
+            {"job_profile_id": self.job_profile_ids[rows[i]], "score": float(full_scores[i])}
+            for i in top_k_indices(full_scores, top_k)
+        ]
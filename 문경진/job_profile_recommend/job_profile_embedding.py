@@ -50,76 +50,234 @@ def build_job_profile_text(job: Dict) -> str:
 
 # api 설정
 import os
+import sys
+import time
+import random
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+import openai
 from openai import OpenAI
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # 문경진/common 공통 모듈 경로
+from common.batching import pack_into_batches
+from common.token_utils import estimate_tokens
+from common.rate_limiter import RateLimiter, parse_retry_after
+from common.llm_provider import RETRYABLE_STATUS
+from vector_store import VectorStore, VECTOR_STORE_DIR
+
 load_dotenv()  # .env에서 GMS_KEY 로드
 
 client = OpenAI(
     api_key=os.getenv("GMS_API_KEY"),
-    base_url=os.getenv("GMS_BASE_URL")
+    base_url=os.getenv("GMS_BASE_URL"),
+    max_retries=0  # 재시도는 embed_texts가 limiter와 함께 처리
+)
+
+# 임베딩 호출 공통 limiter (배치 요청을 동시에 보내도 RPM / TPM 안에서만 전송)
+embedding_rate_limiter = RateLimiter(
+    requests_per_min=float(os.getenv("EMBEDDING_REQUESTS_PER_MIN", "500")),
+    tokens_per_min=float(os.getenv("EMBEDDING_TOKENS_PER_MIN", "1000000"))
 )
+EMBEDDING_MAX_RETRIES = 3
+
+EMBEDDING_MODEL = "text-embedding-3-large"
+# 임베딩 차원 축소 (text-embedding-3 계열의 dimensions 파라미터, 예: 1024 / 256) → 저장소 / 추천 메모리가 비례해서 줄어듦
+# 공고와 사용자 분석 임베딩은 반드시 같은 값으로 만들어야 함 (다르면 VectorStore / 추천에서 차원 불일치 오류)
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0")) or None  # 0 / 미설정이면 모델 기본 차원(3072)
+EMBEDDING_MODEL_DEFAULT_DIMS = {"text-embedding-3-large": 3072, "text-embedding-3-small": 1536, "text-embedding-ada-002": 1536}
+
+
+def expected_embedding_dim(model: str = EMBEDDING_MODEL, dimensions: int | None = EMBEDDING_DIMENSIONS) -> int | None:
+    """이 설정으로 만들어질 임베딩 차원 (dimensions 미설정이면 모델 기본 차원, 모르는 모델이면 None)"""
+    return dimensions or EMBEDDING_MODEL_DEFAULT_DIMS.get(model)
+
+
+def embedding_options(dimensions: int | None = EMBEDDING_DIMENSIONS) -> dict:
+    return {"dimensions": dimensions} if dimensions else {}
 
 # 단일 공고 기준! 임베딩 생성 함수 -> 근데 공고 추천할 때 분석 내용 임베딩벡터는 모든 레포 분석한거 통합한걸 기준으로 임베딩벡터 만들어야 하는거 아닌가?
 def embed_single_job(job_profile_text: str) -> List[float]:
-    response = client.embeddings.create(
-        model="text-embedding-3-large",
-        input=job_profile_text
+    return embed_texts([job_profile_text])[0]
+
+
+### 여러 공고를 요청 1번에 임베딩 (embeddings API는 input으로 리스트를 받음)
+# 공고마다 요청을 1번씩 보내면 공고 수만큼 왕복이 생기므로,
+# 토큰 예산(EMBEDDING_BATCH_MAX_TOKENS) / 개수(EMBEDDING_BATCH_MAX_ITEMS) 안에서 최대한 묶고 여러 배치를 동시에 요청
+EMBEDDING_BATCH_MAX_TOKENS = 200_000  # 요청 1번 input 토큰 합 상한 (API 한도 300k보다 여유 있게, 추정치 기준)
+EMBEDDING_BATCH_MAX_ITEMS = 512       # 요청 1번 input 개수 상한 (API 한도 2048)
+EMBEDDING_MAX_WORKERS = 4             # 동시에 보낼 배치 요청 수
+
+def is_retryable_error(error: Exception) -> bool:
+    if isinstance(error, openai.APIConnectionError):  # 타임아웃 포함
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code in RETRYABLE_STATUS
+
+
+# limiter 대기 → 호출 → 429/5xx/연결 오류면 Retry-After 또는 지수 backoff 후 재시도 (common/llm_provider.py와 같은 방식)
+def embed_texts(
+    texts: List[str],
+    model: str = EMBEDDING_MODEL,
+    dimensions: int | None = EMBEDDING_DIMENSIONS,
+    max_retries: int = EMBEDDING_MAX_RETRIES,
+    limiter: RateLimiter = embedding_rate_limiter
+) -> List[List[float]]:
+    estimated_tokens = sum(estimate_tokens(text) for text in texts)
+
+    for attempt in range(max_retries + 1):
+        limiter.acquire(estimated_tokens)
+        try:
+            response = client.embeddings.create(
+                model=model,
+                input=texts,
+                **embedding_options(dimensions)
+            )
+        except Exception as e:
+            if not is_retryable_error(e) or attempt == max_retries:
+                raise
+
+            status = getattr(e, "status_code", None)
+            retry_after = parse_retry_after(e.response) if status == 429 else None
+            if status == 429:
+                limiter.on_throttle(retry_after)
+
+            wait = retry_after or min(10, 2 ** attempt) + random.random()
+            print(f"⚠️ {type(e).__name__}({status}) → {wait:.1f}s 대기 후 재시도 ({attempt + 1}/{max_retries})")
+            time.sleep(wait)
+            continue
+
+        limiter.on_success()
+        if response.usage is not None:
+            limiter.adjust_tokens(response.usage.total_tokens - estimated_tokens)
+        # 응답 순서가 입력 순서와 다를 수 있으므로 index 기준으로 정렬
+        return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+
+
+# 특정 input 하나 때문에 거절된 400인지 (input 토큰 한도 초과)
+# dimensions / model 설정 오류 같은 400은 배치를 나눠도 모두 실패하므로 나누지 않음
+INPUT_ERROR_CODES = {"context_length_exceeded"}
+INPUT_ERROR_MARKERS = ("maximum context length", "maximum input length", "too many tokens")
+
+
+def is_input_error(error: openai.BadRequestError) -> bool:
+    message = str(error).lower()
+    return error.code in INPUT_ERROR_CODES or any(marker in message for marker in INPUT_ERROR_MARKERS)
+
+
+def embed_batch_isolating_failures(batch: List[Dict], model: str = EMBEDDING_MODEL) -> tuple[list, list]:
+    """
+    batch를 요청 1번으로 임베딩하고, 특정 input 때문에 거절(400, 예: 공고 1개가 input 한도 8192 토큰 초과)되면
+    반씩 나눠 다시 요청 → 문제 있는 공고만 빠지고 나머지는 저장됨 (요청 수는 나쁜 공고 수 × log2(배치 크기) 정도만 늘어남)
+    그 밖의 400(설정 오류 등)은 나누지 않고 그대로 raise
+    반환: ([(공고 목록, 임베딩 목록), ...], 실패한 공고 목록)
+    """
+    try:
+        return [(batch, embed_texts([job["text"] for job in batch], model))], []
+    except openai.BadRequestError as e:
+        if not is_input_error(e):
+            raise
+        if len(batch) == 1:
+            print(f"임베딩 거절 → 제외: {batch[0]['job_profile_id']} :: {e}")
+            return [], batch
+
+    mid = len(batch) // 2
+    left_done, left_failed = embed_batch_isolating_failures(batch[:mid], model)
+    right_done, right_failed = embed_batch_isolating_failures(batch[mid:], model)
+    return left_done + right_done, left_failed + right_failed
+
+
+def embed_jobs_batched(
+    jobs: List[Dict],
+    store: VectorStore,
+    max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+    max_items: int = EMBEDDING_BATCH_MAX_ITEMS,
+    max_workers: int = EMBEDDING_MAX_WORKERS,
+    model: str = EMBEDDING_MODEL
+) -> Dict[str, int]:
+    """
+    jobs: [{"job_profile_id": ..., "text": build_job_profile_text 결과}, ...]
+    - 배치 요청이 끝나는 대로 벡터 저장소(VectorStore)에 추가 (저장은 메인 스레드에서만 → 쓰기 경합 없음)
+    - 입력 때문에 거절된 배치는 나눠서 다시 요청해 문제 있는 공고만 실패 처리
+    - 재시도 후에도 실패한 배치는 ERROR 로그만 남기고 넘어감 (다음 실행에서 저장소에 없는 공고만 다시 시도)
+    반환: {"embedded": 성공 공고 수, "failed": 실패 공고 수}
+    """
+    batches = pack_into_batches(
+        jobs,
+        max_tokens=max_tokens,
+        size_fn=lambda job: estimate_tokens(job["text"]),
+        max_items=max_items
     )
-    return response.data[0].embedding
+    print(f"임베딩 대상 {len(jobs)}개 → 배치 {len(batches)}개 (최대 {max_items}개 / {max_tokens} 토큰)")
 
+    counts = {"embedded": 0, "failed": 0}
 
-# 공고들 순회하면서 임베딩 생성하기 위해 경로 가져오기 
-EMPLOY_NOTICE_DIR = r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\output\employ_notice"
-EMBEDDING_OUTPUT_DIR = r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\output\embedding"
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(embed_batch_isolating_failures, batch, model): (idx, batch)
+            for idx, batch in enumerate(batches, 1)
+        }
 
-os.makedirs(EMBEDDING_OUTPUT_DIR, exist_ok=True)
+        for future in as_completed(futures):
+            idx, batch = futures[future]
+            try:
+                done, failed = future.result()
+                for done_jobs, embeddings in done:
+                    store.add([job["job_profile_id"] for job in done_jobs], embeddings)
+                    counts["embedded"] += len(done_jobs)
+                counts["failed"] += len(failed)
+                print(f"[BATCH {idx}/{len(batches)}] 임베딩 생성 완료: {len(batch) - len(failed)}개 (실패 {len(failed)}개)")
+            except Exception as e:
+                counts["failed"] += len(batch)
+                print(f"[BATCH {idx}/{len(batches)}] ERROR :: {e}")
 
+    return counts
 
-json_files = [
-    f for f in os.listdir(EMPLOY_NOTICE_DIR)
-    if f.endswith(".json")
-]
-print(f"총 공고 파일 수: {len(json_files)}")
 
-for idx, filename in enumerate(json_files, start=1):
-    json_path = os.path.join(EMPLOY_NOTICE_DIR, filename)
+# 공고들 순회하면서 임베딩 생성하기 위해 경로 가져오기 
+EMPLOY_NOTICE_DIR = os.getenv("EMPLOY_NOTICE_DIR", r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\output\employ_notice")
+# 임베딩은 공고별 JSON 대신 벡터 저장소 1개에 저장 (기존 JSON은 vector_store.py 실행으로 이전)
 
-    with open(json_path, "r", encoding="utf-8") as f:
-        job = json.load(f)
 
-    job_profile_id = job.get("job_profile_id")
-    if not job_profile_id:
-        print(f"job_profile_id 없음 → 스킵: {filename}")
-        continue
+if __name__ == "__main__":
+    # 기존 저장소와 차원이 다르면 임베딩 요청 전에 오류 (EMBEDDING_DIMENSIONS 미설정이면 모델 기본 차원과 비교)
+    store = VectorStore(VECTOR_STORE_DIR, dim=expected_embedding_dim())
 
-    output_path = os.path.join(
-        EMBEDDING_OUTPUT_DIR,
-        f"{job_profile_id}.json"
-    )
+    json_files = [
+        f for f in os.listdir(EMPLOY_NOTICE_DIR)
+        if f.endswith(".json")
+    ]
+    print(f"총 공고 파일 수: {len(json_files)}")
+
+    # 임베딩이 없는 공고만 모아서 배치로 처리 (이미 있는 공고는 스킵 → 여러 번 실행해도 안전)
+    pending_jobs = []
+    pending_ids = set()
+
+    for idx, filename in enumerate(json_files, start=1):
+        json_path = os.path.join(EMPLOY_NOTICE_DIR, filename)
 
-    if os.path.exists(output_path):
-        print(f"[{idx}/{len(json_files)}] 이미 존재 → 스킵: {job_profile_id}")
-        continue
+        with open(json_path, "r", encoding="utf-8") as f:
+            job = json.load(f)
 
-    job_profile_text = build_job_profile_text(job)
-    if not job_profile_text.strip():
-        print(f"[{idx}/{len(json_files)}] 텍스트 비어있음 → 스킵: {job_profile_id}")
-        continue
+        job_profile_id = job.get("job_profile_id")
+        if not job_profile_id:
+            print(f"job_profile_id 없음 → 스킵: {filename}")
+            continue
 
-    embedding = embed_single_job(job_profile_text)
+        if job_profile_id in store or job_profile_id in pending_ids:
+            print(f"[{idx}/{len(json_files)}] 이미 존재 → 스킵: {job_profile_id}")
+            continue
 
-    embedding_data = {
-        "job_profile_id": job_profile_id,
-        "embedding": embedding
-    }
+        job_profile_text = build_job_profile_text(job)
+        if not job_profile_text.strip():
+            print(f"[{idx}/{len(json_files)}] 텍스트 비어있음 → 스킵: {job_profile_id}")
+            continue
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(embedding_data, f, ensure_ascii=False)
+        pending_jobs.append({"job_profile_id": job_profile_id, "text": job_profile_text})
+        pending_ids.add(job_profile_id)
 
-    print(f"[{idx}/{len(json_files)}] 임베딩 생성 완료: {job_profile_id}")
+    counts = embed_jobs_batched(pending_jobs, store=store)
 
-print("모든 공고 임베딩 처리 완료")
+    print(f"모든 공고 임베딩 처리 완료 (생성 {counts['embedded']}개 / 실패 {counts['failed']}개 / 저장소 총 {len(store)}개)")
 
 
 
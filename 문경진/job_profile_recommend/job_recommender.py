@@ -0,0 +1,160 @@
+import os
+import json
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from vector_store import VectorStore, VECTOR_STORE_DIR
+from user_analysis_embedding import build_repo_analysis_embedding_text
+
+
+### 사용자 분석 임베딩 ↔ 전체 공고 임베딩 cosine 유사도 top-k 추천
+# - 공고 행렬은 처음 1번만 행 단위 L2 정규화해서 float32로 메모리에 올림 → 질의마다 정규화 / 변환 없음
+# - 질의 1번 = 정규화된 질의 벡터와 행렬곱 1번 (cosine = 내적)
+# - top-k는 전체 정렬(O(n log n)) 대신 argpartition으로 k개만 고른 뒤 그 k개만 정렬
+#
+# 사용 예:
+#   recommender = JobRecommender(VectorStore(VECTOR_STORE_DIR))
+#   results = recommender.recommend(query_embedding, top_k=10)
+#   # [{"job_profile_id": ..., "score": 0.83}, ...]
+#   # 공고가 많으면 ANN 인덱스(ann_index.IVFIndex)로 검색: JobRecommender(store, index=IVFIndex.load(ANN_INDEX_DIR))
+
+NORMALIZE_CHUNK_ROWS = 8192  # 정규화할 때 한 번에 float32로 바꿀 행 수 (float16 저장소도 전체를 2번 복사하지 않도록)
+
+
+def normalize_rows(matrix: np.ndarray, chunk_rows: int = NORMALIZE_CHUNK_ROWS) -> np.ndarray:
+    """(n, dim) → 행마다 L2 norm 1인 float32 행렬 (norm 0인 행은 0 벡터 그대로)"""
+    normalized = np.empty(matrix.shape, dtype=np.float32)
+    for start in range(0, len(matrix), chunk_rows):
+        chunk = np.asarray(matrix[start:start + chunk_rows], dtype=np.float32)
+        norms = np.linalg.norm(chunk, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        np.divide(chunk, norms, out=normalized[start:start + chunk_rows])
+    return normalized
+
+
+def normalize_query(query_embedding, dim: int) -> np.ndarray:
+    """질의 임베딩 → 차원 확인 후 L2 norm 1인 float32 벡터"""
+    query = np.asarray(query_embedding, dtype=np.float32).ravel()
+    if query.shape[0] != dim:
+        raise ValueError(f"차원 불일치: 공고 {dim} / 질의 {query.shape[0]}")
+
+    norm = np.linalg.norm(query)
+    if norm == 0:
+        raise ValueError("질의 벡터의 norm이 0")
+    return query / norm
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k개의 인덱스 (점수 내림차순)"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(scores[candidates])[::-1]]
+
+
+class JobRecommender:
+    def __init__(self, store: VectorStore, index=None):
+        """
+        index: 근사 검색 인덱스 (ann_index.IVFIndex, search(query, top_k) 제공)
+               주어지면 전체 행렬을 올리지 않고 인덱스로 검색 (마감 공고는 인덱스에서 이미 빠짐)
+        """
+        self.store = store
+        self.index = index
+        self.reload()
+
+    def reload(self):
+        """저장소에 공고가 추가된 뒤 다시 불러오기"""
+        if self.index is not None:
+            return
+        self.job_profile_ids = list(self.store.ids)
+        self.matrix = normalize_rows(self.store.vectors)
+
+    def __len__(self) -> int:
+        return len(self.index) if self.index is not None else len(self.job_profile_ids)
+
+    def score(self, query_embedding) -> np.ndarray:
+        """모든 공고에 대한 cosine 유사도 (n,)"""
+        return self.matrix @ normalize_query(query_embedding, self.matrix.shape[1])
+
+    def recommend(self, query_embedding, top_k: int = 10, exclude_ids=()) -> List[Dict]:
+        """
+        query_embedding: 사용자 분석 텍스트 임베딩
+        exclude_ids: 결과에서 뺄 job_profile_id (이미 지원한 공고 등)
+        반환: [{"job_profile_id": ..., "score": ...}, ...] (점수 내림차순)
+        """
+        if len(self) == 0:
+            return []
+
+        if self.index is not None:
+            # 제외할 공고 수만큼 더 가져온 뒤 거름
+            exclude_ids = set(exclude_ids)
+            results = self.index.search(query_embedding, top_k=top_k + len(exclude_ids))
+            return [result for result in results if result["job_profile_id"] not in exclude_ids][:top_k]
+
+        scores = self.score(query_embedding)
+        for job_profile_id in exclude_ids:
+            row = self.store.id_to_row.get(job_profile_id)
+            if row is not None and row < len(scores):
+                scores[row] = -np.inf
+
+        return [
+            {"job_profile_id": self.job_profile_ids[i], "score": float(scores[i])}
+            for i in top_k_indices(scores, top_k)
+            if np.isfinite(scores[i])
+        ]
+
+    def recommend_for_analysis(
+        self,
+        analysis: dict,
+        embed_fn: Callable[[str], List[float]],
+        top_k: int = 10,
+        exclude_ids=()
+    ) -> List[Dict]:
+        """레포 분석 결과 → 임베딩 텍스트 → 임베딩 1번 → top-k 추천"""
+        text = build_repo_analysis_embedding_text(analysis)
+        if not text.strip():
+            raise ValueError("분석 결과에서 임베딩할 텍스트가 비어 있음")
+        return self.recommend(embed_fn(text), top_k=top_k, exclude_ids=exclude_ids)
+
+
+USER_ANALYSIS_PATH = os.getenv(
+    "USER_ANALYSIS_PATH",
+    r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\github_crawl\team-algogo_algogo_server_summary\team-algogo_algogo_server_single_analysis.json"
+)
+RECOMMEND_TOP_K = int(os.getenv("RECOMMEND_TOP_K", "10"))
+RECOMMEND_USE_ANN = os.getenv("RECOMMEND_USE_ANN", "1") == "1"  # ann_index.py로 만든 인덱스가 있으면 근사 검색
+RECOMMEND_PCA_DIM = int(os.getenv("RECOMMEND_PCA_DIM", "0"))  # 0이 아니면 PCA로 차원 축소한 행렬로 후보 검색 후 원본으로 재정렬
+RECOMMEND_INT8 = os.getenv("RECOMMEND_INT8", "0") == "1"      # int8 양자화한 행렬로 후보 검색 후 원본으로 재정렬
+
+
+if __name__ == "__main__":
+    from job_profile_embedding import embed_single_job  # OpenAI client 생성 (GMS 키 필요)
+    from ann_index import IVFIndex, ANN_INDEX_DIR
+    from embedding_compression import CompressedRecommender, PCAReducer
+
+    with open(USER_ANALYSIS_PATH, "r", encoding="utf-8") as f:
+        analysis = json.load(f)
+
+    index = None
+    if RECOMMEND_USE_ANN and os.path.exists(os.path.join(ANN_INDEX_DIR, "index.json")):
+        index = IVFIndex.load(ANN_INDEX_DIR)
+        print(f"ANN 인덱스 사용: list {index.n_lists}개 / nprobe {index.nprobe}")
+
+    store = VectorStore(VECTOR_STORE_DIR)
+    if index is None and (RECOMMEND_PCA_DIM or RECOMMEND_INT8):
+        reducer = PCAReducer.fit(store.vectors, dim=RECOMMEND_PCA_DIM) if RECOMMEND_PCA_DIM else None
+        recommender = CompressedRecommender(store, reducer=reducer, quantize=RECOMMEND_INT8)
+        print(f"압축 행렬 사용: {recommender.memory_bytes / 1e6:.1f}MB (PCA {RECOMMEND_PCA_DIM or '-'} / int8 {RECOMMEND_INT8})")
+    else:
+        recommender = JobRecommender(store, index=index)
+    print(f"추천 대상 공고 수: {len(recommender)}")
+
+    results = recommender.recommend_for_analysis(analysis, embed_fn=embed_single_job, top_k=RECOMMEND_TOP_K)
+
+    for rank, result in enumerate(results, start=1):
+        print(f"{rank:>2}. {result['job_profile_id']} ({result['score']:.4f})")
@@ -0,0 +1,217 @@
+import os
+import json
+from typing import Dict, List
+
+import numpy as np
+
+
+### 공고 임베딩 벡터 저장소 (공고마다 JSON 파일 1개 → 파일 3개)
+# - vectors.bin : 모든 벡터를 이어 붙인 float32(또는 float16) 행렬 (np.memmap으로 바로 로드)
+# - ids.txt     : 행 순서대로 job_profile_id 한 줄씩
+# - meta.json   : dim / dtype / count (count까지만 유효한 데이터, 쓰기 도중 중단돼도 count 뒤는 무시)
+# text-embedding-3-large(3072차원) 기준 JSON 약 60KB → float32 12KB / float16 6KB,
+# 10만 개를 불러올 때도 JSON 10만 번 파싱 대신 mmap 1번
+#
+# 사용 예:
+#   store = VectorStore(VECTOR_STORE_DIR, dim=3072)
+#   store.add(["id1", "id2"], embeddings)
+#   matrix = store.vectors      # (count, dim) memmap
+#   row = store.get("id1")
+
+VECTORS_FILE = "vectors.bin"
+IDS_FILE = "ids.txt"
+META_FILE = "meta.json"
+
+
+class VectorStore:
+    def __init__(self, store_dir: str, dim: int | None = None, dtype: str = "float32"):
+        """
+        store_dir: 저장 디렉토리 (없으면 생성)
+        dim / dtype: 새 저장소를 만들 때만 사용 (기존 저장소는 meta.json 값을 따름)
+        dtype: "float32" / "float16" (float16은 용량 절반, cosine 점수 차이는 미미)
+        """
+        self.store_dir = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+
+        self.vectors_path = os.path.join(store_dir, VECTORS_FILE)
+        self.ids_path = os.path.join(store_dir, IDS_FILE)
+        self.meta_path = os.path.join(store_dir, META_FILE)
+
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+            if dim is not None and dim != self.meta["dim"]:
+                raise ValueError(f"차원 불일치: 저장소 {self.meta['dim']} / 요청 {dim}")
+        else:
+            if dtype not in ("float32", "float16"):
+                raise ValueError(f"지원하지 않는 dtype: {dtype}")
+            self.meta = {"dim": dim, "dtype": dtype, "count": 0}
+
+        self.dtype = np.dtype(self.meta["dtype"])
+        self._matrix = None
+        self._load_ids()
+        self._truncate_to_count()
+
+    @property
+    def dim(self) -> int | None:
+        return self.meta["dim"]
+
+    @property
+    def row_bytes(self) -> int:
+        return self.dim * self.dtype.itemsize
+
+    def __len__(self) -> int:
+        return self.meta["count"]
+
+    def __contains__(self, job_profile_id: str) -> bool:
+        return job_profile_id in self.id_to_row
+
+    def _load_ids(self):
+        stored_ids = []
+        if os.path.exists(self.ids_path):
+            with open(self.ids_path, encoding="utf-8") as f:
+                stored_ids = [line.rstrip("\n") for line in f]
+        if len(stored_ids) < len(self):
+            raise ValueError(f"ids.txt 손상: id {len(stored_ids)}개 / count {len(self)}")
+
+        self.ids = stored_ids[:len(self)]
+        self.id_to_row = {job_profile_id: row for row, job_profile_id in enumerate(self.ids)}
+        self._has_stale_ids = len(stored_ids) > len(self)
+
+    def _truncate_to_count(self):
+        """이전 append가 meta 갱신 전에 중단됐으면 count 뒤에 붙은 데이터 정리"""
+        if self._has_stale_ids:
+            self._write_ids()
+        if self.dim is None:
+            return
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) > len(self) * self.row_bytes:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(len(self) * self.row_bytes)
+
+    def _write_ids(self):
+        tmp_path = self.ids_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{job_profile_id}\n" for job_profile_id in self.ids)
+        os.replace(tmp_path, self.ids_path)
+
+    def _save_meta(self):
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, self.meta_path)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """(count, dim) 읽기 전용 memmap (필요한 행만 디스크에서 읽음)"""
+        if len(self) == 0:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+        if self._matrix is None:
+            self._matrix = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(len(self), self.dim))
+        return self._matrix
+
+    def get(self, job_profile_id: str) -> np.ndarray | None:
+        row = self.id_to_row.get(job_profile_id)
+        return None if row is None else np.asarray(self.vectors[row], dtype=np.float32)
+
+    def add(self, job_profile_ids: List[str], embeddings) -> int:
+        """
+        벡터 추가 (이미 있는 id는 같은 행을 덮어씀, 한 번에 같은 id가 여러 번 오면 마지막 벡터 사용)
+        반환: 새로 추가된 벡터 수
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or len(embeddings) != len(job_profile_ids):
+            raise ValueError("job_profile_ids와 embeddings 개수가 맞지 않음")
+
+        if self.dim is None:
+            self.meta["dim"] = int(embeddings.shape[1])
+        elif embeddings.shape[1] != self.dim:
+            raise ValueError(f"차원 불일치: 저장소 {self.dim} / 입력 {embeddings.shape[1]}")
+
+        latest = {}  # id → 입력에서 마지막 위치 (처음 나온 순서 유지)
+        for i, job_profile_id in enumerate(job_profile_ids):
+            latest[job_profile_id] = i
+
+        new_ids, new_rows, updates = [], [], []
+        for job_profile_id, i in latest.items():
+            row = self.id_to_row.get(job_profile_id)
+            if row is None:
+                new_ids.append(job_profile_id)
+                new_rows.append(i)
+            else:
+                updates.append((row, i))
+
+        self._matrix = None  # 기존 memmap 핸들 해제 후 다시 열기
+
+        if updates:
+            matrix = np.memmap(self.vectors_path, dtype=self.dtype, mode="r+", shape=(len(self), self.dim))
+            for row, i in updates:
+                matrix[row] = embeddings[i]
+            matrix.flush()
+            del matrix
+
+        if new_ids:
+            # 1) 벡터 → 2) id → 3) meta(count) 순서로 기록 (count가 마지막이라 중간에 끊겨도 일관성 유지)
+            # 메모리의 ids / id_to_row는 기록이 모두 끝난 뒤에만 갱신
+            try:
+                with open(self.vectors_path, "ab") as f:
+                    f.truncate(len(self) * self.row_bytes)  # 이전에 실패한 기록이 뒤에 남아 있으면 정리
+                    f.write(embeddings[new_rows].astype(self.dtype).tobytes())
+                with open(self.ids_path, "a", encoding="utf-8") as f:
+                    f.writelines(f"{job_profile_id}\n" for job_profile_id in new_ids)
+
+                self.meta["count"] += len(new_ids)
+                self._save_meta()
+            except BaseException:
+                self.meta["count"] = len(self.ids)
+                self._has_stale_ids = True
+                self._truncate_to_count()
+                raise
+
+            for row, job_profile_id in enumerate(new_ids, start=len(self.ids)):
+                self.id_to_row[job_profile_id] = row
+            self.ids.extend(new_ids)
+
+        return len(new_ids)
+
+
+### 기존 공고별 JSON 임베딩({job_profile_id}.json) → VectorStore로 옮기기
+def migrate_json_embeddings(json_dir: str, store: VectorStore, chunk_size: int = 1000) -> Dict[str, int]:
+    """이미 저장소에 있는 id는 건너뜀 (여러 번 실행해도 안전)"""
+    counts = {"migrated": 0, "skipped": 0}
+    chunk_ids, chunk_vectors = [], []
+
+    def flush():
+        if chunk_ids:
+            counts["migrated"] += store.add(chunk_ids, chunk_vectors)
+            chunk_ids.clear()
+            chunk_vectors.clear()
+
+    for filename in sorted(os.listdir(json_dir)):
+        if not filename.endswith(".json"):
+            continue
+
+        with open(os.path.join(json_dir, filename), encoding="utf-8") as f:
+            data = json.load(f)
+
+        job_profile_id = data.get("job_profile_id")
+        if not job_profile_id or not data.get("embedding") or job_profile_id in store:
+            counts["skipped"] += 1
+            continue
+
+        chunk_ids.append(job_profile_id)
+        chunk_vectors.append(data["embedding"])
+        if len(chunk_ids) >= chunk_size:
+            flush()
+
+    flush()
+    return counts
+
+
+EMBEDDING_OUTPUT_DIR = os.getenv("EMBEDDING_OUTPUT_DIR", r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\output\embedding")
+VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\output\embedding_store")
+
+
+if __name__ == "__main__":
+    store = VectorStore(VECTOR_STORE_DIR)
+    counts = migrate_json_embeddings(EMBEDDING_OUTPUT_DIR, store)
+    print(f"JSON 임베딩 → 벡터 저장소 이전 완료: {counts} (총 {len(store)}개, {store.meta['dtype']})")
@@ -1,6 +1,11 @@
-import json, requests
+import json
 from dotenv import load_dotenv
-import os, re
+import os, sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # 문경진/common 공통 모듈 경로
+from common.gms import generate_content
+from common.json_parser import parse_llm_json
 
 load_dotenv()
 
@@ -9,31 +14,6 @@ OWNER = 'HTTP501'
 gms_api_key = os.getenv('GMS_API_KEY')
 gms_base_url = os.getenv('GMS_BASE_URL')
 
-def safe_json_load(text: str) -> dict:
-    """
-    LLM 출력에서
-    - ```json ``` 코드블록 제거
-    - 앞뒤 잡음 제거
-    - JSON 파싱
-    """
-    if not text:
-        raise ValueError("Empty response")
-
-    # 1. 코드 블록 제거 (```json ... ```)
-    text = re.sub(r"^```(?:json)?\s*", "", text.strip(), flags=re.IGNORECASE)
-    text = re.sub(r"\s*```$", "", text.strip())
-
-    # 2. JSON 객체만 추출 (혹시 앞뒤 잡문이 있을 경우)
-    start = text.find("{")
-    end = text.rfind("}")
-    if start == -1 or end == -1:
-        raise ValueError("No JSON object found")
-
-    text = text[start:end + 1]
-
-    # 3. JSON 파싱
-    return json.loads(text)
-
 repo1_path = r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\backend_single_analysis\HTTP501_idk_single_analysis.json"
 with open(repo1_path, "r", encoding="utf-8") as f:
     repo1_analysis = json.load(f)
@@ -120,34 +100,15 @@ def multi_repo_analysis(
     prompt
 ) -> str:
 
-    headers = {
-        "Content-Type": "application/json",
-        "x-goog-api-key": gms_api_key,
-    }
-
-    payload = {
-        "contents": [
-            {
-                "parts": [
-                    {
-                        "text": prompt
-                    }
-                ]
-            }
-        ]
-    }
-
-    response = requests.post(
-        gms_base_url,
-        headers=headers,
-        json=payload,
+    # 공통 rate limiter를 거쳐 Gemini(GMS) 호출
+    raw_text = generate_content(
+        prompt,
+        gms_api_key=gms_api_key,
+        gms_base_url=gms_base_url,
         timeout=90
     )
 
-    response.raise_for_status()
-    data = response.json()
-
-    return data["candidates"][0]["content"]["parts"][0]["text"].strip()
+    return raw_text.strip()
 
 
 raw_result = multi_repo_analysis(
@@ -156,7 +117,7 @@ raw_result = multi_repo_analysis(
     prompt=prompt
 )
 
-result = safe_json_load(raw_result)
+result = parse_llm_json(raw_result)
 
 
 output_dir = r"C:\Users\SSAFY\Desktop\S14P11B111\문경진\multi_repo_analysis"
@@ -1,21 +1,12 @@
 import json
 import os
+import sys
+from pathlib import Path
 from openai import OpenAI
 from dotenv import load_dotenv
 
-
-def safe_json_load(text: str) -> dict:
-    """
-    LLM 응답에서 ```json 코드블록을 제거하고 안전하게 JSON 파싱
-    """
-    text = text.strip()
-
-    if text.startswith("```"):
-        lines = text.splitlines()
-        lines = [line for line in lines if not line.strip().startswith("```")]
-        text = "\n".join(lines).strip()
-
-    return json.loads(text)
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # 문경진/common 공통 모듈 경로
+from common.json_parser import parse_llm_json
 
 
 def structure_portfolio_from_ocr(
@@ -105,8 +96,8 @@ def structure_portfolio_from_ocr(
     # 5. JSON 파싱
     # ==============================
     try:
-        structured_result = safe_json_load(result_text)
-    except json.JSONDecodeError:
+        structured_result = parse_llm_json(result_text)
+    except ValueError:
         raise ValueError(
             "LLM 응답이 JSON 형식이 아닙니다.\n\n=== RAW RESPONSE ===\n"
             + result_text